@@ -1,9 +1,20 @@
 from fastapi import HTTPException, status
 import logging
+import math
+
+from app.services.resilience import CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
 def handle_api_error(e: Exception, context: str = "endpoint"):
+    if isinstance(e, CircuitOpenError):
+        logger.warning(f"Upstream unavailable in {context}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))}
+        )
+    
     if isinstance(e, ValueError):
         logger.error(f"Validation error in {context}: {str(e)}")
         raise HTTPException(
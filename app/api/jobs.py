@@ -0,0 +1,66 @@
+from fastapi import HTTPException, status
+from typing import Dict, Any
+import logging
+
+from app.api.models.jobs import JobSubmitResponse, JobStatusResponse
+from app.services.job_queue import job_queue, JOB_SUCCEEDED, JOB_FAILED
+from app.services.mongodb_service import mongodb_service
+
+logger = logging.getLogger(__name__)
+
+
+async def submit_job(job_type: str, params: Dict[str, Any], prefix: str) -> JobSubmitResponse:
+    try:
+        job = await job_queue.submit(job_type, params)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    except Exception as e:
+        logger.error(f"Failed to queue {job_type} job: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to queue job: {str(e)}"
+        )
+    
+    return JobSubmitResponse(
+        job_id=job["_id"],
+        type=job_type,
+        status=job["status"],
+        status_url=f"{prefix}/jobs/{job['_id']}",
+        result_url=f"{prefix}/jobs/{job['_id']}/result"
+    )
+
+
+async def _load_job(job_type: str, job_id: str) -> Dict[str, Any]:
+    try:
+        job = await job_queue.get(job_id, job_type)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{job_type.capitalize()} job not found")
+    return job
+
+
+async def get_job_status(job_type: str, job_id: str) -> JobStatusResponse:
+    job = await _load_job(job_type, job_id)
+    return JobStatusResponse(job_id=job["_id"], **job)
+
+
+async def get_job_result(job_type: str, job_id: str) -> Dict[str, Any]:
+    job = await _load_job(job_type, job_id)
+    
+    if job["status"] == JOB_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job failed: {job.get('last_error')}"
+        )
+    if job["status"] != JOB_SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job is {job['status']}, result not available yet"
+        )
+    
+    result = await mongodb_service.get_result_by_id(job["result_id"]) if job.get("result_id") else None
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job result is no longer available")
+    return result
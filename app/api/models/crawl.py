@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Literal, Dict, Any
+from datetime import datetime
 
 class CrawlRequest(BaseModel):
     url: str = Field(..., description="The root URL to begin the crawl.")
@@ -18,6 +19,8 @@ class CrawlRequest(BaseModel):
     include_favicon: bool = Field(False, description="Whether to include the favicon URL for each result.")
     timeout: Optional[int] = Field(60, ge=10, le=150, description="Maximum time in seconds to wait for the crawl operation.")
     api_key: Optional[str] = Field(None, description="Optional Tavily API key to use for this request")
+    backend: Optional[Literal["tavily", "native"]] = Field(None, description="Crawler backend: Tavily API or the built-in asyncio crawler (defaults to CRAWL_BACKEND).")
+    incremental: bool = Field(False, description="Only store and return pages that are new or changed since the last crawl of this root with the same parameters.")
 
 class CrawlResultItem(BaseModel):
     url: str = Field(..., description="URL of the extracted content")
@@ -27,9 +30,18 @@ class CrawlResultItem(BaseModel):
     images: Optional[List[str]] = Field(default_factory=list, description="List of extracted images")
     favicon: Optional[str] = Field(None, description="Favicon URL")
 
+class CrawlIncrementalSummary(BaseModel):
+    total_pages: int = Field(..., description="Pages returned by the crawl before filtering")
+    new_urls: List[str] = Field(default_factory=list, description="Pages not seen in the previous crawl")
+    changed_urls: List[str] = Field(default_factory=list, description="Pages whose content changed since the previous crawl")
+    unchanged_urls: List[str] = Field(default_factory=list, description="Pages with identical content, omitted from results")
+    removed_urls: List[str] = Field(default_factory=list, description="Pages from the previous crawl that were not returned this time")
+    previous_crawl_at: Optional[datetime] = Field(None, description="When the previous crawl was fingerprinted")
+
 class CrawlResponse(BaseModel):
     base_url: Optional[str] = Field(None, description="The base URL of the crawl")
     results: List[CrawlResultItem] = Field(default_factory=list, description="List of crawl results")
     response_time: Optional[float] = Field(None, description="Total time taken for the crawl")
     usage: Optional[Dict[str, Any]] = Field(None, description="API credit usage for this request")
     request_id: Optional[str] = Field(None, description="Unique request ID from Tavily")
+    incremental: Optional[CrawlIncrementalSummary] = Field(None, description="Diff against the previous crawl (incremental mode only)")
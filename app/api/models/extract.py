@@ -2,13 +2,14 @@ from pydantic import BaseModel, Field, field_validator
 from typing import List, Optional, Literal, Dict, Any
 from datetime import datetime
 from app.api.utils import validate_non_empty_list
+from app.core.config import settings
 
 class ExtractRequest(BaseModel):
     urls: List[str] = Field(
         ...,
         min_length=1,
-        max_length=20,
-        description="List of URLs to extract content from (1-20 URLs)"
+        max_length=settings.EXTRACT_MAX_URLS,
+        description=f"List of URLs to extract content from (1-{settings.EXTRACT_MAX_URLS} URLs)"
     )
     query: Optional[str] = Field(
         None,
@@ -24,12 +25,20 @@ class ExtractRequest(BaseModel):
     )
     include_answer: bool = Field(
         default=False,
-        description="Whether to include an AI-generated answer based on the extracted content"
+        description=f"Whether to include an AI-generated answer based on the extracted content (at most {settings.EXTRACT_CHUNK_SIZE} URLs)"
     )
     api_key: Optional[str] = Field(
         None,
         description="Optional Tavily API key to use for this request"
     )
+    no_cache: bool = Field(
+        default=False,
+        description="Bypass the per-URL extraction cache and re-extract every URL"
+    )
+    hedge: Optional[bool] = Field(
+        None,
+        description="Send a duplicate upstream request if the first is slower than recent p95 latency (defaults to TAVILY_HEDGE_ENABLED)"
+    )
 
     @field_validator('urls')
     @classmethod
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Literal, Dict, Any
+from datetime import datetime
+
+
+class JobSubmitResponse(BaseModel):
+    job_id: str = Field(..., description="Identifier to poll for status and results")
+    type: Literal["crawl", "map"] = Field(..., description="Kind of job")
+    status: str = Field(..., description="Initial job status")
+    status_url: str = Field(..., description="URL to poll for job status")
+    result_url: str = Field(..., description="URL to fetch the result once the job has succeeded")
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str = Field(..., description="Job identifier")
+    type: Literal["crawl", "map"] = Field(..., description="Kind of job")
+    status: Literal["queued", "running", "succeeded", "failed"] = Field(..., description="Current job status")
+    attempts: int = Field(..., description="Number of attempts made so far")
+    max_attempts: int = Field(..., description="Maximum number of attempts")
+    created_at: datetime = Field(..., description="When the job was submitted")
+    updated_at: datetime = Field(..., description="When the job last changed")
+    started_at: Optional[datetime] = Field(None, description="When the latest attempt started")
+    finished_at: Optional[datetime] = Field(None, description="When the job reached a final status")
+    last_error: Optional[str] = Field(None, description="Error from the latest failed attempt")
+    result_summary: Optional[Dict[str, Any]] = Field(None, description="Short summary of the result once succeeded")
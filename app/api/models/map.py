@@ -18,6 +18,8 @@ class MapRequest(BaseModel):
     timeout: Optional[int] = Field(60, ge=10, le=150, description="Maximum time in seconds to wait for the map operation.")
     include_usage: bool = Field(False, description="Whether to include usage information in the response.")
     api_key: Optional[str] = Field(None, description="Optional Tavily API key to use for this request")
+    backend: Optional[Literal["tavily", "native"]] = Field(None, description="Crawler backend: Tavily API or the built-in asyncio crawler (defaults to CRAWL_BACKEND).")
+    use_sitemap: bool = Field(False, description="List URLs from the site's sitemaps first and crawl only when there are none or they cover too little of `limit`.")
    
 
 class MapResponse(BaseModel):
@@ -26,3 +28,4 @@ class MapResponse(BaseModel):
     response_time: Optional[float] = Field(None, description="Total time taken for the map")
     usage: Optional[Dict[str, Any]] = Field(None, description="API credit usage for this request")
     request_id: Optional[str] = Field(None, description="Unique request ID from Tavily")
+    source: Optional[Literal["sitemap", "tavily", "native"]] = Field(None, description="Where the URLs came from: the site's sitemaps or a crawl by the given backend")
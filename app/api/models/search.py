@@ -29,6 +29,25 @@ class SearchRequest(BaseModel):
         None,
         description="Optional Tavily API key to use for this request"
     )
+    max_age: Optional[int] = Field(
+        None,
+        ge=0,
+        description="Only accept cached results younger than this many seconds"
+    )
+    no_cache: bool = Field(
+        default=False,
+        description="Bypass the search cache and always query Tavily (the fresh result is still cached)"
+    )
+    hedge: Optional[bool] = Field(
+        None,
+        description="Send a duplicate upstream request if the first is slower than recent p95 latency (defaults to TAVILY_HEDGE_ENABLED)"
+    )
+    deadline_ms: Optional[int] = Field(
+        None,
+        ge=100,
+        le=120000,
+        description="Latency budget for the whole request; queries fall back to basic depth or cached results to meet it"
+    )
     
     @field_validator('queries')
     @classmethod
@@ -61,6 +80,12 @@ class SearchMetadata(BaseModel):
     search_depth: str
     result_count: int
     searched_at: datetime
+    cached: bool = False
+    requested_search_depth: Optional[str] = None
+    degraded: Optional[str] = Field(
+        None,
+        description="'depth' if basic depth was used to meet deadline_ms, 'cache' if an older cached result was served"
+    )
 
 
 class SingleSearchResult(BaseModel):
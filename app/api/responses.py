@@ -0,0 +1,58 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, Type
+import logging
+
+from app.core.config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class ORJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+class MsgpackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def wants_msgpack(request: Request) -> bool:
+    accept = request.headers.get("accept", "")
+    return msgpack is not None and any(media_type in accept for media_type in MSGPACK_MEDIA_TYPES)
+
+
+def wants_fast_response(request: Request) -> bool:
+    return settings.FAST_RESPONSES or wants_msgpack(request)
+
+
+def fast_response(request: Request, model: Type[BaseModel], data: Dict[str, Any], status_code: int = 200) -> Response:
+    # Validate the service payload exactly once, then hand plain JSON-safe data to orjson/msgpack.
+    # Returning a Response skips FastAPI's own response_model validation and jsonable_encoder pass.
+    try:
+        content = model.model_validate(data).model_dump(mode="json")
+    except ValidationError as e:
+        # pydantic's ValidationError is a ValueError, which handle_api_error would turn into a 400
+        raise RuntimeError(f"Response validation failed for {model.__name__}: {e}") from e
+
+    if wants_msgpack(request):
+        return MsgpackResponse(content, status_code=status_code)
+    return ORJSONResponse(content, status_code=status_code)
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import Any
+from fastapi import APIRouter, HTTPException, Request, status
+from typing import Any, Dict, Optional
 import logging
 
 from app.api.models.crawl import CrawlRequest, CrawlResponse
-from app.services.tavily_service import tavily_service
+from app.services.crawl_backends import run_crawl
 from app.services.mongodb_service import mongodb_service
+from app.services.write_behind import write_behind
+from app.services.crawl_diff import apply_incremental_crawl
 from app.api.errors import handle_api_error
+from app.api.responses import fast_response, wants_fast_response
+from app.api.scheduling import apply_request_scheduling
+from app.services.scheduler import PRIORITY_INTERACTIVE
+from app.api.jobs import submit_job, get_job_status, get_job_result
+from app.api.models.jobs import JobSubmitResponse, JobStatusResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -20,33 +27,83 @@ router = APIRouter()
     - Explores paths in parallel with built-in extraction
     - Supports natural language instructions
     - Customizable depth and breadth
+    - `backend: "native"` uses the built-in crawler (plain HTML sites, honors robots.txt and the path/domain filters)
+    - With `incremental`, only pages new or changed since the last crawl of the same root are stored and returned, plus unchanged and removed URL lists
+    - Send `Accept: application/msgpack` (or enable `FAST_RESPONSES`) for the single-validation orjson/msgpack path
     """
 )
-async def crawl(request: CrawlRequest) -> Any:
+async def crawl(request: CrawlRequest, http_request: Request) -> Any:
     try:
         logger.info(f"Received crawl request for URL: {request.url}")
+        apply_request_scheduling(http_request, PRIORITY_INTERACTIVE)
         
-        crawl_data = await tavily_service.crawl(
-            url=request.url,
-            instructions=request.instructions,
-            max_depth=request.max_depth,
-            max_breadth=request.max_breadth,
-            limit=request.limit,
-            api_key=request.api_key,
-            include_images=request.include_images,
-            extract_depth=request.extract_depth,
-            format=request.format,
-            include_favicon=request.include_favicon,
-            timeout=request.timeout
+        if request.incremental and mongodb_service.db is None:
+            # Checked before crawling so no credits are spent on a diff that cannot be made
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Incremental crawl requires MongoDB"
+            )
+        
+        crawl_data = await run_crawl(
+            request.model_dump(exclude={"incremental", "backend"}, exclude_none=True),
+            request.backend
         )
         
-        try:
-            await mongodb_service.save_crawl_results(crawl_data)
-            logger.info(f"Stored crawl results for {request.url} in MongoDB")
-        except Exception as e:
-            logger.warning(f"Failed to save crawl results to MongoDB: {e}")
+        if request.incremental:
+            async def persist(data: Dict[str, Any]) -> Optional[str]:
+                # Written inline, not through write-behind: the fingerprints may only be saved once this succeeds
+                try:
+                    return await mongodb_service.save_crawl_results(dict(data))
+                except Exception as e:
+                    logger.warning(f"Failed to save crawl results to MongoDB: {e}")
+                    return None
+            
+            await apply_incremental_crawl(
+                crawl_data, request.url, request.model_dump(exclude={"api_key", "incremental"}), persist
+            )
+        else:
+            try:
+                await write_behind.enqueue_crawl(crawl_data)
+                logger.info(f"Queued crawl results for {request.url} for storage in MongoDB")
+            except Exception as e:
+                logger.warning(f"Failed to save crawl results to MongoDB: {e}")
             
+        if wants_fast_response(http_request):
+            return fast_response(http_request, CrawlResponse, crawl_data)
         return crawl_data
         
     except Exception as e:
         handle_api_error(e, context="crawl")
+
+
+@router.post("/jobs",
+    response_model=JobSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a crawl job",
+    description="""
+    Queue a crawl to run in the background and return a job id immediately.
+    
+    - Jobs are stored in MongoDB and leased by workers in any process
+    - Failed attempts are retried with backoff; jobs whose worker dies become visible again after the lease expires
+    - Poll `/crawl/jobs/{job_id}` for status and fetch `/crawl/jobs/{job_id}/result` once succeeded
+    """
+)
+async def submit_crawl_job(request: CrawlRequest) -> JobSubmitResponse:
+    logger.info(f"Received crawl job for URL: {request.url}")
+    return await submit_job("crawl", request.model_dump(exclude_none=True), "/crawl")
+
+
+@router.get("/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Get crawl job status"
+)
+async def get_crawl_job(job_id: str) -> JobStatusResponse:
+    return await get_job_status("crawl", job_id)
+
+
+@router.get("/jobs/{job_id}/result",
+    summary="Get crawl job result",
+    description="Return the stored crawl result of a succeeded job. Responds 409 while the job is queued, running or failed."
+)
+async def get_crawl_job_result(job_id: str) -> Any:
+    return await get_job_result("crawl", job_id)
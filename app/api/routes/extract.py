@@ -1,11 +1,14 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from typing import Dict, Any
 import logging
 
 from app.api.models.extract import ExtractRequest, ExtractResponse
 from app.services.tavily_service import tavily_service
-from app.services.mongodb_service import mongodb_service
+from app.services.write_behind import write_behind
 from app.api.errors import handle_api_error
+from app.api.responses import fast_response, wants_fast_response
+from app.api.scheduling import apply_request_scheduling
+from app.services.scheduler import PRIORITY_INTERACTIVE
 
 logger = logging.getLogger(__name__)
 
@@ -18,16 +21,19 @@ router = APIRouter()
     description="""
     Extract precise content from specific URLs using Tavily API.
     
-    - Accepts a list of up to 20 URLs
+    - Accepts large URL lists: URLs are canonicalized and deduplicated, then sent upstream in parallel 20-URL chunks
+    - Recently extracted URLs are served from a per-URL cache
     - Returns structured extraction results for each URL
     - Supports basic and advanced extraction depths
     - Can include an AI-generated answer based on the extracted content
+    - Send `Accept: application/msgpack` (or enable `FAST_RESPONSES`) for the single-validation orjson/msgpack path
     """,
     response_description="Extracted content and summary"
 )
-async def extract(request: ExtractRequest) -> ExtractResponse:
+async def extract(request: ExtractRequest, http_request: Request) -> Any:
     try:
         logger.info(f"Received extraction request for {len(request.urls)} URLs")
+        apply_request_scheduling(http_request, PRIORITY_INTERACTIVE)
         
         extract_data = await tavily_service.extract(
             urls=request.urls,
@@ -35,11 +41,14 @@ async def extract(request: ExtractRequest) -> ExtractResponse:
             extract_depth=request.extract_depth,
             include_images=request.include_images,
             include_answer=request.include_answer,
-            api_key=request.api_key
+            api_key=request.api_key,
+            no_cache=request.no_cache,
+            hedge=request.hedge
         )
         
         results = extract_data.get("results", [])
         failed_results = extract_data.get("failed_results", [])
+        cached_urls = set(extract_data.get("cached_urls", []))
         
         if results:
             logger.info(f"Successfully extracted {len(results)} items. Sample result URL: {results[0].get('url')}")
@@ -53,32 +62,36 @@ async def extract(request: ExtractRequest) -> ExtractResponse:
 
         logger.info(f"Extraction successful for {len(results)} URLs, failed for {len(failed_results)} URLs")
         
-        if results:
+        fresh_results = [res for res in results if res.get("url") not in cached_urls]
+        if fresh_results:
             try:
                 storage_results = []
-                for res in results:
+                for res in fresh_results:
                     storage_res = res.copy()
                     storage_res["type"] = "extraction"
                     storage_res["requested_query"] = request.query
                     storage_results.append(storage_res)
                 
-                await mongodb_service.insert_batch_results(storage_results)
-                logger.info(f"Stored {len(results)} extraction results in MongoDB")
+                await write_behind.enqueue_results(storage_results)
+                logger.info(f"Queued {len(storage_results)} extraction results for storage in MongoDB")
             except Exception as e:
                 logger.error(f"Failed to store extraction results in MongoDB: {e}")
         
-        response = ExtractResponse(
-            results=results,
-            answer=extract_data.get("answer"),
-            failed_results=failed_results,
-            summary={
-                "total": len(request.urls),
+        response_data = {
+            "results": results,
+            "answer": extract_data.get("answer"),
+            "failed_results": failed_results,
+            "summary": {
+                "total": extract_data.get("total", len(request.urls)),
                 "successful": len(results),
-                "failed": len(failed_results)
+                "failed": len(failed_results),
+                "cached": len(cached_urls)
             }
-        )
+        }
         
-        return response
+        if wants_fast_response(http_request):
+            return fast_response(http_request, ExtractResponse, response_data)
+        return ExtractResponse(**response_data)
         
     except Exception as e:
         handle_api_error(e, context="extract")
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, Request, status
 from typing import Any
 import logging
 
 from app.api.models.map import MapRequest, MapResponse
-from app.services.tavily_service import tavily_service
-from app.services.mongodb_service import mongodb_service
+from app.services.crawl_backends import run_map
+from app.services.write_behind import write_behind
 from app.api.errors import handle_api_error
+from app.api.responses import fast_response, wants_fast_response
+from app.api.scheduling import apply_request_scheduling
+from app.services.scheduler import PRIORITY_INTERACTIVE
+from app.api.jobs import submit_job, get_job_status, get_job_result
+from app.api.models.jobs import JobSubmitResponse, JobStatusResponse
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -20,34 +25,60 @@ router = APIRouter()
     - Explores paths in parallel with built-in extraction
     - Supports natural language instructions
     - Customizable depth and breadth
+    - `backend: "native"` uses the built-in crawler (plain HTML sites, honors robots.txt and the path/domain filters)
+    - `use_sitemap` lists URLs from robots.txt sitemaps and sitemap indexes first; `source` reports which was used
+    - Send `Accept: application/msgpack` (or enable `FAST_RESPONSES`) for the single-validation orjson/msgpack path
     """
 )
-async def map_website(request: MapRequest) -> Any:
+async def map_website(request: MapRequest, http_request: Request) -> Any:
     try:
         logger.info(f"Received map request for URL: {request.url}")
+        apply_request_scheduling(http_request, PRIORITY_INTERACTIVE)
         
-        map_params = request.model_dump(exclude_none=True)
-        map_data = await tavily_service.map(
-            url=request.url,
-            instructions=request.instructions,
-            max_depth=request.max_depth,
-            max_breadth=request.max_breadth,
-            limit=request.limit,
-            api_key=request.api_key,
-            include_images=request.include_images,
-            extract_depth=request.extract_depth,
-            format=request.format,
-            timeout=request.timeout,
-            include_usage=request.include_usage
-        )
+        map_data = await run_map(request.model_dump(exclude={"backend"}, exclude_none=True), request.backend)
         
         try:
-            await mongodb_service.save_map_results(map_data)
-            logger.info(f"Stored map results for {request.url} in MongoDB")
+            await write_behind.enqueue_map(map_data)
+            logger.info(f"Queued map results for {request.url} for storage in MongoDB")
         except Exception as e:
             logger.warning(f"Failed to save map results to MongoDB: {e}")
             
+        if wants_fast_response(http_request):
+            return fast_response(http_request, MapResponse, map_data)
         return map_data
         
     except Exception as e:
         handle_api_error(e, context="map")
+
+
+@router.post("/jobs",
+    response_model=JobSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a map job",
+    description="""
+    Queue a map to run in the background and return a job id immediately.
+    
+    - Jobs are stored in MongoDB and leased by workers in any process
+    - Failed attempts are retried with backoff; jobs whose worker dies become visible again after the lease expires
+    - Poll `/map/jobs/{job_id}` for status and fetch `/map/jobs/{job_id}/result` once succeeded
+    """
+)
+async def submit_map_job(request: MapRequest) -> JobSubmitResponse:
+    logger.info(f"Received map job for URL: {request.url}")
+    return await submit_job("map", request.model_dump(exclude_none=True), "/map")
+
+
+@router.get("/jobs/{job_id}",
+    response_model=JobStatusResponse,
+    summary="Get map job status"
+)
+async def get_map_job(job_id: str) -> JobStatusResponse:
+    return await get_job_status("map", job_id)
+
+
+@router.get("/jobs/{job_id}/result",
+    summary="Get map job result",
+    description="Return the stored map result of a succeeded job. Responds 409 while the job is queued, running or failed."
+)
+async def get_map_job_result(job_id: str) -> Any:
+    return await get_job_result("map", job_id)
@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException, status
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, Any, List, Literal, Optional
+from datetime import datetime
+import asyncio
+import json
 import logging
 
 from app.api.models.search import (
@@ -11,12 +15,19 @@ from app.api.models.search import (
 )
 from app.services.tavily_service import tavily_service
 from app.services.mongodb_service import mongodb_service
+from app.services.write_behind import write_behind
 from app.api.errors import handle_api_error
+from app.api.responses import fast_response, wants_fast_response
+from app.api.scheduling import apply_request_scheduling
+from app.core.config import settings
+from app.services.scheduler import PRIORITY_BULK, PRIORITY_INTERACTIVE
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_background_tasks = set()
+
 
 @router.post("/search",
     response_model=SearchResponse,
@@ -30,27 +41,41 @@ router = APIRouter()
     - Automatically stores results in MongoDB
     - Supports both basic and advanced search depths
     - Validates all inputs using Pydantic models
+    - Send `Accept: application/msgpack` (or enable `FAST_RESPONSES`) for the single-validation orjson/msgpack path
+    - Large batches are scheduled as bulk work; override with `X-Priority: interactive|bulk` and set `X-Tenant-ID` for fair queueing
     """,
     response_description="Search results with AI-generated answers"
 )
-async def search(request: SearchRequest) -> SearchResponse:
+async def search(request: SearchRequest, http_request: Request) -> Any:
 
     try:
         logger.info(f"Received search request with {len(request.queries)} queries")
+        apply_request_scheduling(http_request, _default_priority(request))
         search_data = await tavily_service.batch_search(
             queries=request.queries,
             search_depth=request.search_depth,
             max_results=request.max_results,
             include_answer=request.include_answer,
-            api_key=request.api_key
+            api_key=request.api_key,
+            max_age=request.max_age,
+            no_cache=request.no_cache,
+            hedge=request.hedge,
+            deadline_ms=request.deadline_ms
         )
-        if search_data["results"]:
+        cached_queries = set(search_data.get("cached_queries", []))
+        fresh_results = [result for result in search_data["results"] if result.get("query") not in cached_queries]
+        if fresh_results:
             try:
-                await mongodb_service.insert_batch_results(search_data["results"])
-                logger.info(f"Stored {len(search_data['results'])} results in MongoDB")
+                await write_behind.enqueue_results(fresh_results)
+                logger.info(f"Queued {len(fresh_results)} results for storage in MongoDB")
             except Exception as e:
                 logger.error(f"Failed to store results in MongoDB: {e}")
         
+        if wants_fast_response(http_request):
+            summary = search_data["summary"]
+            logger.info(f"Search completed: {summary['successful']} successful, {summary['failed']} failed")
+            return fast_response(http_request, SearchResponse, search_data)
+        
         response = SearchResponse(
             results=[
                 SingleSearchResult(**result)
@@ -74,12 +99,117 @@ async def search(request: SearchRequest) -> SearchResponse:
         handle_api_error(e, context="search")
 
 
+def _default_priority(request: SearchRequest) -> str:
+    if len(request.queries) > settings.SEARCH_INTERACTIVE_MAX_QUERIES:
+        return PRIORITY_BULK
+    return PRIORITY_INTERACTIVE
+
+
+def _format_stream_event(event: str, data: Dict[str, Any], sse: bool) -> str:
+    if sse:
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"event": event, **data}) + "\n"
+
+
+async def _store_stream_results(results: List[Dict[str, Any]]):
+    try:
+        await write_behind.enqueue_results(results)
+        logger.info(f"Queued {len(results)} streamed results for storage in MongoDB")
+    except Exception as e:
+        logger.error(f"Failed to store streamed results in MongoDB: {e}")
+
+
+@router.post("/search/stream",
+    status_code=status.HTTP_200_OK,
+    summary="Perform web search with streamed results",
+    description="""
+    Streaming variant of `/web_search/search`.
+    
+    - Emits each result or error as soon as its query completes, tagged with its input `index`
+    - Sends NDJSON (`application/x-ndjson`) by default, or Server-Sent Events when `Accept: text/event-stream`
+    - Ends with a `summary` event
+    - Results are stored in MongoDB
+    """,
+    response_description="Stream of result, error and summary events"
+)
+async def search_stream(request: SearchRequest, http_request: Request) -> StreamingResponse:
+    sse = "text/event-stream" in http_request.headers.get("accept", "")
+    logger.info(f"Received streaming search request with {len(request.queries)} queries")
+    apply_request_scheduling(http_request, _default_priority(request))
+    
+    async def events() -> AsyncIterator[str]:
+        stored = []
+        successful = 0
+        failed = 0
+        completed = False
+        try:
+            async for outcome in tavily_service.iter_batch_search(
+                queries=request.queries,
+                search_depth=request.search_depth,
+                max_results=request.max_results,
+                include_answer=request.include_answer,
+                api_key=request.api_key,
+                max_age=request.max_age,
+                no_cache=request.no_cache,
+                hedge=request.hedge,
+                deadline_ms=request.deadline_ms
+            ):
+                if "error" in outcome:
+                    failed += 1
+                    error = SearchError(query=outcome["query"], error=outcome["error"])
+                    yield _format_stream_event(
+                        "error", {"index": outcome["index"], **error.model_dump(mode="json")}, sse
+                    )
+                else:
+                    successful += 1
+                    result = SingleSearchResult(**outcome["result"])
+                    if not outcome.get("cached"):
+                        stored.append(outcome["result"])
+                    yield _format_stream_event(
+                        "result", {"index": outcome["index"], **result.model_dump(mode="json")}, sse
+                    )
+            
+            if stored:
+                await _store_stream_results(stored)
+            completed = True
+            
+            summary = SearchSummary(total=len(request.queries), successful=successful, failed=failed)
+            logger.info(f"Streaming search completed: {successful} successful, {failed} failed")
+            yield _format_stream_event("summary", summary.model_dump(mode="json"), sse)
+        finally:
+            if not completed and stored:
+                # Client went away mid-stream: keep what was already produced
+                task = asyncio.ensure_future(_store_stream_results(stored))
+                _background_tasks.add(task)
+                task.add_done_callback(_background_tasks.discard)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/results",
-    summary="Get recent search results",
-    description="Retrieve recent search results from MongoDB",
-    response_description="List of recent search results"
+    summary="Get stored search results",
+    description="""
+    Page through stored results from MongoDB, newest first.
+    
+    - Filter by `type` (search, extraction, crawl, map) and a UTC `start`/`end` window
+    - Pass the returned `next_cursor` as `cursor` to fetch the following page; it is `null` on the last page
+    - Page bodies are joined back from the content store unless `include_content=false`
+    - Use `/web_search/results/export` to pull a full history in one streamed response
+    """,
+    response_description="A page of stored results and the cursor for the next one"
 )
-async def get_results(limit: int = 10) -> Dict[str, Any]:
+async def get_results(
+    limit: int = 10,
+    include_content: bool = True,
+    cursor: Optional[str] = None,
+    result_type: Optional[str] = Query(None, alias="type"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Dict[str, Any]:
     try:
         if limit < 1 or limit > 100:
             raise HTTPException(
@@ -87,15 +217,25 @@ async def get_results(limit: int = 10) -> Dict[str, Any]:
                 detail="Limit must be between 1 and 100"
             )
         
-        results = await mongodb_service.get_all_results(limit=limit)
+        page = await mongodb_service.get_results_page(
+            limit=limit,
+            cursor=cursor,
+            result_type=result_type,
+            start=start,
+            end=end,
+            include_content=include_content
+        )
         
         return {
-            "count": len(results),
-            "results": results
+            "count": len(page["results"]),
+            "results": page["results"],
+            "next_cursor": page["next_cursor"]
         }
         
     except HTTPException:
         raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error retrieving results: {str(e)}")
         raise HTTPException(
@@ -104,19 +244,117 @@ async def get_results(limit: int = 10) -> Dict[str, Any]:
         )
 
 
+def _export_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+@router.get("/results/export",
+    summary="Export stored results as NDJSON",
+    description="""
+    Stream every stored result matching the filters as newline-delimited JSON, newest first.
+    
+    - Same `type` and `start`/`end` filters as `/web_search/results`
+    - Read from a single MongoDB cursor in batches of `RESULTS_EXPORT_BATCH_SIZE`, so memory stays flat however many results match
+    - `include_content=false` skips joining and decompressing page bodies
+    """,
+    response_description="NDJSON stream, one stored result per line"
+)
+async def export_results(
+    include_content: bool = True,
+    result_type: Optional[str] = Query(None, alias="type"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> StreamingResponse:
+    logger.info(f"Exporting stored results (type={result_type}, start={start}, end={end})")
+    
+    async def lines() -> AsyncIterator[str]:
+        exported = 0
+        async for batch in mongodb_service.iter_results(
+            result_type=result_type,
+            start=start,
+            end=end,
+            include_content=include_content
+        ):
+            exported += len(batch)
+            # One chunk per batch keeps the per-document overhead off the event loop
+            yield "".join(json.dumps(document, default=_export_default) + "\n" for document in batch)
+        logger.info(f"Exported {exported} stored results")
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="results.ndjson"'}
+    )
+
+
+@router.get("/results/by-url",
+    summary="Get stored results containing a URL",
+    description="""
+    Find stored results, newest first, whose result list includes `url` exactly as it was returned.
+    
+    - Answered from the multikey index on `results.url`
+    - Page bodies are joined back from the content store unless `include_content=false`
+    """,
+    response_description="Stored results that contain the URL"
+)
+async def get_results_by_url(
+    url: str,
+    limit: int = 10,
+    include_content: bool = True
+) -> Dict[str, Any]:
+    if limit < 1 or limit > 100:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Limit must be between 1 and 100"
+        )
+    try:
+        results = await mongodb_service.get_results_by_url(url, limit=limit, include_content=include_content)
+        return {"count": len(results), "results": results}
+    except Exception as e:
+        logger.error(f"Error retrieving results for URL {url}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve results: {str(e)}"
+        )
+
+
 @router.get("/stats",
     summary="Get search statistics",
-    description="Get statistics about stored search results",
+    description="""
+    Get statistics about stored results, answered from incrementally maintained hourly/daily rollups.
+    
+    - `by_type=true` breaks counts down by result type (search, extraction, crawl, map)
+    - `start`/`end` (UTC) add a zero-filled `series` over `granularity` buckets (`hour` or `day`)
+    - A background reconciler periodically recounts recent buckets and totals to correct drift
+    """,
     response_description="Statistics including total and recent result counts"
 )
-async def get_stats() -> Dict[str, Any]:
+async def get_stats(
+    by_type: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: Literal["hour", "day"] = "hour"
+) -> Dict[str, Any]:
     try:
-        stats = await mongodb_service.get_stats()
+        stats = await mongodb_service.get_stats(by_type=by_type, start=start, end=end, granularity=granularity)
         return stats
         
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         logger.error(f"Error retrieving stats: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to retrieve statistics: {str(e)}"
         )
+
+
+@router.get("/cache/stats",
+    summary="Get search cache statistics",
+    description="Get hit/miss counters and occupancy of the search result cache",
+    response_description="Search cache counters"
+)
+async def get_cache_stats() -> Dict[str, Any]:
+    return tavily_service.search_cache.get_stats()
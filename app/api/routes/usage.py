@@ -0,0 +1,56 @@
+from fastapi import APIRouter, HTTPException, status
+from typing import Dict, Any, Optional
+from datetime import datetime
+import logging
+
+from app.services.tavily_service import tavily_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/credits",
+    summary="Get Tavily credit ledger",
+    description="""
+    Credits consumed per API key, broken down by operation.
+    
+    - Uses the `usage` reported by Tavily where available and estimates the rest
+    - Read from MongoDB (all processes) when connected, otherwise from this process
+    - Keys are identified by a fingerprint and a masked hint, never in full
+    """,
+    response_description="Credit usage per API key"
+)
+async def get_credits(since: Optional[datetime] = None) -> Dict[str, Any]:
+    try:
+        return await tavily_service.credit_ledger.get_ledger(since)
+    except Exception as e:
+        logger.error(f"Error retrieving credit ledger: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to retrieve credit ledger: {str(e)}"
+        )
+
+
+@router.get("/rate-limits",
+    summary="Get per-key rate limiter state",
+    description="Configured per-operation limits and the current token bucket state for each API key",
+    response_description="Rate limiter state"
+)
+async def get_rate_limits() -> Dict[str, Any]:
+    return tavily_service.rate_limiter.get_state()
+
+
+@router.get("/keys",
+    summary="Get Tavily key pool state",
+    description="""
+    Per-key state of the server-side Tavily key pool.
+    
+    - Requests are spread over keys by remaining rate budget, then by in-flight requests
+    - Keys answering 429 or 401 are taken out of rotation for a cooldown
+    - Reports per-key throughput (last 60s), successes and error counts
+    """,
+    response_description="Key pool state"
+)
+async def get_key_pool() -> Dict[str, Any]:
+    return tavily_service.key_pool.get_state()
@@ -0,0 +1,19 @@
+from fastapi import Request
+from typing import Optional
+
+from app.services.scheduler import PRIORITIES, current_priority, current_tenant
+
+PRIORITY_HEADER = "X-Priority"
+TENANT_HEADER = "X-Tenant-ID"
+
+
+def apply_request_scheduling(request: Request, default_priority: str) -> Optional[str]:
+    priority = request.headers.get(PRIORITY_HEADER, "").strip().lower()
+    if priority not in PRIORITIES:
+        priority = default_priority
+    current_priority.set(priority)
+    
+    tenant = request.headers.get(TENANT_HEADER, "").strip()[:64]
+    if tenant:
+        current_tenant.set(tenant)
+    return priority
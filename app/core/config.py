@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, Optional
 
 class Settings(BaseSettings):
     APP_NAME: str = "Web Intelligence API"
@@ -17,16 +17,151 @@ class Settings(BaseSettings):
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
     
     TAVILY_API_KEY: Optional[str] = None
+    # Extra comma-separated keys pooled with TAVILY_API_KEY for server-side traffic
+    TAVILY_API_KEYS: str = ""
+    
+    @property
+    def tavily_api_keys_list(self) -> list:
+        keys = [self.TAVILY_API_KEY] if self.TAVILY_API_KEY else []
+        keys.extend(key.strip() for key in self.TAVILY_API_KEYS.split(",") if key.strip())
+        return list(dict.fromkeys(keys))
+    
     TAVILY_BASE_URL: str = "https://api.tavily.com"
     TAVILY_TIMEOUT: int = 30
     TAVILY_MAX_RESULTS: int = 5
     TAVILY_SEARCH_DEPTH: str = "advanced"
+    TAVILY_HTTP2: bool = True
+    TAVILY_MAX_CONNECTIONS: int = 100
+    TAVILY_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    TAVILY_KEEPALIVE_EXPIRY: float = 30.0
+    TAVILY_PREWARM_CONNECTIONS: int = 2
+    TAVILY_BATCH_CONCURRENCY: int = 10
+    TAVILY_RETRY_MAX_ATTEMPTS: int = 3
+    TAVILY_RETRY_BASE_DELAY: float = 0.5
+    TAVILY_RETRY_MAX_DELAY: float = 8.0
+    TAVILY_RETRY_MAX_ELAPSED: float = 20.0
+    TAVILY_RETRY_BUDGET_RATIO: float = 0.2
+    TAVILY_RETRY_BUDGET_MIN_TOKENS: float = 10.0
+    TAVILY_BREAKER_FAILURE_THRESHOLD: int = 5
+    TAVILY_BREAKER_RESET_TIMEOUT: float = 30.0
+    # Requests per second and burst size per API key, by operation (0 disables the limit)
+    TAVILY_RATE_LIMITS: Dict[str, float] = {"search": 10.0, "extract": 5.0, "crawl": 1.0, "map": 2.0}
+    TAVILY_RATE_BURSTS: Dict[str, float] = {"search": 20.0, "extract": 10.0, "crawl": 2.0, "map": 4.0}
+    # Per-key rate buckets and in-process credit totals kept; the least recently used are evicted beyond this
+    TAVILY_MAX_TRACKED_KEYS: int = 1000
+    TAVILY_KEY_COOLDOWN_RATE_LIMITED: float = 30.0
+    TAVILY_KEY_COOLDOWN_UNAUTHORIZED: float = 600.0
+    # Hedge search/extract when an attempt outlives this percentile of recent latency
+    TAVILY_HEDGE_ENABLED: bool = False
+    TAVILY_HEDGE_PERCENTILE: float = 95.0
+    TAVILY_HEDGE_BUDGET_RATIO: float = 0.05
+    TAVILY_HEDGE_MIN_SAMPLES: int = 20
+    TAVILY_HEDGE_MIN_DELAY: float = 0.05
+    TAVILY_HEDGE_WINDOW: int = 500
+    # Concurrent outbound calls shared by the interactive and bulk classes
+    TAVILY_SCHEDULER_CAPACITY: int = 64
+    TAVILY_SCHEDULER_INTERACTIVE_RESERVE: int = 16
+    # Fair-queueing weight per tenant (X-Tenant-ID header or API key fingerprint); unlisted tenants weigh 1
+    TAVILY_TENANT_WEIGHTS: Dict[str, float] = {}
+    # Search batches larger than this are scheduled as bulk unless X-Priority says otherwise
+    SEARCH_INTERACTIVE_MAX_QUERIES: int = 5
+    # Latency model behind deadline_ms: seconds assumed per depth until enough searches are observed
+    SEARCH_DEPTH_LATENCY_PRIORS: Dict[str, float] = {"basic": 1.0, "advanced": 3.0}
+    SEARCH_DEADLINE_QUANTILE: float = 90.0
+    SEARCH_LATENCY_WINDOW: int = 200
+    SEARCH_LATENCY_MIN_SAMPLES: int = 10
+    # "tavily" or "native" (built-in asyncio crawler) for /crawl and /map when a request does not choose
+    CRAWL_BACKEND: str = "tavily"
+    NATIVE_CRAWL_USER_AGENT: str = "WebIntelligenceBot/2.0"
+    NATIVE_CRAWL_CONCURRENCY: int = 10
+    NATIVE_CRAWL_PER_HOST_CONCURRENCY: int = 2
+    NATIVE_CRAWL_POLITENESS_DELAY: float = 0.25
+    NATIVE_CRAWL_MAX_PAGE_BYTES: int = 2_000_000
+    NATIVE_CRAWL_ROBOTS_TTL: float = 3600.0
+    NATIVE_CRAWL_REQUEST_TIMEOUT: float = 15.0
+    # Server-side fetches refuse loopback, private and link-local addresses unless this is set
+    NATIVE_CRAWL_ALLOW_PRIVATE_NETWORKS: bool = False
+    NATIVE_CRAWL_MAX_REDIRECTS: int = 5
+    # Hosts whose robots.txt, politeness and address checks are remembered (least recently used evicted)
+    NATIVE_CRAWL_MAX_TRACKED_HOSTS: int = 1000
+    # An unreachable or 5xx robots.txt disallows the site until it is retried after this many seconds
+    NATIVE_CRAWL_ROBOTS_ERROR_TTL: float = 300.0
+    # /map with use_sitemap: sitemap files read per request, and the share of `limit` they must fill to skip the crawl
+    MAP_SITEMAP_MAX_FILES: int = 25
+    MAP_SITEMAP_MIN_COVERAGE: float = 0.5
+    # Decompressed bytes read from one sitemap file before it is abandoned (the sitemap protocol caps files at 50MB)
+    MAP_SITEMAP_MAX_BYTES: int = 50 * 1024 * 1024
+    # Serve every search/extract/crawl/map response through the single-validation orjson path
+    FAST_RESPONSES: bool = False
     
     OPENAI_API_KEY: Optional[str] = None
     
     MONGODB_URI: str
     MONGODB_DB_NAME: str = "web_intelligence"
     MONGODB_COLLECTION: str = "search_results"
+    MONGODB_CACHE_COLLECTION: str = "search_cache"
+    MONGODB_JOBS_COLLECTION: str = "jobs"
+    MONGODB_JOB_INSTANCES_COLLECTION: str = "job_instances"
+    MONGODB_LEDGER_COLLECTION: str = "credit_ledger"
+    MONGODB_CRAWL_STATE_COLLECTION: str = "crawl_state"
+    MONGODB_CONTENT_COLLECTION: str = "page_content"
+    MONGODB_STATS_COLLECTION: str = "stats_rollups"
+    # Page bodies (content/raw_content) at least this long are stored once by hash and referenced from results
+    CONTENT_DEDUP_ENABLED: bool = True
+    CONTENT_DEDUP_MIN_CHARS: int = 256
+    # "zstd" (falls back to zlib without the zstandard package), "zlib" or "none"; the codec is stored with each field
+    CONTENT_COMPRESSION_CODEC: str = "zstd"
+    CONTENT_COMPRESSION_MIN_CHARS: int = 4096
+    CONTENT_COMPRESSION_LEVEL: Optional[int] = None
+    
+    SEARCH_CACHE_MAX_ENTRIES: int = 1000
+    SEARCH_CACHE_TTL_SECONDS: int = 3600
+    
+    EXTRACT_MAX_URLS: int = 500
+    EXTRACT_CHUNK_SIZE: int = 20
+    EXTRACT_CONCURRENCY: int = 5
+    EXTRACT_CACHE_MAX_ENTRIES: int = 5000
+    EXTRACT_CACHE_TTL_SECONDS: int = 900
+    
+    JOB_WORKERS_ENABLED: bool = True
+    JOB_WORKER_CONCURRENCY: int = 2
+    JOB_POLL_INTERVAL: float = 1.0
+    JOB_VISIBILITY_TIMEOUT: int = 300
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_DELAY: float = 30.0
+    # Each process holding caller keys heartbeats this often; its keyed jobs fail once it has been silent for JOB_INSTANCE_TTL seconds
+    JOB_INSTANCE_HEARTBEAT_INTERVAL: float = 15.0
+    JOB_INSTANCE_TTL: int = 60
+    
+    # Write-behind persistence of route results: flushed every PERSIST_BATCH_SIZE documents or PERSIST_FLUSH_INTERVAL seconds
+    PERSIST_WRITE_BEHIND_ENABLED: bool = True
+    PERSIST_MAX_QUEUE: int = 10000
+    PERSIST_BATCH_SIZE: int = 500
+    PERSIST_FLUSH_INTERVAL: float = 0.5
+    PERSIST_DRAIN_TIMEOUT: float = 10.0
+    # "majority", "0" (unacknowledged) or a node count; journaled acknowledgement with PERSIST_WRITE_JOURNAL
+    PERSIST_WRITE_CONCERN: str = "1"
+    PERSIST_WRITE_JOURNAL: bool = False
+    
+    # Background recount of the stats rollups: closed buckets of the last STATS_RECONCILE_DAYS days (kept inside the shortest RETENTION_DAYS) plus totals
+    STATS_RECONCILE_ENABLED: bool = True
+    STATS_RECONCILE_INTERVAL: float = 3600.0
+    STATS_RECONCILE_DAYS: int = 2
+    STATS_MAX_RANGE_BUCKETS: int = 744
+    
+    # Documents fetched per server round trip (and joined/decompressed together) by the NDJSON export
+    RESULTS_EXPORT_BATCH_SIZE: int = 500
+    
+    # Retention in days per result type, e.g. {"crawl": 30, "search": 180}; unlisted types are kept forever
+    RETENTION_DAYS: Dict[str, int] = {}
+    # Expired results are appended here as gzipped JSONL per type and day before deletion; empty skips archiving
+    RETENTION_ARCHIVE_DIR: str = "archive"
+    RETENTION_INTERVAL: float = 3600.0
+    RETENTION_BATCH_SIZE: int = 500
+    # Time between archiving a result and the TTL index deleting it
+    RETENTION_GRACE_SECONDS: int = 3600
+    # Re-imported archive results expire again after this many days
+    RETENTION_RESTORE_DAYS: int = 7
     
     class Config:
         env_file = ".env"
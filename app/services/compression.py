@@ -0,0 +1,121 @@
+import logging
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+from bson import Binary
+
+from app.services.content_refs import CONTENT_FIELDS
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+CODEC_ZSTD = "zstd"
+CODEC_ZLIB = "zlib"
+CODEC_NONE = "none"
+
+
+def resolve_codec(codec: str) -> str:
+    if codec == CODEC_ZSTD and zstandard is None:
+        logger.warning("zstd compression requested but the 'zstandard' package is not installed, using zlib")
+        return CODEC_ZLIB
+    if codec not in (CODEC_ZSTD, CODEC_ZLIB, CODEC_NONE):
+        raise ValueError(f"Unknown compression codec '{codec}'")
+    return codec
+
+
+@lru_cache(maxsize=None)
+def _zstd_compressor(level: int) -> "zstandard.ZstdCompressor":
+    # Reused: building a compressor per field costs more than compressing a typical page
+    return zstandard.ZstdCompressor(level=level)
+
+
+@lru_cache(maxsize=1)
+def _zstd_decompressor() -> "zstandard.ZstdDecompressor":
+    return zstandard.ZstdDecompressor()
+
+
+def compress_bytes(data: bytes, codec: str, level: Optional[int] = None) -> bytes:
+    if codec == CODEC_ZSTD:
+        return _zstd_compressor(level if level is not None else 3).compress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.compress(data, level if level is not None else 6)
+    raise ValueError(f"Unknown compression codec '{codec}'")
+
+
+def decompress_bytes(data: bytes, codec: str) -> bytes:
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("Stored content is zstd-compressed but the 'zstandard' package is not installed")
+        return _zstd_decompressor().decompress(data)
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown compression codec '{codec}'")
+
+
+def is_compressed(value: Any) -> bool:
+    return isinstance(value, dict) and "codec" in value and "data" in value
+
+
+def compress_text(text: str, codec: str, level: Optional[int] = None) -> Dict[str, Any]:
+    """Encoded field value; the codec travels with it so codecs can change without a rewrite."""
+    return {"codec": codec, "data": Binary(compress_bytes(text.encode("utf-8"), codec, level)), "size": len(text)}
+
+
+def decompress_text(value: Dict[str, Any]) -> str:
+    return decompress_bytes(bytes(value["data"]), value["codec"]).decode("utf-8")
+
+
+def _compress_item(item: Dict[str, Any], codec: str, min_size: int, level: Optional[int]) -> Dict[str, Any]:
+    replaced = None
+    for field in CONTENT_FIELDS:
+        text = item.get(field)
+        if not isinstance(text, str) or len(text) < min_size:
+            continue
+        if replaced is None:
+            replaced = dict(item)
+        replaced[field] = compress_text(text, codec, level)
+    return replaced if replaced is not None else item
+
+
+def compress_fields(
+    document: Dict[str, Any],
+    codec: str,
+    min_size: int,
+    level: Optional[int] = None
+) -> Dict[str, Any]:
+    """Copy of the document with large content fields (top level and in results) compressed."""
+    if codec == CODEC_NONE:
+        return document
+    stored = _compress_item(document, codec, min_size, level)
+    results = document.get("results")
+    if isinstance(results, list):
+        stored_results = [
+            _compress_item(item, codec, min_size, level) if isinstance(item, dict) else item
+            for item in results
+        ]
+        if any(new is not old for new, old in zip(stored_results, results)):
+            stored = dict(stored) if stored is document else stored
+            stored["results"] = stored_results
+    return stored
+
+
+def _items(documents: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    for document in documents:
+        yield document
+        results = document.get("results")
+        if isinstance(results, list):
+            yield from (item for item in results if isinstance(item, dict))
+
+
+def decompress_fields(documents: List[Dict[str, Any]], keep: bool = True) -> List[Dict[str, Any]]:
+    """Decode compressed content fields in place, or blank them when the caller did not ask for content."""
+    for item in _items(documents):
+        for field in CONTENT_FIELDS:
+            if is_compressed(item.get(field)):
+                item[field] = decompress_text(item[field]) if keep else None
+    return documents
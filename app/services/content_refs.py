@@ -0,0 +1,73 @@
+import hashlib
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+CONTENT_FIELDS = ("content", "raw_content")
+REF_SUFFIX = "_ref"
+# Where a stored result document can hold a content hash
+CONTENT_REF_PATHS = tuple(
+    prefix + field + REF_SUFFIX for prefix in ("", "results.") for field in CONTENT_FIELDS
+)
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _dehydrate_item(item: Dict[str, Any], min_size: int, bodies: Dict[str, str]) -> Dict[str, Any]:
+    replaced = None
+    for field in CONTENT_FIELDS:
+        text = item.get(field)
+        if not isinstance(text, str) or len(text) < min_size:
+            continue
+        digest = content_hash(text)
+        bodies[digest] = text
+        if replaced is None:
+            replaced = dict(item)
+        del replaced[field]
+        replaced[field + REF_SUFFIX] = digest
+    return replaced if replaced is not None else item
+
+
+def dehydrate(document: Dict[str, Any], min_size: int = 0) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Swap page bodies for content hashes; returns the new document and the bodies by hash."""
+    bodies: Dict[str, str] = {}
+    stored = _dehydrate_item(document, min_size, bodies)
+    results = document.get("results")
+    if isinstance(results, list):
+        stored_results = [
+            _dehydrate_item(item, min_size, bodies) if isinstance(item, dict) else item
+            for item in results
+        ]
+        if any(new is not old for new, old in zip(stored_results, results)):
+            stored = dict(stored) if stored is document else stored
+            stored["results"] = stored_results
+    return stored, bodies
+
+
+def _items(document: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    yield document
+    results = document.get("results")
+    if isinstance(results, list):
+        yield from (item for item in results if isinstance(item, dict))
+
+
+def referenced_hashes(documents: Iterable[Dict[str, Any]]) -> Set[str]:
+    hashes = set()
+    for document in documents:
+        for item in _items(document):
+            for field in CONTENT_FIELDS:
+                digest = item.get(field + REF_SUFFIX)
+                if digest:
+                    hashes.add(digest)
+    return hashes
+
+
+def hydrate(documents: List[Dict[str, Any]], bodies: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Put page bodies back in place of their references (in place)."""
+    for document in documents:
+        for item in _items(document):
+            for field in CONTENT_FIELDS:
+                digest = item.pop(field + REF_SUFFIX, None)
+                if digest is not None:
+                    item[field] = bodies.get(digest)
+    return documents
@@ -0,0 +1,48 @@
+import logging
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.services.native_crawler import native_crawler
+from app.services.sitemap import sitemap_mapper
+from app.services.tavily_service import tavily_service
+
+logger = logging.getLogger(__name__)
+
+BACKEND_TAVILY = "tavily"
+BACKEND_NATIVE = "native"
+SOURCE_SITEMAP = "sitemap"
+
+
+def resolve_backend(requested: Optional[str]) -> str:
+    backend = requested or settings.CRAWL_BACKEND
+    if backend not in (BACKEND_TAVILY, BACKEND_NATIVE):
+        raise ValueError(f"Unknown crawl backend '{backend}'")
+    return backend
+
+
+async def run_crawl(params: Dict[str, Any], backend: Optional[str] = None) -> Dict[str, Any]:
+    if resolve_backend(backend) == BACKEND_NATIVE:
+        logger.info(f"Crawling {params.get('url')} with the native backend")
+        return await native_crawler.crawl(**{k: v for k, v in params.items() if k != "api_key"})
+    return await tavily_service.crawl(**params)
+
+
+async def run_map(params: Dict[str, Any], backend: Optional[str] = None) -> Dict[str, Any]:
+    backend = resolve_backend(backend)
+    if params.pop("use_sitemap", False):
+        try:
+            map_data = await sitemap_mapper.map(**params)
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Sitemap lookup for {params.get('url')} failed, falling back to {backend}: {e}")
+            map_data = None
+        if map_data is not None:
+            return {**map_data, "source": SOURCE_SITEMAP}
+
+    if backend == BACKEND_NATIVE:
+        logger.info(f"Mapping {params.get('url')} with the native backend")
+        map_data = await native_crawler.map(**{k: v for k, v in params.items() if k != "api_key"})
+    else:
+        map_data = await tavily_service.map(**params)
+    return {**map_data, "source": backend}
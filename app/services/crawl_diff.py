@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services.crawl_backends import resolve_backend
+from app.services.mongodb_service import mongodb_service
+from app.services.url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# Crawl parameters that change which pages a crawl can return, or how their content is
+# extracted; crawls differing in any of them keep separate fingerprints so a narrower crawl
+# does not "remove" pages and a different backend does not "change" every page
+SCOPE_FIELDS = (
+    "backend",
+    "instructions",
+    "max_depth",
+    "max_breadth",
+    "limit",
+    "select_paths",
+    "select_domains",
+    "exclude_paths",
+    "exclude_domains",
+    "allow_external",
+    "extract_depth",
+    "format"
+)
+
+
+def content_fingerprint(page: Dict[str, Any]) -> str:
+    body = page.get("raw_content") or page.get("content") or ""
+    normalized = " ".join(f"{page.get('title') or ''}\n{body}".split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def crawl_state_key(url: str, params: Dict[str, Any]) -> str:
+    scope = {field: params.get(field) for field in SCOPE_FIELDS}
+    scope["backend"] = resolve_backend(scope["backend"])
+    raw = json.dumps([canonicalize_url(url), scope], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def diff_pages(previous: Dict[str, str], pages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    fingerprints: Dict[str, str] = {}
+    changed_pages = []
+    new_urls = []
+    changed_urls = []
+    unchanged_urls = []
+    # Every list is reported in canonical form: removed pages are only known by their stored canonical URL
+    for page in pages:
+        url = canonicalize_url(page.get("url", ""))
+        if url in fingerprints:
+            continue
+        fingerprint = content_fingerprint(page)
+        fingerprints[url] = fingerprint
+        
+        old = previous.get(url)
+        if old is None:
+            new_urls.append(url)
+            changed_pages.append(page)
+        elif old != fingerprint:
+            changed_urls.append(url)
+            changed_pages.append(page)
+        else:
+            unchanged_urls.append(url)
+    
+    return {
+        "pages": changed_pages,
+        "fingerprints": fingerprints,
+        "new_urls": new_urls,
+        "changed_urls": changed_urls,
+        "unchanged_urls": unchanged_urls,
+        "removed_urls": [url for url in previous if url not in fingerprints]
+    }
+
+
+async def apply_incremental_crawl(
+    crawl_data: Dict[str, Any],
+    url: str,
+    params: Dict[str, Any],
+    persist: Callable[[Dict[str, Any]], Awaitable[Optional[str]]]
+) -> Optional[str]:
+    """Reduce `crawl_data` to new and changed pages, store it with `persist`, then record the fingerprints.
+
+    Returns what `persist` returned; None means the results were not stored and the fingerprints are
+    left as they were, so the same pages are reported again next time.
+    """
+    state_key = crawl_state_key(url, params)
+    state = await mongodb_service.get_crawl_fingerprints(state_key)
+    previous: Dict[str, str] = state["pages"] if state else {}
+    previous_crawl_at: Optional[datetime] = state["crawled_at"] if state else None
+    
+    pages = crawl_data.get("results", [])
+    diff = diff_pages(previous, pages)
+    crawled_at = datetime.utcnow()
+    
+    logger.info(
+        f"Incremental crawl of {url}: {len(diff['new_urls'])} new, {len(diff['changed_urls'])} changed, "
+        f"{len(diff['unchanged_urls'])} unchanged, {len(diff['removed_urls'])} removed"
+    )
+    
+    crawl_data["results"] = diff["pages"]
+    crawl_data["incremental"] = {
+        "total_pages": len(diff["fingerprints"]),
+        "new_urls": diff["new_urls"],
+        "changed_urls": diff["changed_urls"],
+        "unchanged_urls": diff["unchanged_urls"],
+        "removed_urls": diff["removed_urls"],
+        "previous_crawl_at": previous_crawl_at
+    }
+    
+    result_id = await persist(crawl_data)
+    if result_id is None:
+        logger.warning(f"Crawl results for {url} were not stored, keeping the previous fingerprints")
+        return None
+    await mongodb_service.save_crawl_fingerprints(state_key, url, diff["fingerprints"], crawled_at)
+    return result_id
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import math
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.services.mongodb_service import mongodb_service
+from app.services.rate_limiter import fingerprint_key, mask_key
+
+logger = logging.getLogger(__name__)
+
+DEPTH_MULTIPLIER = {"basic": 1, "advanced": 2}
+
+
+def estimate_credits(operation: str, payload: Dict[str, Any], data: Dict[str, Any]) -> int:
+    depth = DEPTH_MULTIPLIER.get(payload.get("search_depth") or payload.get("extract_depth") or "basic", 1)
+    results = len(data.get("results", []))
+    if operation == "search":
+        return depth
+    if operation == "extract":
+        return math.ceil(results / 5) * depth
+    if operation == "map":
+        return max(1, math.ceil(results / 10))
+    if operation == "crawl":
+        return max(1, math.ceil(results / 10)) + math.ceil(results / 5) * depth
+    return 0
+
+
+class CreditLedger:
+    def __init__(self, max_entries: Optional[int] = None):
+        # One entry per key and operation (search, extract, crawl, map)
+        self.max_entries = max_entries or settings.TAVILY_MAX_TRACKED_KEYS * 4
+        # In-process fallback only: MongoDB keeps the full history, so evicting idle keys loses nothing durable
+        self._totals: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._pending: set = set()
+
+    def record(self, api_key: str, operation: str, payload: Dict[str, Any], data: Dict[str, Any]) -> Dict[str, Any]:
+        usage = data.get("usage") or {}
+        reported = usage.get("credits")
+        estimated = reported is None
+        credits = estimate_credits(operation, payload, data) if estimated else reported
+
+        key_id = fingerprint_key(api_key)
+        key_hint = mask_key(api_key)
+        entry = self._totals.setdefault((key_id, operation), {
+            "key_hint": key_hint,
+            "requests": 0,
+            "credits": 0,
+            "estimated_credits": 0
+        })
+        self._totals.move_to_end((key_id, operation))
+        while len(self._totals) > self.max_entries:
+            self._totals.popitem(last=False)
+        entry["requests"] += 1
+        entry["credits"] += credits
+        if estimated:
+            entry["estimated_credits"] += credits
+
+        if mongodb_service.db is not None:
+            task = asyncio.ensure_future(self._persist(key_id, key_hint, operation, credits, estimated))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+        return {"credits": credits, "estimated": estimated}
+
+    async def _persist(self, key_id: str, key_hint: str, operation: str, credits: float, estimated: bool):
+        try:
+            await mongodb_service.record_credit_usage(
+                key_id, key_hint, operation, datetime.utcnow(), credits, estimated
+            )
+        except Exception as e:
+            logger.warning(f"Failed to persist credit usage: {e}")
+
+    def _group(self, rows) -> Dict[str, Any]:
+        keys: Dict[str, Any] = {}
+        for key_id, key_hint, operation, stats in rows:
+            entry = keys.setdefault(key_id, {
+                "key_id": key_id,
+                "key_hint": key_hint,
+                "requests": 0,
+                "credits": 0,
+                "estimated_credits": 0,
+                "by_operation": {}
+            })
+            for field in ("requests", "credits", "estimated_credits"):
+                entry[field] += stats[field]
+            entry["by_operation"][operation] = stats
+        return keys
+
+    async def get_ledger(self, since: Optional[datetime] = None) -> Dict[str, Any]:
+        if mongodb_service.db is not None:
+            try:
+                rows = await mongodb_service.get_credit_usage(since)
+                return {"source": "mongodb", "keys": list(self._group(rows).values())}
+            except Exception as e:
+                logger.warning(f"Failed to read credit ledger from MongoDB, using in-process totals: {e}")
+
+        rows = [
+            (key_id, stats["key_hint"], operation, {field: value for field, value in stats.items() if field != "key_hint"})
+            for (key_id, operation), stats in self._totals.items()
+        ]
+        return {"source": "memory", "keys": list(self._group(rows).values())}
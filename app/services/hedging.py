@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from app.core.config import settings
+from app.services.resilience import RetryBudget
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    def __init__(self, window: int):
+        self.samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+        return ordered[index]
+
+
+class Hedger:
+    def __init__(
+        self,
+        percentile: Optional[float] = None,
+        budget_ratio: Optional[float] = None,
+        min_samples: Optional[int] = None,
+        min_delay: Optional[float] = None,
+        window: Optional[int] = None
+    ):
+        self.percentile = percentile if percentile is not None else settings.TAVILY_HEDGE_PERCENTILE
+        self.min_samples = max(1, min_samples if min_samples is not None else settings.TAVILY_HEDGE_MIN_SAMPLES)
+        self.min_delay = min_delay if min_delay is not None else settings.TAVILY_HEDGE_MIN_DELAY
+        self.window = window if window is not None else settings.TAVILY_HEDGE_WINDOW
+        # Every call earns `ratio` of a hedge, so hedges stay under that fraction of traffic
+        self.budget = RetryBudget(
+            budget_ratio if budget_ratio is not None else settings.TAVILY_HEDGE_BUDGET_RATIO,
+            1.0
+        )
+        self.trackers: Dict[str, LatencyTracker] = {}
+        self.stats = {
+            "calls": 0,
+            "hedged": 0,
+            "hedge_wins": 0,
+            "budget_exhausted": 0
+        }
+
+    def tracker(self, operation: str) -> LatencyTracker:
+        if operation not in self.trackers:
+            self.trackers[operation] = LatencyTracker(self.window)
+        return self.trackers[operation]
+
+    def hedge_delay(self, operation: str) -> Optional[float]:
+        tracker = self.tracker(operation)
+        if len(tracker.samples) < self.min_samples:
+            return None
+        return max(self.min_delay, tracker.percentile(self.percentile))
+
+    async def _timed(self, operation: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            # A cancelled loser still took at least this long; dropping it would hide the tail
+            self.tracker(operation).record(time.monotonic() - started)
+            raise
+        self.tracker(operation).record(time.monotonic() - started)
+        return result
+
+    async def run(self, operation: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.stats["calls"] += 1
+        self.budget.deposit()
+        delay = self.hedge_delay(operation)
+        if delay is None:
+            return await self._timed(operation, fn)
+
+        primary = asyncio.ensure_future(self._timed(operation, fn))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+
+            if not self.budget.withdraw():
+                self.stats["budget_exhausted"] += 1
+                return await primary
+
+            self.stats["hedged"] += 1
+            logger.info(f"Hedging Tavily {operation}: no response after {delay:.2f}s")
+            hedge = asyncio.ensure_future(self._timed(operation, fn))
+            tasks.add(hedge)
+
+            pending = set(tasks)
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    error = error or task.exception()
+            # Both attempts failed: surface the first error
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "budget_tokens": round(self.budget.tokens, 3),
+            "hedge_delays": {
+                operation: round(delay, 3)
+                for operation in self.trackers
+                if (delay := self.hedge_delay(operation)) is not None
+            }
+        }
@@ -0,0 +1,275 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from pymongo import ASCENDING, ReturnDocument
+
+from app.core.config import settings
+from app.services.mongodb_service import mongodb_service
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class JobQueue:
+    def __init__(self):
+        self.collection_name = settings.MONGODB_JOBS_COLLECTION
+        self.visibility_timeout = settings.JOB_VISIBILITY_TIMEOUT
+        self.max_attempts = settings.JOB_MAX_ATTEMPTS
+        self.retry_delay = settings.JOB_RETRY_DELAY
+        # Caller API keys never go to MongoDB: they stay in the accepting process, keyed by job id
+        self.instance_id = uuid.uuid4().hex
+        self._api_keys: Dict[str, str] = {}
+        # Other processes treat this one's keyed jobs as lost only once its heartbeat lapses
+        self.instances_collection_name = settings.MONGODB_JOB_INSTANCES_COLLECTION
+        self.heartbeat_interval = settings.JOB_INSTANCE_HEARTBEAT_INTERVAL
+        self.instance_ttl = settings.JOB_INSTANCE_TTL
+        self._heartbeat_task: Optional[asyncio.Task] = None
+
+    @property
+    def collection(self):
+        if mongodb_service.db is None:
+            raise RuntimeError("MongoDB is not connected, the job queue is unavailable")
+        return mongodb_service.db[self.collection_name]
+
+    @property
+    def instances(self):
+        if mongodb_service.db is None:
+            raise RuntimeError("MongoDB is not connected, the job queue is unavailable")
+        return mongodb_service.db[self.instances_collection_name]
+
+    async def ensure_indexes(self):
+        await self.collection.create_index([("status", ASCENDING), ("available_at", ASCENDING)])
+        await self.collection.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+        await self.instances.create_index("expires_at", expireAfterSeconds=0)
+
+    async def start(self):
+        if self._heartbeat_task is None:
+            await self.heartbeat()
+            self._heartbeat_task = asyncio.create_task(self._run_heartbeat())
+
+    async def stop(self):
+        if self._heartbeat_task is None:
+            return
+        self._heartbeat_task.cancel()
+        await asyncio.gather(self._heartbeat_task, return_exceptions=True)
+        self._heartbeat_task = None
+        # The held keys die with this process: let other instances fail its keyed jobs right away
+        await self.instances.delete_one({"_id": self.instance_id})
+
+    async def heartbeat(self):
+        now = datetime.utcnow()
+        await self.instances.update_one(
+            {"_id": self.instance_id},
+            {"$set": {"expires_at": now + timedelta(seconds=self.instance_ttl), "updated_at": now}},
+            upsert=True
+        )
+
+    async def _run_heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                await self.heartbeat()
+            except Exception as e:
+                logger.warning(f"Job queue heartbeat failed: {e}")
+
+    async def submit(self, job_type: str, params: Dict[str, Any], max_attempts: Optional[int] = None) -> Dict[str, Any]:
+        now = datetime.utcnow()
+        params = dict(params)
+        api_key = params.pop("api_key", None)
+        job = {
+            "_id": uuid.uuid4().hex,
+            "type": job_type,
+            "params": params,
+            "key_holder": self.instance_id if api_key else None,
+            "status": JOB_QUEUED,
+            "attempts": 0,
+            "max_attempts": max_attempts or self.max_attempts,
+            "available_at": now,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "created_at": now,
+            "updated_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "result_id": None,
+            "last_error": None
+        }
+        if api_key:
+            self._api_keys[job["_id"]] = api_key
+        try:
+            await self.collection.insert_one(job)
+        except Exception:
+            self._api_keys.pop(job["_id"], None)
+            raise
+        logger.info(f"Queued {job_type} job {job['_id']}")
+        return job
+
+    async def lease(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        now = datetime.utcnow()
+        # A running job whose lease expired belongs to a worker that died: make it visible again
+        return await self.collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": JOB_QUEUED, "available_at": {"$lte": now}},
+                    {"status": JOB_RUNNING, "lease_expires_at": {"$lte": now}}
+                ],
+                "$expr": {"$lt": ["$attempts", "$max_attempts"]},
+                # Jobs carrying a caller key can only run where the key is held
+                "key_holder": {"$in": [None, self.instance_id]}
+            },
+            {
+                "$set": {
+                    "status": JOB_RUNNING,
+                    "lease_owner": worker_id,
+                    "lease_expires_at": now + timedelta(seconds=self.visibility_timeout),
+                    "started_at": now,
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            sort=[("available_at", ASCENDING)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    def job_params(self, job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Handler params with the caller's key restored; None when the key is not held here."""
+        params = dict(job["params"])
+        if job.get("key_holder"):
+            api_key = self._api_keys.get(job["_id"])
+            if api_key is None:
+                return None
+            params["api_key"] = api_key
+        return params
+
+    async def extend_lease(self, job_id: str, worker_id: str) -> bool:
+        now = datetime.utcnow()
+        result = await self.collection.update_one(
+            {"_id": job_id, "status": JOB_RUNNING, "lease_owner": worker_id},
+            {"$set": {
+                "lease_expires_at": now + timedelta(seconds=self.visibility_timeout),
+                "updated_at": now
+            }}
+        )
+        return result.modified_count == 1
+
+    async def complete(self, job_id: str, worker_id: str, result_id: Optional[str], summary: Dict[str, Any]) -> bool:
+        now = datetime.utcnow()
+        result = await self.collection.update_one(
+            {"_id": job_id, "status": JOB_RUNNING, "lease_owner": worker_id},
+            {
+                "$set": {
+                    "status": JOB_SUCCEEDED,
+                    "result_id": result_id,
+                    "result_summary": summary,
+                    "finished_at": now,
+                    "updated_at": now,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "last_error": None
+                }
+            }
+        )
+        self._api_keys.pop(job_id, None)
+        return result.modified_count == 1
+
+    async def fail(self, job: Dict[str, Any], worker_id: str, error: str) -> bool:
+        now = datetime.utcnow()
+        if job["attempts"] < job["max_attempts"]:
+            delay = self.retry_delay * (2 ** (job["attempts"] - 1))
+            update = {"$set": {
+                "status": JOB_QUEUED,
+                "available_at": now + timedelta(seconds=delay),
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "last_error": error,
+                "updated_at": now
+            }}
+            logger.warning(f"Job {job['_id']} attempt {job['attempts']} failed, retrying in {delay:.0f}s: {error}")
+        else:
+            update = {
+                "$set": {
+                    "status": JOB_FAILED,
+                    "finished_at": now,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "last_error": error,
+                    "updated_at": now
+                }
+            }
+            logger.error(f"Job {job['_id']} failed permanently after {job['attempts']} attempts: {error}")
+            self._api_keys.pop(job["_id"], None)
+
+        result = await self.collection.update_one(
+            {"_id": job["_id"], "status": JOB_RUNNING, "lease_owner": worker_id},
+            update
+        )
+        return result.modified_count == 1
+
+    async def fail_exhausted(self) -> int:
+        # Jobs whose last lease expired with no attempts left can never be leased again
+        now = datetime.utcnow()
+        result = await self.collection.update_many(
+            {
+                "status": JOB_RUNNING,
+                "lease_expires_at": {"$lte": now},
+                "$expr": {"$gte": ["$attempts", "$max_attempts"]}
+            },
+            {"$set": {
+                "status": JOB_FAILED,
+                "finished_at": now,
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "last_error": "Lease expired on the final attempt",
+                "updated_at": now
+            }}
+        )
+        failed = result.modified_count
+        gone = await self._gone_holders(now)
+        if gone:
+            # Queued jobs of a dead holder can never run; running ones only once their lease has lapsed too
+            orphaned = await self.collection.update_many(
+                {
+                    "key_holder": {"$in": gone},
+                    "$or": [
+                        {"status": JOB_QUEUED},
+                        {"status": JOB_RUNNING, "lease_expires_at": {"$lte": now}}
+                    ]
+                },
+                {"$set": {
+                    "status": JOB_FAILED,
+                    "finished_at": now,
+                    "lease_owner": None,
+                    "lease_expires_at": None,
+                    "last_error": "The process holding the caller's API key is gone; resubmit the job",
+                    "updated_at": now
+                }}
+            )
+            failed += orphaned.modified_count
+        return failed
+
+    async def _gone_holders(self, now: datetime) -> List[str]:
+        holders = await self.collection.distinct(
+            "key_holder",
+            {"status": {"$in": [JOB_QUEUED, JOB_RUNNING]}, "key_holder": {"$nin": [None, self.instance_id]}}
+        )
+        if not holders:
+            return []
+        # A busy holder keeps heartbeating however long its backlog is; only a lapsed heartbeat means it is gone
+        live = set(await self.instances.distinct("_id", {"_id": {"$in": holders}, "expires_at": {"$gt": now}}))
+        return [holder for holder in holders if holder not in live]
+
+    async def get(self, job_id: str, job_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        query = {"_id": job_id}
+        if job_type:
+            query["type"] = job_type
+        return await self.collection.find_one(query, {"params.api_key": 0})
+
+
+job_queue = JobQueue()
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.job_queue import JobQueue, job_queue
+from app.services.mongodb_service import mongodb_service
+from app.services.crawl_diff import apply_incremental_crawl
+from app.services.scheduler import PRIORITY_BULK, current_priority
+from app.services.tavily_service import tavily_service
+from app.services.crawl_backends import run_crawl, run_map
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Tuple[Optional[str], Dict[str, Any]]]]
+
+
+async def run_crawl_job(params: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+    incremental = params.pop("incremental", False)
+    backend = params.pop("backend", None)
+    crawl_data = await run_crawl(params, backend)
+    summary: Dict[str, Any] = {}
+    if incremental:
+        scope = {key: value for key, value in params.items() if key != "api_key"}
+        result_id = await apply_incremental_crawl(
+            crawl_data, params["url"], {**scope, "backend": backend}, mongodb_service.save_crawl_results
+        )
+        diff = crawl_data["incremental"]
+        summary = {field: len(diff[field]) for field in ("new_urls", "changed_urls", "unchanged_urls", "removed_urls")}
+    else:
+        result_id = await mongodb_service.save_crawl_results(crawl_data)
+    return result_id, {"result_count": len(crawl_data.get("results", [])), **summary}
+
+
+async def run_map_job(params: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+    map_data = await run_map(params, params.pop("backend", None))
+    result_id = await mongodb_service.save_map_results(map_data)
+    return result_id, {"result_count": len(map_data.get("results", []))}
+
+
+DEFAULT_HANDLERS: Dict[str, JobHandler] = {
+    "crawl": run_crawl_job,
+    "map": run_map_job
+}
+
+
+class JobWorker:
+    def __init__(
+        self,
+        queue: Optional[JobQueue] = None,
+        handlers: Optional[Dict[str, JobHandler]] = None,
+        concurrency: Optional[int] = None,
+        poll_interval: Optional[float] = None
+    ):
+        self.queue = queue or job_queue
+        self.handlers = handlers or DEFAULT_HANDLERS
+        self.concurrency = max(1, concurrency or settings.JOB_WORKER_CONCURRENCY)
+        self.poll_interval = poll_interval if poll_interval is not None else settings.JOB_POLL_INTERVAL
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._tasks: list[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.ensure_future(self._run_loop(slot))
+            for slot in range(self.concurrency)
+        ]
+        logger.info(f"Job worker {self.worker_id} started with {self.concurrency} slot(s)")
+
+    async def stop(self):
+        if not self._tasks:
+            return
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"Job worker {self.worker_id} stopped")
+
+    async def _run_loop(self, slot: int):
+        # Background jobs only fill capacity interactive callers leave idle
+        current_priority.set(PRIORITY_BULK)
+        while not self._stopping.is_set():
+            try:
+                if slot == 0:
+                    await self.queue.fail_exhausted()
+                job = await self.queue.lease(self.worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {self.worker_id} failed to lease a job: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self.process(job)
+
+    async def process(self, job: Dict[str, Any]):
+        handler = self.handlers.get(job["type"])
+        if handler is None:
+            job["attempts"] = job["max_attempts"]
+            await self.queue.fail(job, self.worker_id, f"No handler for job type '{job['type']}'")
+            return
+
+        params = self.queue.job_params(job)
+        if params is None:
+            job["attempts"] = job["max_attempts"]
+            await self.queue.fail(job, self.worker_id, "The caller's API key is no longer held by this process; resubmit the job")
+            return
+
+        logger.info(f"Running {job['type']} job {job['_id']} (attempt {job['attempts']}/{job['max_attempts']})")
+        heartbeat = asyncio.ensure_future(self._heartbeat(job["_id"]))
+        try:
+            result_id, summary = await handler(params)
+        except asyncio.CancelledError:
+            # Leave the lease to expire so another worker picks the job up
+            raise
+        except Exception as e:
+            await self._safely(self.queue.fail(job, self.worker_id, str(e)))
+        else:
+            if await self._safely(self.queue.complete(job["_id"], self.worker_id, result_id, summary)):
+                logger.info(f"Job {job['_id']} succeeded")
+            else:
+                logger.warning(f"Job {job['_id']} finished after its lease was lost")
+        finally:
+            heartbeat.cancel()
+
+    async def _heartbeat(self, job_id: str):
+        interval = max(1.0, self.queue.visibility_timeout / 3)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                if not await self.queue.extend_lease(job_id, self.worker_id):
+                    logger.warning(f"Lost lease on job {job_id}")
+                    return
+            except Exception as e:
+                logger.warning(f"Failed to extend lease on job {job_id}: {e}")
+
+    async def _safely(self, operation: Awaitable[bool]) -> bool:
+        try:
+            return await operation
+        except Exception as e:
+            logger.error(f"Job queue update failed: {e}")
+            return False
+
+
+job_worker = JobWorker()
+
+
+async def _run_standalone():
+    await mongodb_service.connect()
+    await job_queue.ensure_indexes()
+    await job_queue.start()
+    await tavily_service.start()
+    await job_worker.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await job_worker.stop()
+        await job_queue.stop()
+        await tavily_service.close()
+        await mongodb_service.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    try:
+        asyncio.run(_run_standalone())
+    except KeyboardInterrupt:
+        pass
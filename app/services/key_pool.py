@@ -0,0 +1,146 @@
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.rate_limiter import RateLimiter, mask_key
+
+logger = logging.getLogger(__name__)
+
+THROUGHPUT_WINDOW = 60.0
+
+
+class PooledKey:
+    def __init__(self, api_key: str):
+        self.api_key = api_key
+        self.hint = mask_key(api_key)
+        self.in_flight = 0
+        self.last_selected = 0.0
+        self.cooldown_until = 0.0
+        self.cooldown_reason: Optional[str] = None
+        self.completed: Deque[float] = deque()
+        self.stats = {
+            "requests": 0,
+            "successes": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "unauthorized": 0
+        }
+
+    def cooling_down(self, now: float) -> bool:
+        return now < self.cooldown_until
+
+    def throughput(self, now: float) -> float:
+        while self.completed and now - self.completed[0] > THROUGHPUT_WINDOW:
+            self.completed.popleft()
+        return len(self.completed) / THROUGHPUT_WINDOW
+
+    def snapshot(self, now: float) -> Dict[str, Any]:
+        return {
+            "key_hint": self.hint,
+            "available": not self.cooling_down(now),
+            "cooldown_remaining": round(max(0.0, self.cooldown_until - now), 1),
+            "cooldown_reason": self.cooldown_reason if self.cooling_down(now) else None,
+            "in_flight": self.in_flight,
+            "throughput_per_second": round(self.throughput(now), 3),
+            **self.stats
+        }
+
+
+class KeyPool:
+    def __init__(
+        self,
+        keys: Optional[List[str]] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        rate_limited_cooldown: Optional[float] = None,
+        unauthorized_cooldown: Optional[float] = None
+    ):
+        keys = keys if keys is not None else settings.tavily_api_keys_list
+        self.keys: Dict[str, PooledKey] = {key: PooledKey(key) for key in keys}
+        self.rate_limiter = rate_limiter
+        self.rate_limited_cooldown = (
+            rate_limited_cooldown if rate_limited_cooldown is not None else settings.TAVILY_KEY_COOLDOWN_RATE_LIMITED
+        )
+        self.unauthorized_cooldown = (
+            unauthorized_cooldown if unauthorized_cooldown is not None else settings.TAVILY_KEY_COOLDOWN_UNAUTHORIZED
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, api_key: str) -> bool:
+        return api_key in self.keys
+
+    def _headroom(self, key: PooledKey, operation: str) -> float:
+        if self.rate_limiter is None:
+            return 0.0
+        return self.rate_limiter.available(key.api_key, operation)
+
+    def select(self, operation: str, exclude: Optional[set] = None) -> str:
+        if not self.keys:
+            raise ValueError("Tavily API key is not configured. Please provide one or set it in your .env file")
+
+        now = time.monotonic()
+        candidates = [key for key in self.keys.values() if not exclude or key.api_key not in exclude]
+        if not candidates:
+            candidates = list(self.keys.values())
+
+        ready = [key for key in candidates if not key.cooling_down(now)]
+        if not ready:
+            # Every key is cooling down: use the one that recovers first rather than failing outright
+            chosen = min(candidates, key=lambda key: key.cooldown_until)
+            logger.warning(f"All Tavily keys are cooling down, using {chosen.hint}")
+            return chosen.api_key
+
+        # Most remaining rate budget first, then the least busy, then the least recently used key
+        chosen = max(ready, key=lambda key: (self._headroom(key, operation), -key.in_flight, -key.last_selected))
+        chosen.last_selected = now
+        return chosen.api_key
+
+    def begin(self, api_key: str):
+        key = self.keys.get(api_key)
+        if key is not None:
+            key.in_flight += 1
+            key.stats["requests"] += 1
+
+    def record_success(self, api_key: str):
+        key = self.keys.get(api_key)
+        if key is None:
+            return
+        key.in_flight -= 1
+        key.stats["successes"] += 1
+        key.completed.append(time.monotonic())
+
+    def release(self, api_key: str):
+        # The call was abandoned (hedge loser, deadline, client gone): nothing is known about the key
+        key = self.keys.get(api_key)
+        if key is not None:
+            key.in_flight -= 1
+
+    def record_failure(self, api_key: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        key = self.keys.get(api_key)
+        if key is None:
+            return
+        key.in_flight -= 1
+        key.stats["errors"] += 1
+        if status_code == 429:
+            key.stats["rate_limited"] += 1
+            self._cool_down(key, max(retry_after or 0.0, self.rate_limited_cooldown), "rate_limited")
+        elif status_code == 401:
+            key.stats["unauthorized"] += 1
+            self._cool_down(key, self.unauthorized_cooldown, "unauthorized")
+
+    def _cool_down(self, key: PooledKey, seconds: float, reason: str):
+        key.cooldown_until = max(key.cooldown_until, time.monotonic() + seconds)
+        key.cooldown_reason = reason
+        logger.warning(f"Taking Tavily key {key.hint} out of rotation for {seconds:.0f}s ({reason})")
+
+    def get_state(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        keys = [key.snapshot(now) for key in self.keys.values()]
+        return {
+            "size": len(keys),
+            "available": sum(1 for key in keys if key["available"]),
+            "keys": keys
+        }
@@ -0,0 +1,57 @@
+import logging
+from typing import Any, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.services.hedging import LatencyTracker
+
+logger = logging.getLogger(__name__)
+
+DEGRADED_DEPTH = "depth"
+DEGRADED_CACHE = "cache"
+
+
+class DepthLatencyModel:
+    def __init__(
+        self,
+        quantile: Optional[float] = None,
+        priors: Optional[Dict[str, float]] = None,
+        window: Optional[int] = None,
+        min_samples: Optional[int] = None
+    ):
+        self.quantile = quantile if quantile is not None else settings.SEARCH_DEADLINE_QUANTILE
+        self.priors = priors if priors is not None else settings.SEARCH_DEPTH_LATENCY_PRIORS
+        self.window = window if window is not None else settings.SEARCH_LATENCY_WINDOW
+        self.min_samples = max(1, min_samples if min_samples is not None else settings.SEARCH_LATENCY_MIN_SAMPLES)
+        self.trackers: Dict[str, LatencyTracker] = {}
+
+    def record(self, depth: str, latency: float):
+        if depth not in self.trackers:
+            self.trackers[depth] = LatencyTracker(self.window)
+        self.trackers[depth].record(latency)
+
+    def estimate(self, depth: str) -> float:
+        tracker = self.trackers.get(depth)
+        if tracker is None or len(tracker.samples) < self.min_samples:
+            return self.priors.get(depth, max(self.priors.values(), default=0.0))
+        return tracker.percentile(self.quantile)
+
+    def choose_depth(self, requested: str, remaining: float) -> Tuple[str, Optional[str]]:
+        if requested != "basic" and self.estimate(requested) > remaining:
+            return "basic", DEGRADED_DEPTH
+        return requested, None
+
+    def budget_spent(self, remaining: float) -> bool:
+        return self.estimate("basic") > remaining
+
+    def get_state(self) -> Dict[str, Any]:
+        depths = set(self.priors) | set(self.trackers)
+        return {
+            "quantile": self.quantile,
+            "depths": {
+                depth: {
+                    "estimate": round(self.estimate(depth), 3),
+                    "samples": len(self.trackers[depth].samples) if depth in self.trackers else 0
+                }
+                for depth in sorted(depths)
+            }
+        }
@@ -1,12 +1,77 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import List, Dict, Any, Optional
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from pymongo.write_concern import WriteConcern
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import logging
 from datetime import datetime, timedelta
 
 from app.core.config import settings
+from app.services.rollups import (
+    DEFAULT_TYPE,
+    GRANULARITY_ALL,
+    GRANULARITY_DAY,
+    GRANULARITY_HOUR,
+    bucket_start,
+    naive_utc,
+    range_buckets,
+    rollup_id,
+    rollup_increments,
+    summarize_rollups
+)
+from app.services.content_refs import CONTENT_FIELDS, CONTENT_REF_PATHS, dehydrate, hydrate, referenced_hashes
+from app.services.compression import (
+    compress_fields,
+    compress_text,
+    decompress_fields,
+    decompress_text,
+    is_compressed,
+    resolve_codec
+)
+from app.services.pagination import RESULT_SORT, encode_cursor, results_filter
 
 logger = logging.getLogger(__name__)
 
+RESULT_INDEXES = [
+    # _id is part of the key so keyset pages (sorted by timestamp then _id) are read straight off the index
+    IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)], name="timestamp_id_desc"),
+    IndexModel([("type", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="type_timestamp_id"),
+    IndexModel([("results.url", ASCENDING)], name="result_urls"),
+    IndexModel(
+        [("query", TEXT), ("results.title", TEXT)],
+        name="query_text",
+        weights={"query": 10, "results.title": 2}
+    ),
+    # Lets the orphaned-content sweep check a batch of hashes without scanning the results
+    *(
+        IndexModel([(path, ASCENDING)], name=path.replace(".", "_"), sparse=True)
+        for path in CONTENT_REF_PATHS
+    ),
+]
+
+# Set by the retention job once a result is archived; the TTL monitor deletes it when the time passes.
+# Created on its own so a conflict among the other indexes cannot leave retention without it.
+RETENTION_TTL_INDEX = IndexModel([("expire_at", ASCENDING)], name="retention_ttl", expireAfterSeconds=0)
+
+INDEX_STAGES = {"IXSCAN", "TEXT", "TEXT_MATCH", "TEXT_OR", "COUNT_SCAN", "DISTINCT_SCAN", "IDHACK", "EXPRESS_IXSCAN"}
+
+
+def plan_index_usage(plan: Dict[str, Any]) -> Tuple[bool, Optional[str]]:
+    """Walk an explain() winning plan and report whether it reads an index, and which."""
+    stack = [plan]
+    while stack:
+        stage = stack.pop()
+        if stage.get("stage") in INDEX_STAGES:
+            return True, stage.get("indexName")
+        if "queryPlan" in stage:
+            stack.append(stage["queryPlan"])
+        if "inputStage" in stage:
+            stack.append(stage["inputStage"])
+        stack.extend(stage.get("inputStages", []))
+    return False, None
+
 
 class MongoDBService:
     _instance = None
@@ -22,8 +87,15 @@ class MongoDBService:
             self.uri = settings.MONGODB_URI
             self.db_name = settings.MONGODB_DB_NAME
             self.collection_name = settings.MONGODB_COLLECTION
+            self.cache_collection_name = settings.MONGODB_CACHE_COLLECTION
+            self.ledger_collection_name = settings.MONGODB_LEDGER_COLLECTION
+            self.crawl_state_collection_name = settings.MONGODB_CRAWL_STATE_COLLECTION
+            self.content_collection_name = settings.MONGODB_CONTENT_COLLECTION
+            self.stats_collection_name = settings.MONGODB_STATS_COLLECTION
+            self.compression_codec = resolve_codec(settings.CONTENT_COMPRESSION_CODEC)
             self.db = None
             self.collection = None
+            self.cache_collection = None
             self.initialized = True
     
     async def connect(self):
@@ -37,6 +109,10 @@ class MongoDBService:
                 
                 self.db = self._client[self.db_name]
                 self.collection = self.db[self.collection_name]
+                self.cache_collection = self.db[self.cache_collection_name]
+                
+                await self._ensure_cache_ttl()
+                await self.ensure_indexes()
                 
                 logger.info(f" Connected to MongoDB database: {self.db_name}")
                 
@@ -44,11 +120,75 @@ class MongoDBService:
                 logger.error(f"Failed to connect to MongoDB: {e}")
                 raise
     
+    async def _ensure_cache_ttl(self):
+        ttl = settings.SEARCH_CACHE_TTL_SECONDS
+        try:
+            await self.cache_collection.create_index("cached_at", expireAfterSeconds=ttl)
+        except OperationFailure:
+            # The index exists with the previous TTL: change it in place instead of failing the connection
+            await self.db.command(
+                "collMod",
+                self.cache_collection_name,
+                index={"keyPattern": {"cached_at": 1}, "expireAfterSeconds": ttl}
+            )
+            logger.info(f"Updated search cache TTL to {ttl}s")
+
+    async def ensure_indexes(self):
+        try:
+            created = await self.collection.create_indexes(RESULT_INDEXES)
+            logger.info(f"Ensured result indexes: {', '.join(created)}")
+        except OperationFailure as e:
+            # Typically an older index with the same keys or a second text index; queries still work, only slower
+            logger.warning(f"Could not create result indexes: {e}")
+        try:
+            await self.collection.create_indexes([RETENTION_TTL_INDEX])
+        except OperationFailure as e:
+            logger.error(f"Could not create the retention TTL index, retention will not run: {e}")
+        try:
+            await self.db[self.stats_collection_name].create_index(
+                [("granularity", ASCENDING), ("bucket", ASCENDING)]
+            )
+        except OperationFailure as e:
+            logger.warning(f"Could not create the stats rollup index: {e}")
+
+    async def has_retention_ttl(self) -> bool:
+        indexes = await self.collection.index_information()
+        return any(
+            [field for field, _ in spec["key"]] == ["expire_at"] and "expireAfterSeconds" in spec
+            for spec in indexes.values()
+        )
+
+    async def explain_query_plans(self) -> Dict[str, Dict[str, Any]]:
+        """Run explain() for each stored-result query pattern and report the index it uses."""
+        since = datetime.utcnow() - timedelta(days=1)
+        patterns = {
+            "recent_results": self.collection.find().sort("timestamp", -1).limit(10),
+            "recent_by_type": self.collection.find({"type": "crawl"}).sort("timestamp", -1).limit(10),
+            "stats_window": self.collection.find({"timestamp": {"$gte": since}}),
+            "results_page": self.collection.find(results_filter("crawl", start=since)).sort(RESULT_SORT).limit(100),
+            "search_by_query": self.collection.find(
+                {"$text": {"$search": "example"}},
+                {"score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"})]).limit(10),
+            "results_by_url": self.collection.find({"results.url": "https://example.com/"}).limit(10),
+        }
+        report = {}
+        for name, cursor in patterns.items():
+            explanation = await cursor.explain()
+            uses_index, index_name = plan_index_usage(explanation["queryPlanner"]["winningPlan"])
+            report[name] = {"uses_index": uses_index, "index": index_name}
+            if not uses_index:
+                logger.warning(f"Query pattern '{name}' is not using an index")
+        return report
+
     async def close(self):
 
         if self._client:
             self._client.close()
             self._client = None
+            self.db = None
+            self.collection = None
+            self.cache_collection = None
             logger.info("MongoDB connection closed")
     
     async def insert_search_result(self, result: Dict[str, Any]) -> str:
@@ -57,7 +197,9 @@ class MongoDBService:
             if "timestamp" not in result:
                 result["timestamp"] = datetime.utcnow()
             
-            insert_result = await self.collection.insert_one(result)
+            stored = (await self._prepare_documents([result]))[0]
+            insert_result = await self.collection.insert_one(stored)
+            await self._record_rollups([stored])
             logger.info(f"Inserted search result for query: '{result.get('query', 'unknown')}'")
             return str(insert_result.inserted_id)
             
@@ -75,7 +217,9 @@ class MongoDBService:
                 if "timestamp" not in result:
                     result["timestamp"] = datetime.utcnow()
             
-            insert_result = await self.collection.insert_many(results)
+            stored = await self._prepare_documents(results)
+            insert_result = await self.collection.insert_many(stored)
+            await self._record_rollups(stored)
             inserted_ids = [str(id) for id in insert_result.inserted_ids]
             logger.info(f" Inserted {len(inserted_ids)} search results into MongoDB")
             return inserted_ids
@@ -84,10 +228,160 @@ class MongoDBService:
             logger.error(f"Error inserting batch results: {e}")
             raise
     
-    async def get_all_results(self, limit: int = 10) -> List[Dict[str, Any]]:
+    async def insert_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        write_concern: Optional[WriteConcern] = None
+    ) -> int:
+        """Unordered bulk insert of already-stamped documents; returns how many were written."""
+        if not documents:
+            return 0
+        collection = self.collection.with_options(write_concern=write_concern) if write_concern else self.collection
+        try:
+            documents = await self._prepare_documents(documents, write_concern)
+            insert_result = await collection.insert_many(documents, ordered=False)
+            await self._record_rollups(documents)
+            return len(insert_result.inserted_ids)
+        except BulkWriteError as e:
+            # Unordered: everything but the failed documents was still written
+            written = e.details.get("nInserted", 0)
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            await self._record_rollups([doc for index, doc in enumerate(documents) if index not in failed])
+            logger.error(f"Bulk insert wrote {written} of {len(documents)} documents: {e.details.get('writeErrors', [])[:3]}")
+            return written
+        except Exception as e:
+            logger.error(f"Error inserting documents: {e}")
+            raise
+    
+    async def _store_content(self, bodies: Dict[str, str], write_concern: Optional[WriteConcern] = None):
+        if not bodies:
+            return
+        collection = self.db[self.content_collection_name]
+        if write_concern:
+            collection = collection.with_options(write_concern=write_concern)
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": digest},
+                {
+                    "$setOnInsert": {"body": self._encode_body(body), "size": len(body), "created_at": now},
+                    # Refreshed on every write so the orphan sweep never removes a body a new result is about to use
+                    "$set": {"stored_at": now}
+                },
+                upsert=True
+            )
+            for digest, body in bodies.items()
+        ]
+        try:
+            await collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            # Two writers upserting the same new hash: one gets a duplicate key, the body is stored either way
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+
+    def _encode_body(self, body: str) -> Any:
+        if self.compression_codec == "none" or len(body) < settings.CONTENT_COMPRESSION_MIN_CHARS:
+            return body
+        return compress_text(body, self.compression_codec, settings.CONTENT_COMPRESSION_LEVEL)
+
+    async def _prepare_documents(
+        self,
+        documents: List[Dict[str, Any]],
+        write_concern: Optional[WriteConcern] = None
+    ) -> List[Dict[str, Any]]:
+        """Store page bodies once in the content collection and compress whatever large content stays inline."""
+        if settings.CONTENT_DEDUP_ENABLED:
+            stored_documents = []
+            bodies: Dict[str, str] = {}
+            for document in documents:
+                stored, document_bodies = dehydrate(document, settings.CONTENT_DEDUP_MIN_CHARS)
+                stored_documents.append(stored)
+                bodies.update(document_bodies)
+            # Bodies first, so a reader never sees a reference it cannot resolve
+            await self._store_content(bodies, write_concern)
+            documents = stored_documents
+        return [
+            compress_fields(
+                document,
+                self.compression_codec,
+                settings.CONTENT_COMPRESSION_MIN_CHARS,
+                settings.CONTENT_COMPRESSION_LEVEL
+            )
+            for document in documents
+        ]
+
+    async def _load_content(self, documents: List[Dict[str, Any]], include_content: bool):
+        # Only documents actually returned, and only when their content is wanted, pay for decompression
+        decompress_fields(documents, keep=include_content)
+        if include_content:
+            await self.join_content(documents)
+
+    async def join_content(self, documents: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        hashes = referenced_hashes(documents)
+        if not hashes:
+            return documents
+        cursor = self.db[self.content_collection_name].find({"_id": {"$in": list(hashes)}}, {"body": 1})
+        bodies = {
+            doc["_id"]: decompress_text(doc["body"]) if is_compressed(doc["body"]) else doc["body"]
+            async for doc in cursor
+        }
+        missing = len(hashes) - len(bodies)
+        if missing:
+            logger.warning(f"{missing} referenced page bodies are missing from {self.content_collection_name}")
+        return hydrate(documents, bodies)
+
+    async def migrate_content_refs(
+        self,
+        batch_size: int = 200,
+        limit: Optional[int] = None,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """Convert stored results that still embed page bodies to content references."""
+        paths = list(CONTENT_FIELDS) + [f"results.{field}" for field in CONTENT_FIELDS]
+        embedded = {"$or": [{path: {"$type": "string"}} for path in paths]}
+        stats = {"scanned": 0, "converted": 0, "bodies": 0, "embedded_chars": 0, "unique_chars": 0}
+        seen_hashes = set()
+        last_id = None
+        while limit is None or stats["scanned"] < limit:
+            query = {**embedded, "_id": {"$gt": last_id}} if last_id is not None else embedded
+            size = batch_size if limit is None else min(batch_size, limit - stats["scanned"])
+            batch = await self.collection.find(query).sort("_id", 1).limit(size).to_list(length=size)
+            if not batch:
+                break
+            last_id = batch[-1]["_id"]
+            stats["scanned"] += len(batch)
+
+            bodies: Dict[str, str] = {}
+            replacements = []
+            for document in batch:
+                stored, document_bodies = dehydrate(document, settings.CONTENT_DEDUP_MIN_CHARS)
+                if stored is document:
+                    continue
+                replacements.append(ReplaceOne({"_id": document["_id"]}, stored))
+                stats["embedded_chars"] += sum(len(body) for body in document_bodies.values())
+                bodies.update(document_bodies)
+            new_hashes = set(bodies) - seen_hashes
+            seen_hashes.update(new_hashes)
+            stats["bodies"] += len(new_hashes)
+            stats["unique_chars"] += sum(len(bodies[digest]) for digest in new_hashes)
+            stats["converted"] += len(replacements)
+            if replacements and not dry_run:
+                await self._store_content(bodies)
+                await self.collection.bulk_write(replacements, ordered=False)
+            logger.info(f"Content migration: {stats['converted']} of {stats['scanned']} documents converted")
+        return stats
+
+    async def get_all_results(
+        self,
+        limit: int = 10,
+        result_type: Optional[str] = None,
+        include_content: bool = True
+    ) -> List[Dict[str, Any]]:
         try:
-            cursor = self.collection.find().sort("timestamp", -1).limit(limit)
+            query = {"type": result_type} if result_type else {}
+            cursor = self.collection.find(query).sort("timestamp", -1).limit(limit)
             results = await cursor.to_list(length=limit)
+            await self._load_content(results, include_content)
             
             for result in results:
                 if "_id" in result:
@@ -100,37 +394,281 @@ class MongoDBService:
             logger.error(f"Error retrieving results: {e}")
             raise
     
-    async def get_stats(self) -> Dict[str, Any]:
+    async def get_results_page(
+        self,
+        limit: int = 10,
+        cursor: Optional[str] = None,
+        result_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        include_content: bool = True
+    ) -> Dict[str, Any]:
+        """One keyset page of stored results, newest first, with the cursor for the next page."""
+        query = results_filter(result_type, start, end, cursor)
+        try:
+            # One extra row tells whether another page exists without a count query
+            documents = await self.collection.find(query).sort(RESULT_SORT).limit(limit + 1).to_list(length=limit + 1)
+            has_more = len(documents) > limit
+            documents = documents[:limit]
+            next_cursor = encode_cursor(documents[-1]) if has_more else None
+            await self._load_content(documents, include_content)
+            
+            for document in documents:
+                document["_id"] = str(document["_id"])
+            
+            logger.info(f"Retrieved page of {len(documents)} results from MongoDB")
+            return {"results": documents, "next_cursor": next_cursor}
+            
+        except Exception as e:
+            logger.error(f"Error retrieving results page: {e}")
+            raise
+
+    async def iter_results(
+        self,
+        result_type: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        include_content: bool = True,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream matching results in batches straight off one server cursor; memory stays at one batch."""
+        batch_size = batch_size or settings.RESULTS_EXPORT_BATCH_SIZE
+        cursor = self.collection.find(results_filter(result_type, start, end)).sort(RESULT_SORT).batch_size(batch_size)
+        batch = []
+        try:
+            async for document in cursor:
+                document["_id"] = str(document["_id"])
+                batch.append(document)
+                if len(batch) >= batch_size:
+                    await self._load_content(batch, include_content)
+                    yield batch
+                    batch = []
+            if batch:
+                await self._load_content(batch, include_content)
+                yield batch
+        finally:
+            # Release the server-side cursor when the client disconnects mid-export
+            await cursor.close()
+
+    async def find_expirable(self, result_type: str, cutoff: datetime, limit: int) -> List[Dict[str, Any]]:
+        """Oldest results of a type stored before `cutoff` and not yet handed to the TTL index, with content joined."""
+        type_filter = {"$in": [None, DEFAULT_TYPE]} if result_type == DEFAULT_TYPE else result_type
+        documents = await self.collection.find({
+            "type": type_filter,
+            "timestamp": {"$lt": cutoff},
+            "expire_at": {"$exists": False}
+        }).sort("timestamp", 1).limit(limit).to_list(length=limit)
+        await self._load_content(documents, include_content=True)
+        return documents
+
+    async def mark_expiring(self, ids: List[ObjectId], expire_at: datetime) -> int:
+        result = await self.collection.update_many({"_id": {"$in": ids}}, {"$set": {"expire_at": expire_at}})
+        return result.modified_count
+
+    async def sweep_orphaned_content(self, older_than: datetime, batch_size: int = 500) -> int:
+        """Delete page bodies last stored before `older_than` that no result references any more."""
+        content = self.db[self.content_collection_name]
+        stale = {"$or": [
+            {"stored_at": {"$lt": older_than}},
+            {"stored_at": {"$exists": False}, "created_at": {"$lt": older_than}}
+        ]}
+        removed = 0
+        last_hash = None
+        while True:
+            query = {**stale, "_id": {"$gt": last_hash}} if last_hash else stale
+            hashes = [doc["_id"] async for doc in content.find(query, {"_id": 1}).sort("_id", ASCENDING).limit(batch_size)]
+            if not hashes:
+                break
+            last_hash = hashes[-1]
+            referenced = set()
+            for path in CONTENT_REF_PATHS:
+                referenced.update(await self.collection.distinct(path, {path: {"$in": hashes}}))
+            orphans = [digest for digest in hashes if digest not in referenced]
+            if orphans:
+                # The age filter again: a body re-stored since the check is in use
+                result = await content.delete_many({**stale, "_id": {"$in": orphans}})
+                removed += result.deleted_count
+        if removed:
+            logger.info(f"Removed {removed} orphaned page bodies from {self.content_collection_name}")
+        return removed
+
+    async def restore_documents(self, documents: List[Dict[str, Any]], expire_at: datetime) -> int:
+        """Re-import archived results under their original _id; re-running over the same range is harmless."""
+        if not documents:
+            return 0
+        documents = await self._prepare_documents([{**document, "expire_at": expire_at} for document in documents])
+        operations = [ReplaceOne({"_id": document["_id"]}, document, upsert=True) for document in documents]
+        # Rollups are left alone: the hour/day buckets never lost these results and the reconciler recounts totals
+        result = await self.collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    async def _record_rollups(self, documents: List[Dict[str, Any]]):
+        if not documents:
+            return
+        operations = [
+            UpdateOne(
+                {"_id": rollup_id(granularity, bucket, result_type)},
+                {
+                    "$inc": {"count": count},
+                    "$setOnInsert": {"granularity": granularity, "bucket": bucket, "type": result_type}
+                },
+                upsert=True
+            )
+            for (granularity, bucket, result_type), count in rollup_increments(documents).items()
+        ]
+        try:
+            await self.db[self.stats_collection_name].bulk_write(operations, ordered=False)
+        except Exception as e:
+            # The documents are written; the reconciler repairs the counters
+            logger.warning(f"Failed to update stats rollups: {e}")
 
+    async def get_stats(
+        self,
+        by_type: bool = False,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        granularity: str = GRANULARITY_HOUR
+    ) -> Dict[str, Any]:
+        """Answer from the rollup counters: a handful of documents however large the collection is."""
+        if granularity not in (GRANULARITY_HOUR, GRANULARITY_DAY):
+            raise ValueError(f"Unknown granularity '{granularity}', use 'hour' or 'day'")
+        rollups = self.db[self.stats_collection_name]
+        now = datetime.utcnow()
         try:
-            total_count = await self.collection.count_documents({})
-            yesterday = datetime.utcnow() - timedelta(days=1)
-            recent_count = await self.collection.count_documents({
-                "timestamp": {"$gte": yesterday}
-            })
+            totals = {doc["type"]: doc["count"] async for doc in rollups.find({"granularity": GRANULARITY_ALL})}
+            # Hour buckets, so "last 24h" includes up to an hour more than exactly 24 hours
+            yesterday = now - timedelta(days=1)
+            recent_rows = await rollups.find({
+                "granularity": GRANULARITY_HOUR,
+                "bucket": {"$gte": bucket_start(yesterday, GRANULARITY_HOUR)}
+            }).to_list(length=None)
+            recent_by_type, _ = summarize_rollups(recent_rows, [])
             
             stats = {
-                "total_results": total_count,
-                "results_last_24h": recent_count,
+                "total_results": sum(totals.values()),
+                "results_last_24h": sum(recent_by_type.values()),
                 "database": self.db_name,
                 "collection": self.collection_name
             }
+            if by_type:
+                stats["by_type"] = {
+                    result_type: {"total": totals.get(result_type, 0), "last_24h": recent_by_type.get(result_type, 0)}
+                    for result_type in sorted(set(totals) | set(recent_by_type))
+                }
             
-            logger.info(f"Stats: {total_count} total, {recent_count} in last 24h")
+            if start or end:
+                end = naive_utc(end) or now
+                start = naive_utc(start) or end - (timedelta(days=1) if granularity == GRANULARITY_HOUR else timedelta(days=30))
+                buckets = range_buckets(start, end, granularity)
+                if len(buckets) > settings.STATS_MAX_RANGE_BUCKETS:
+                    raise ValueError(
+                        f"Range spans {len(buckets)} {granularity} buckets, the maximum is {settings.STATS_MAX_RANGE_BUCKETS}"
+                    )
+                rows = await rollups.find({
+                    "granularity": granularity,
+                    "bucket": {"$gte": bucket_start(start, granularity), "$lt": end}
+                }).to_list(length=None)
+                range_by_type, series = summarize_rollups(rows, buckets)
+                stats["range"] = {
+                    "start": start,
+                    "end": end,
+                    "granularity": granularity,
+                    "count": sum(range_by_type.values()),
+                    "series": series
+                }
+                if by_type:
+                    stats["range"]["by_type"] = range_by_type
+            
+            logger.info(f"Stats: {stats['total_results']} total, {stats['results_last_24h']} in last 24h")
             return stats
             
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
             raise
+
+    async def reconcile_rollups(self, days: int) -> Dict[str, int]:
+        """Recount closed hour/day buckets of the last `days` days and the per-type totals from the results."""
+        now = datetime.utcnow()
+        current_hour = bucket_start(now, GRANULARITY_HOUR)
+        today = bucket_start(now, GRANULARITY_DAY)
+        window_start = today - timedelta(days=days)
+        type_expr = {"$ifNull": ["$type", DEFAULT_TYPE]}
+        rollups = self.db[self.stats_collection_name]
+
+        actual: Dict[tuple, int] = {}
+        cursor = self.collection.aggregate([
+            {"$match": {"timestamp": {"$gte": window_start, "$lt": current_hour}}},
+            {"$group": {
+                "_id": {
+                    "type": type_expr,
+                    "hour": {"$dateToString": {"format": "%Y-%m-%dT%H:00:00", "date": "$timestamp"}}
+                },
+                "count": {"$sum": 1}
+            }}
+        ])
+        async for doc in cursor:
+            hour = datetime.fromisoformat(doc["_id"]["hour"])
+            result_type = doc["_id"]["type"]
+            actual[(GRANULARITY_HOUR, hour, result_type)] = doc["count"]
+            # Today's day bucket is still open and keeps its incremental count
+            if hour < today:
+                key = (GRANULARITY_DAY, bucket_start(hour, GRANULARITY_DAY), result_type)
+                actual[key] = actual.get(key, 0) + doc["count"]
+        async for doc in self.collection.aggregate([{"$group": {"_id": type_expr, "count": {"$sum": 1}}}]):
+            actual[(GRANULARITY_ALL, None, doc["_id"])] = doc["count"]
+
+        recorded: Dict[tuple, int] = {}
+        async for doc in rollups.find({"$or": [
+            {"granularity": GRANULARITY_HOUR, "bucket": {"$gte": window_start, "$lt": current_hour}},
+            {"granularity": GRANULARITY_DAY, "bucket": {"$gte": window_start, "$lt": today}},
+            {"granularity": GRANULARITY_ALL}
+        ]}):
+            recorded[(doc["granularity"], doc["bucket"], doc["type"])] = doc["count"]
+
+        operations = []
+        for key in set(actual) | set(recorded):
+            count = actual.get(key, 0)
+            if recorded.get(key) == count:
+                continue
+            granularity, bucket, result_type = key
+            operations.append(UpdateOne(
+                {"_id": rollup_id(granularity, bucket, result_type)},
+                {"$set": {"granularity": granularity, "bucket": bucket, "type": result_type, "count": count}},
+                upsert=True
+            ))
+        if operations:
+            await rollups.bulk_write(operations, ordered=False)
+            logger.info(f"Stats reconciler corrected {len(operations)} rollup counters")
+        return {"checked": len(set(actual) | set(recorded)), "corrected": len(operations)}
+    
+    async def get_result_by_id(self, result_id: str, include_content: bool = True) -> Optional[Dict[str, Any]]:
+        try:
+            result = await self.collection.find_one({"_id": ObjectId(result_id)})
+            if result:
+                await self._load_content([result], include_content)
+        except InvalidId:
+            return None
+        except Exception as e:
+            logger.error(f"Error retrieving result {result_id}: {e}")
+            raise
+        
+        if result and "_id" in result:
+            result["_id"] = str(result["_id"])
+        return result
     
-    async def search_by_query(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    async def search_by_query(self, query: str, limit: int = 10, include_content: bool = True) -> List[Dict[str, Any]]:
 
         try:
+            # Word match on the text index, best matches first; newer results break ties
             cursor = self.collection.find(
-                {"query": {"$regex": query, "$options": "i"}}
-            ).sort("timestamp", -1).limit(limit)
+                {"$text": {"$search": query}},
+                {"score": {"$meta": "textScore"}}
+            ).sort([("score", {"$meta": "textScore"}), ("timestamp", -1)]).limit(limit)
             
             results = await cursor.to_list(length=limit)
+            await self._load_content(results, include_content)
             
             for result in results:
                 if "_id" in result:
@@ -142,13 +680,28 @@ class MongoDBService:
             logger.error(f"Error searching by query: {e}")
             raise
 
+    async def get_results_by_url(self, url: str, limit: int = 10, include_content: bool = True) -> List[Dict[str, Any]]:
+        try:
+            cursor = self.collection.find({"results.url": url}).sort("timestamp", -1).limit(limit)
+            results = await cursor.to_list(length=limit)
+            await self._load_content(results, include_content)
+        except Exception as e:
+            logger.error(f"Error retrieving results for URL {url}: {e}")
+            raise
+        
+        for result in results:
+            result["_id"] = str(result["_id"])
+        return results
+
     async def save_crawl_results(self, results: Dict[str, Any]) -> str:
         try:
             if "timestamp" not in results:
                 results["timestamp"] = datetime.utcnow()
             results["type"] = "crawl"
             
-            insert_result = await self.collection.insert_one(results)
+            stored = (await self._prepare_documents([results]))[0]
+            insert_result = await self.collection.insert_one(stored)
+            await self._record_rollups([stored])
             logger.info(f"Inserted crawl results for base URL: {results.get('base_url')}")
             return str(insert_result.inserted_id)
         except Exception as e:
@@ -161,11 +714,127 @@ class MongoDBService:
             results["type"] = "map"
             
             insert_result = await self.collection.insert_one(results)
+            await self._record_rollups([results])
             logger.info(f"Inserted map results for base URL: {results.get('base_url')}")
             return str(insert_result.inserted_id)
         except Exception as e:
             logger.error(f"Error saving map results: {e}")
             raise
 
+    async def get_crawl_fingerprints(self, state_key: str) -> Optional[Dict[str, Any]]:
+        try:
+            document = await self.db[self.crawl_state_collection_name].find_one({"_id": state_key})
+        except Exception as e:
+            logger.error(f"Error reading crawl fingerprints: {e}")
+            raise
+        if document is None:
+            return None
+        return {
+            "pages": {page["url"]: page["hash"] for page in document.get("pages", [])},
+            "crawled_at": document.get("crawled_at")
+        }
+
+    async def save_crawl_fingerprints(
+        self,
+        state_key: str,
+        root_url: str,
+        fingerprints: Dict[str, str],
+        crawled_at: datetime
+    ):
+        # URLs can contain dots, so pages are stored as a list rather than a URL-keyed map
+        try:
+            await self.db[self.crawl_state_collection_name].replace_one(
+                {"_id": state_key},
+                {
+                    "root_url": root_url,
+                    "pages": [{"url": url, "hash": digest} for url, digest in fingerprints.items()],
+                    "crawled_at": crawled_at
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error saving crawl fingerprints: {e}")
+            raise
+
+    async def get_cached_search(self, cache_key: str, min_cached_at: datetime) -> Optional[Dict[str, Any]]:
+        try:
+            return await self.cache_collection.find_one(
+                {"_id": cache_key, "cached_at": {"$gte": min_cached_at}},
+                {"_id": 0, "cached_at": 1, "result": 1}
+            )
+        except Exception as e:
+            logger.error(f"Error reading cached search: {e}")
+            raise
+
+    async def save_cached_search(self, cache_key: str, cached_at: datetime, result: Dict[str, Any]):
+        try:
+            await self.cache_collection.replace_one(
+                {"_id": cache_key},
+                {"cached_at": cached_at, "result": result},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error saving cached search: {e}")
+            raise
+
+
+    async def record_credit_usage(
+        self,
+        key_id: str,
+        key_hint: str,
+        operation: str,
+        at: datetime,
+        credits: float,
+        estimated: bool
+    ):
+        day = at.strftime("%Y-%m-%d")
+        try:
+            await self.db[self.ledger_collection_name].update_one(
+                {"_id": f"{key_id}:{operation}:{day}"},
+                {
+                    "$setOnInsert": {"key_id": key_id, "operation": operation, "day": day},
+                    "$set": {"key_hint": key_hint, "updated_at": at},
+                    "$inc": {
+                        "requests": 1,
+                        "credits": credits,
+                        "estimated_credits": credits if estimated else 0
+                    }
+                },
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Error recording credit usage: {e}")
+            raise
+
+    async def get_credit_usage(self, since: Optional[datetime] = None) -> List[tuple]:
+        match = {"day": {"$gte": since.strftime("%Y-%m-%d")}} if since else {}
+        try:
+            cursor = self.db[self.ledger_collection_name].aggregate([
+                {"$match": match},
+                {"$group": {
+                    "_id": {"key_id": "$key_id", "operation": "$operation"},
+                    "key_hint": {"$last": "$key_hint"},
+                    "requests": {"$sum": "$requests"},
+                    "credits": {"$sum": "$credits"},
+                    "estimated_credits": {"$sum": "$estimated_credits"}
+                }}
+            ])
+            rows = []
+            async for doc in cursor:
+                rows.append((
+                    doc["_id"]["key_id"],
+                    doc["key_hint"],
+                    doc["_id"]["operation"],
+                    {
+                        "requests": doc["requests"],
+                        "credits": doc["credits"],
+                        "estimated_credits": doc["estimated_credits"]
+                    }
+                ))
+            return rows
+        except Exception as e:
+            logger.error(f"Error reading credit usage: {e}")
+            raise
+
 
 mongodb_service = MongoDBService()
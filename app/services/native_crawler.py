@@ -0,0 +1,497 @@
+import asyncio
+import codecs
+import logging
+import re
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from html.parser import HTMLParser
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from app.core.config import settings
+from app.services.url_guard import UnsafeUrlError, UrlGuard, guarded_stream
+from app.services.url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+BLOCK_TAGS = HEADING_TAGS | {"p", "div", "li", "br", "tr", "section", "article", "header", "footer", "pre"}
+SKIP_TAGS = {"script", "style", "noscript", "template", "svg"}
+
+
+class PageParser(HTMLParser):
+    """Incremental HTML parser: fed chunk by chunk as the body streams in."""
+
+    def __init__(self, base_url: str, collect_text: bool, markdown: bool):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.collect_text = collect_text
+        self.markdown = markdown
+        self.links: List[str] = []
+        self.images: List[str] = []
+        self.favicon: Optional[str] = None
+        self.title = ""
+        self._text: List[str] = []
+        self._skip_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]):
+        attributes = dict(attrs)
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "base" and attributes.get("href"):
+            self.base_url = urljoin(self.base_url, attributes["href"])
+        elif tag == "a" and attributes.get("href"):
+            self.links.append(urljoin(self.base_url, attributes["href"]))
+        elif tag == "img" and attributes.get("src"):
+            self.images.append(urljoin(self.base_url, attributes["src"]))
+        elif tag == "link" and "icon" in (attributes.get("rel") or "").lower().split() and attributes.get("href"):
+            self.favicon = self.favicon or urljoin(self.base_url, attributes["href"])
+
+        if self.collect_text and tag in BLOCK_TAGS:
+            self._text.append("\n")
+            if self.markdown and tag in HEADING_TAGS:
+                self._text.append("#" * int(tag[1]) + " ")
+            elif self.markdown and tag == "li":
+                self._text.append("- ")
+
+    def handle_endtag(self, tag: str):
+        if tag in SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag == "title":
+            self._in_title = False
+        elif self.collect_text and tag in BLOCK_TAGS:
+            self._text.append("\n")
+
+    def handle_data(self, data: str):
+        if self._in_title:
+            self.title += data
+        elif self.collect_text and not self._skip_depth:
+            self._text.append(data)
+
+    @property
+    def text(self) -> str:
+        lines = (" ".join(line.split()) for line in "".join(self._text).splitlines())
+        return "\n".join(line for line in lines if line)
+
+
+def _disallow_all() -> RobotFileParser:
+    parser = RobotFileParser()
+    parser.disallow_all = True
+    return parser
+
+
+class RobotsCache:
+    def __init__(
+        self,
+        user_agent: str,
+        ttl: float,
+        guard: Optional[UrlGuard] = None,
+        max_entries: Optional[int] = None,
+        error_ttl: Optional[float] = None
+    ):
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self.guard = guard or UrlGuard()
+        self.max_entries = max_entries or settings.NATIVE_CRAWL_MAX_TRACKED_HOSTS
+        self.error_ttl = min(ttl, error_ttl if error_ttl is not None else settings.NATIVE_CRAWL_ROBOTS_ERROR_TTL)
+        # origin -> (expires_at, parser); least recently used origins are evicted past max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Optional[RobotFileParser]]]" = OrderedDict()
+        self._locks: "OrderedDict[str, asyncio.Lock]" = OrderedDict()
+
+    def _cached(self, origin: str) -> Tuple[bool, Optional[RobotFileParser]]:
+        entry = self._entries.get(origin)
+        if entry is None or time.monotonic() >= entry[0]:
+            return False, None
+        self._entries.move_to_end(origin)
+        return True, entry[1]
+
+    async def _parser(self, client: httpx.AsyncClient, origin: str) -> Optional[RobotFileParser]:
+        hit, parser = self._cached(origin)
+        if hit:
+            return parser
+
+        # One fetch per origin even when many pages of it are queued at once
+        lock = self._locks.setdefault(origin, asyncio.Lock())
+        self._locks.move_to_end(origin)
+        while len(self._locks) > self.max_entries:
+            self._locks.popitem(last=False)
+        async with lock:
+            hit, parser = self._cached(origin)
+            if hit:
+                return parser
+            ttl = self.ttl
+            try:
+                async with guarded_stream(client, f"{origin}/robots.txt", self.guard) as response:
+                    await response.aread()
+                if response.status_code == 200:
+                    parser = RobotFileParser()
+                    parser.parse(response.text.splitlines())
+                elif response.status_code in (401, 403):
+                    parser = _disallow_all()
+                elif response.status_code >= 500:
+                    # Server trouble is not permission: stay out until a retry succeeds
+                    logger.info(f"robots.txt for {origin} returned {response.status_code}, disallowing for now")
+                    parser, ttl = _disallow_all(), self.error_ttl
+            except UnsafeUrlError as e:
+                logger.warning(str(e))
+                parser = _disallow_all()
+            except httpx.HTTPError as e:
+                logger.info(f"Could not fetch robots.txt for {origin}, disallowing for now: {e}")
+                parser, ttl = _disallow_all(), self.error_ttl
+            self._entries[origin] = (time.monotonic() + ttl, parser)
+            self._entries.move_to_end(origin)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return parser
+
+    async def allowed(self, client: httpx.AsyncClient, url: str) -> bool:
+        parser = await self._parser(client, _origin(url))
+        return parser is None or parser.can_fetch(self.user_agent, url)
+
+    async def crawl_delay(self, client: httpx.AsyncClient, url: str) -> Optional[float]:
+        parser = await self._parser(client, _origin(url))
+        if parser is None:
+            return None
+        delay = parser.crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+    async def sitemaps(self, client: httpx.AsyncClient, url: str) -> List[str]:
+        parser = await self._parser(client, _origin(url))
+        return list(parser.site_maps() or []) if parser is not None else []
+
+
+def _decoder(encoding: Optional[str]) -> codecs.IncrementalDecoder:
+    try:
+        return codecs.getincrementaldecoder(encoding or "utf-8")(errors="replace")
+    except LookupError:
+        return codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _host(url: str) -> str:
+    return (urlsplit(url).hostname or "").lower()
+
+
+def _compile(patterns: Optional[List[str]]) -> List[re.Pattern]:
+    compiled = []
+    for pattern in patterns or []:
+        try:
+            compiled.append(re.compile(pattern))
+        except re.error as e:
+            raise ValueError(f"Invalid regex pattern '{pattern}': {e}")
+    return compiled
+
+
+class UrlFilter:
+    def __init__(
+        self,
+        root_url: str,
+        select_paths: Optional[List[str]] = None,
+        select_domains: Optional[List[str]] = None,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_domains: Optional[List[str]] = None,
+        allow_external: bool = False
+    ):
+        self.root_host = _host(root_url)
+        self.select_paths = _compile(select_paths)
+        self.select_domains = _compile(select_domains)
+        self.exclude_paths = _compile(exclude_paths)
+        self.exclude_domains = _compile(exclude_domains)
+        self.allow_external = allow_external
+
+    def allows_host(self, url: str) -> bool:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return False
+        host = (parts.hostname or "").lower()
+
+        if self.select_domains:
+            if not any(pattern.match(host) for pattern in self.select_domains):
+                return False
+        elif not self.allow_external and host != self.root_host:
+            return False
+        return not any(pattern.match(host) for pattern in self.exclude_domains)
+
+    def allows(self, url: str) -> bool:
+        if not self.allows_host(url):
+            return False
+        path = urlsplit(url).path or "/"
+        if self.select_paths and not any(pattern.match(path) for pattern in self.select_paths):
+            return False
+        if any(pattern.match(path) for pattern in self.exclude_paths):
+            return False
+        return True
+
+
+class _HostState:
+    def __init__(self, concurrency: int):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.lock = asyncio.Lock()
+        self.next_start = 0.0
+        self.active = 0
+
+
+class HostThrottle:
+    """Caps concurrent requests per host and spaces them by the politeness delay."""
+
+    def __init__(self, concurrency: int, delay: float, max_hosts: Optional[int] = None):
+        self.concurrency = max(1, concurrency)
+        self.delay = delay
+        self.max_hosts = max_hosts or settings.NATIVE_CRAWL_MAX_TRACKED_HOSTS
+        self._hosts: "OrderedDict[str, _HostState]" = OrderedDict()
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState(self.concurrency)
+            self._evict()
+        self._hosts.move_to_end(host)
+        return state
+
+    def _evict(self):
+        # Only idle hosts whose politeness window has passed can be forgotten without loosening the limits
+        excess = len(self._hosts) - self.max_hosts
+        now = time.monotonic()
+        for host in list(self._hosts):
+            if excess <= 0:
+                break
+            state = self._hosts[host]
+            if state.active == 0 and state.next_start <= now:
+                del self._hosts[host]
+                excess -= 1
+
+    @asynccontextmanager
+    async def slot(self, host: str, delay: Optional[float] = None) -> AsyncIterator[None]:
+        state = self._state(host)
+        state.active += 1
+        try:
+            async with state.semaphore:
+                await self._wait_turn(state, delay)
+                yield
+        finally:
+            state.active -= 1
+
+    async def _wait_turn(self, state: _HostState, delay: Optional[float]):
+        delay = self.delay if delay is None else max(self.delay, delay)
+        async with state.lock:
+            now = time.monotonic()
+            start = max(now, state.next_start)
+            state.next_start = start + delay
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+class NativeCrawler:
+    def __init__(
+        self,
+        user_agent: Optional[str] = None,
+        concurrency: Optional[int] = None,
+        per_host_concurrency: Optional[int] = None,
+        politeness_delay: Optional[float] = None,
+        max_page_bytes: Optional[int] = None,
+        robots_ttl: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        url_guard: Optional[UrlGuard] = None
+    ):
+        self.user_agent = user_agent or settings.NATIVE_CRAWL_USER_AGENT
+        self.concurrency = max(1, concurrency or settings.NATIVE_CRAWL_CONCURRENCY)
+        self.per_host_concurrency = per_host_concurrency or settings.NATIVE_CRAWL_PER_HOST_CONCURRENCY
+        self.politeness_delay = (
+            politeness_delay if politeness_delay is not None else settings.NATIVE_CRAWL_POLITENESS_DELAY
+        )
+        self.max_page_bytes = max_page_bytes or settings.NATIVE_CRAWL_MAX_PAGE_BYTES
+        self.robots_ttl = robots_ttl if robots_ttl is not None else settings.NATIVE_CRAWL_ROBOTS_TTL
+        self.transport = transport
+        self.url_guard = url_guard or UrlGuard()
+        # Shared by all crawls so robots.txt is fetched once per TTL and politeness holds across crawls
+        self.robots = RobotsCache(self.user_agent, self.robots_ttl, self.url_guard)
+        self.throttle = HostThrottle(self.per_host_concurrency, self.politeness_delay)
+
+    async def crawl(self, url: str, **options) -> Dict[str, Any]:
+        return await self._run(url, collect_content=True, **options)
+
+    async def map(self, url: str, **options) -> Dict[str, Any]:
+        return await self._run(url, collect_content=False, **options)
+
+    async def _run(
+        self,
+        url: str,
+        collect_content: bool,
+        instructions: Optional[str] = None,
+        max_depth: Optional[int] = 1,
+        max_breadth: Optional[int] = 50,
+        limit: Optional[int] = 10,
+        select_paths: Optional[List[str]] = None,
+        select_domains: Optional[List[str]] = None,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_domains: Optional[List[str]] = None,
+        allow_external: bool = False,
+        include_images: bool = False,
+        include_favicon: bool = False,
+        format: str = "markdown",
+        timeout: Optional[int] = 60,
+        **ignored
+    ) -> Dict[str, Any]:
+        if instructions:
+            logger.info("Native crawler ignores natural-language instructions; use path and domain filters instead")
+        if "://" not in url:
+            url = f"https://{url}"
+        root = canonicalize_url(url)
+        max_depth = max_depth or 1
+        max_breadth = max_breadth or 50
+        limit = limit or 10
+        url_filter = UrlFilter(root, select_paths, select_domains, exclude_paths, exclude_domains, allow_external)
+
+        started = time.monotonic()
+        deadline = started + (timeout or 60)
+        global_slots = asyncio.Semaphore(self.concurrency)
+        results: List[Dict[str, Any]] = []
+        seen = {root}
+        # Final URLs after redirects: several links landing on one page yield one result
+        fetched = set()
+        frontier = [root]
+        processed = 0
+
+        async with httpx.AsyncClient(
+            transport=self.transport,
+            headers={"User-Agent": self.user_agent},
+            timeout=settings.NATIVE_CRAWL_REQUEST_TIMEOUT,
+            # Redirects are followed by hand so every hop passes the address guard, the scope filter and robots.txt
+            follow_redirects=False
+        ) as client:
+            async def allow(hop_url: str) -> bool:
+                if hop_url != root and not url_filter.allows(canonicalize_url(hop_url)):
+                    return False
+                return await self.robots.allowed(client, hop_url)
+
+            async def visit(page_url: str) -> Optional[Dict[str, Any]]:
+                if not await self.robots.allowed(client, page_url):
+                    logger.info(f"Skipping {page_url}: disallowed by robots.txt")
+                    return None
+                host = _host(page_url)
+                async with self.throttle.slot(host, await self.robots.crawl_delay(client, page_url)):
+                    async with global_slots:
+                        return await self._fetch(client, page_url, collect_content, format == "markdown", allow)
+
+            # Breadth-first, one depth level at a time, so max_depth bounds link distance from the root
+            for depth in range(max_depth + 1):
+                level = frontier[:max(0, limit - processed)]
+                frontier = []
+                if not level or time.monotonic() >= deadline:
+                    break
+                processed += len(level)
+
+                tasks = [asyncio.ensure_future(visit(page_url)) for page_url in level]
+                done, pending = await asyncio.wait(tasks, timeout=max(0.0, deadline - time.monotonic()))
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    logger.warning(f"Native crawl of {root} hit its {timeout}s timeout, returning partial results")
+
+                for task in tasks:
+                    if task not in done or task.cancelled() or task.exception() is not None:
+                        if task in done and not task.cancelled():
+                            logger.warning(f"Native crawl fetch failed: {task.exception()}")
+                        continue
+                    page = task.result()
+                    if page is None or page["url"] in fetched:
+                        continue
+                    fetched.add(page["url"])
+                    seen.add(page["url"])
+                    links = page.pop("links")
+                    # Non-HTML documents are listed by map but have no content to return from crawl
+                    if not collect_content or page["raw_content"] is not None:
+                        results.append(page)
+                    if depth == max_depth:
+                        continue
+                    followed = 0
+                    for link in links:
+                        if followed >= max_breadth:
+                            break
+                        canonical = canonicalize_url(link)
+                        if canonical in seen or not url_filter.allows(canonical):
+                            continue
+                        seen.add(canonical)
+                        frontier.append(canonical)
+                        followed += 1
+                if pending:
+                    break
+
+        elapsed = round(time.monotonic() - started, 3)
+        if not collect_content:
+            return {
+                "base_url": root,
+                "results": [page["url"] for page in results],
+                "response_time": elapsed,
+                "request_id": uuid.uuid4().hex
+            }
+        for page in results:
+            if not include_images:
+                page["images"] = []
+            if not include_favicon:
+                page.pop("favicon", None)
+        return {
+            "base_url": root,
+            "results": results,
+            "response_time": elapsed,
+            "request_id": uuid.uuid4().hex
+        }
+
+    async def _fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        collect_content: bool,
+        markdown: bool,
+        allow: Optional[Callable[[str], Awaitable[bool]]] = None
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            async with guarded_stream(client, url, self.url_guard, allow) as response:
+                if response.status_code >= 400:
+                    logger.info(f"Native crawl got {response.status_code} for {url}")
+                    return None
+                final_url = canonicalize_url(str(response.url))
+                content_type = response.headers.get("content-type", "")
+                if "html" not in content_type:
+                    return {"url": final_url, "title": None, "raw_content": None, "images": [], "links": []}
+
+                parser = PageParser(final_url, collect_content, markdown)
+                decoder = _decoder(response.charset_encoding)
+                received = 0
+                async for chunk in response.aiter_bytes():
+                    remaining = self.max_page_bytes - received
+                    received += len(chunk)
+                    parser.feed(decoder.decode(chunk[:remaining]))
+                    if received >= self.max_page_bytes:
+                        logger.info(f"Truncating {url} after {self.max_page_bytes} bytes")
+                        break
+                parser.feed(decoder.decode(b"", final=True))
+                parser.close()
+        except UnsafeUrlError as e:
+            logger.warning(str(e))
+            return None
+
+        favicon = parser.favicon or f"{_origin(final_url)}/favicon.ico"
+        return {
+            "url": final_url,
+            "title": " ".join(parser.title.split()) or None,
+            "raw_content": parser.text if collect_content else None,
+            "images": list(dict.fromkeys(parser.images)),
+            "favicon": favicon,
+            "links": parser.links
+        }
+
+
+native_crawler = NativeCrawler()
@@ -0,0 +1,56 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.services.rollups import DEFAULT_TYPE, naive_utc
+
+# Newest first; _id breaks ties between results stored in the same millisecond
+RESULT_SORT = [("timestamp", -1), ("_id", -1)]
+
+
+def encode_cursor(document: Dict[str, Any]) -> str:
+    """Opaque token pointing just past `document` in RESULT_SORT order."""
+    payload = {"ts": document["timestamp"].isoformat(), "id": str(document["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[datetime, ObjectId]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["ts"]), ObjectId(payload["id"])
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid pagination cursor: {e}") from e
+
+
+def results_filter(
+    result_type: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None
+) -> Dict[str, Any]:
+    """Query for stored results by type and [start, end) window, resuming after `cursor`."""
+    query: Dict[str, Any] = {}
+    if result_type:
+        # Search results are stored without a type, so the default type also matches untyped documents
+        query["type"] = {"$in": [None, DEFAULT_TYPE]} if result_type == DEFAULT_TYPE else result_type
+    window = {}
+    if start:
+        window["$gte"] = naive_utc(start)
+    if end:
+        window["$lt"] = naive_utc(end)
+    if window:
+        query["timestamp"] = window
+    if cursor:
+        timestamp, last_id = decode_cursor(cursor)
+        # Keyset seek: strictly after the last row seen, so pages never skip or repeat rows
+        query["$or"] = [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$lt": last_id}}
+        ]
+    return query
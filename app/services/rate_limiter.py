@@ -0,0 +1,145 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint_key(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def mask_key(api_key: str) -> str:
+    if len(api_key) <= 8:
+        return "***"
+    return f"{api_key[:5]}...{api_key[-4:]}"
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float, key_hint: Optional[str] = None):
+        self.rate = rate
+        self.key_hint = key_hint
+        self.capacity = max(1.0, capacity)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        # asyncio.Lock wakes waiters in FIFO order, so queued callers are served in arrival order
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+        self.stats = {
+            "acquired": 0,
+            "delayed": 0,
+            "total_wait": 0.0
+        }
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self) -> float:
+        self.waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                wait = 0.0
+                if self.tokens < 1.0:
+                    wait = (1.0 - self.tokens) / self.rate
+                    await asyncio.sleep(wait)
+                    self._refill()
+                self.tokens -= 1.0
+        finally:
+            self.waiting -= 1
+
+        self.stats["acquired"] += 1
+        if wait > 0:
+            self.stats["delayed"] += 1
+            self.stats["total_wait"] += wait
+        return wait
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refill()
+        return {
+            "rate_per_second": self.rate,
+            "burst": self.capacity,
+            "tokens": round(self.tokens, 3),
+            "queued": self.waiting,
+            "acquired": self.stats["acquired"],
+            "delayed": self.stats["delayed"],
+            "avg_wait": round(self.stats["total_wait"] / self.stats["delayed"], 4) if self.stats["delayed"] else 0.0
+        }
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        bursts: Optional[Dict[str, float]] = None,
+        max_buckets: Optional[int] = None
+    ):
+        self.rates = rates if rates is not None else settings.TAVILY_RATE_LIMITS
+        self.bursts = bursts if bursts is not None else settings.TAVILY_RATE_BURSTS
+        self.max_buckets = max_buckets or settings.TAVILY_MAX_TRACKED_KEYS * max(1, len(self.rates))
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+
+    def _bucket(self, api_key: str, operation: str) -> Optional[TokenBucket]:
+        rate = self.rates.get(operation)
+        if not rate or rate <= 0:
+            return None
+        key_id = fingerprint_key(api_key)
+        bucket = self._buckets.get((key_id, operation))
+        if bucket is None:
+            bucket = TokenBucket(rate, self.bursts.get(operation, rate), mask_key(api_key))
+            self._buckets[(key_id, operation)] = bucket
+            self._evict()
+        else:
+            self._buckets.move_to_end((key_id, operation))
+        return bucket
+
+    def _evict(self):
+        # Client-supplied keys are unbounded; drop the least recently used buckets that have refilled.
+        # A full, idle bucket is exactly what a returning key would get anew, so eviction never grants
+        # an extra burst; until enough have refilled the map may briefly run over max_buckets.
+        excess = len(self._buckets) - self.max_buckets
+        # The newest entry is the bucket being handed out: evicting it would detach it from the key
+        for bucket_key in list(self._buckets)[:-1]:
+            if excess <= 0:
+                break
+            bucket = self._buckets[bucket_key]
+            bucket._refill()
+            if bucket.waiting == 0 and bucket.tokens >= bucket.capacity:
+                del self._buckets[bucket_key]
+                excess -= 1
+
+    def available(self, api_key: str, operation: str) -> float:
+        bucket = self._bucket(api_key, operation)
+        if bucket is None:
+            return float("inf")
+        bucket._refill()
+        return bucket.tokens - bucket.waiting
+
+    async def acquire(self, api_key: str, operation: str) -> float:
+        bucket = self._bucket(api_key, operation)
+        if bucket is None:
+            return 0.0
+        wait = await bucket.acquire()
+        if wait > 0:
+            logger.info(f"Rate limited Tavily {operation} for key {mask_key(api_key)}: waited {wait:.2f}s")
+        return wait
+
+    def get_state(self) -> Dict[str, Any]:
+        keys: Dict[str, Any] = {}
+        for (key_id, operation), bucket in self._buckets.items():
+            entry = keys.setdefault(key_id, {"key_hint": bucket.key_hint, "operations": {}})
+            entry["operations"][operation] = bucket.snapshot()
+        return {
+            "limits": {
+                operation: {"rate_per_second": rate, "burst": self.bursts.get(operation, rate)}
+                for operation, rate in self.rates.items()
+            },
+            "keys": keys
+        }
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    def __init__(self, operation: str, retry_after: float):
+        self.operation = operation
+        self.retry_after = max(0.0, retry_after)
+        super().__init__(
+            f"Tavily {operation} is temporarily unavailable after repeated failures. "
+            f"Retry in {self.retry_after:.0f}s"
+        )
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self.stats = {
+            "successes": 0,
+            "failures": 0,
+            "rejected": 0,
+            "times_opened": 0
+        }
+
+    def before_call(self):
+        if self.state == self.OPEN:
+            elapsed = time.monotonic() - self.opened_at
+            if elapsed < self.reset_timeout:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(self.name, self.reset_timeout - elapsed)
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+            logger.info(f"Circuit for Tavily {self.name} is half-open, allowing a probe request")
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.stats["rejected"] += 1
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self.stats["successes"] += 1
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit for Tavily {self.name} closed")
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self.stats["failures"] += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.stats["times_opened"] += 1
+                logger.warning(
+                    f"Circuit for Tavily {self.name} opened after "
+                    f"{self.consecutive_failures} consecutive failures"
+                )
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        # The call ended without a verdict (cancelled, unexpected error): free the probe slot
+        self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        retry_in = None
+        if self.state == self.OPEN:
+            retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at)), 3)
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in": retry_in,
+            **self.stats
+        }
+
+
+class RetryBudget:
+    def __init__(self, ratio: float, min_tokens: float):
+        self.ratio = ratio
+        self.max_tokens = max(min_tokens, 1.0)
+        self.tokens = self.max_tokens
+
+    def deposit(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class Resilience:
+    def __init__(
+        self,
+        max_attempts: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None,
+        max_elapsed: Optional[float] = None,
+        budget_ratio: Optional[float] = None,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None
+    ):
+        self.max_attempts = max(1, max_attempts if max_attempts is not None else settings.TAVILY_RETRY_MAX_ATTEMPTS)
+        self.base_delay = base_delay if base_delay is not None else settings.TAVILY_RETRY_BASE_DELAY
+        self.max_delay = max_delay if max_delay is not None else settings.TAVILY_RETRY_MAX_DELAY
+        self.max_elapsed = max_elapsed if max_elapsed is not None else settings.TAVILY_RETRY_MAX_ELAPSED
+        self.failure_threshold = failure_threshold if failure_threshold is not None else settings.TAVILY_BREAKER_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout if reset_timeout is not None else settings.TAVILY_BREAKER_RESET_TIMEOUT
+        self.budget = RetryBudget(
+            budget_ratio if budget_ratio is not None else settings.TAVILY_RETRY_BUDGET_RATIO,
+            settings.TAVILY_RETRY_BUDGET_MIN_TOKENS
+        )
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.stats = {
+            "calls": 0,
+            "retries": 0,
+            "budget_exhausted": 0
+        }
+
+    def breaker(self, operation: str) -> CircuitBreaker:
+        if operation not in self.breakers:
+            self.breakers[operation] = CircuitBreaker(operation, self.failure_threshold, self.reset_timeout)
+        return self.breakers[operation]
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return isinstance(error, httpx.TransportError)
+
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        if not isinstance(error, httpx.HTTPStatusError):
+            return None
+        value = error.response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        # Full jitter keeps retries from many callers from synchronizing
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        server_delay = self.retry_after(error)
+        if server_delay is not None:
+            delay = max(delay, server_delay)
+        return delay
+
+    async def execute(self, operation: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        breaker = self.breaker(operation)
+        self.stats["calls"] += 1
+        self.budget.deposit()
+        deadline = time.monotonic() + self.max_elapsed
+        attempt = 0
+
+        while True:
+            attempt += 1
+            breaker.before_call()
+            try:
+                result = await fn()
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                if not self.is_retryable(e):
+                    # The upstream answered, so it counts as healthy for the breaker
+                    breaker.record_success()
+                    raise
+
+                breaker.record_failure()
+                if attempt >= self.max_attempts or breaker.state == CircuitBreaker.OPEN:
+                    raise
+
+                delay = self.backoff(attempt, e)
+                if time.monotonic() + delay > deadline:
+                    logger.warning(f"Not retrying Tavily {operation}: backoff of {delay:.1f}s exceeds the retry deadline")
+                    raise
+                if not self.budget.withdraw():
+                    self.stats["budget_exhausted"] += 1
+                    logger.warning(f"Not retrying Tavily {operation}: retry budget exhausted")
+                    raise
+
+                self.stats["retries"] += 1
+                logger.warning(
+                    f"Tavily {operation} attempt {attempt}/{self.max_attempts} failed ({e}), "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                breaker.record_success()
+                return result
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "retry_budget_tokens": round(self.budget.tokens, 3),
+            "breakers": {name: breaker.snapshot() for name, breaker in self.breakers.items()}
+        }
@@ -0,0 +1,142 @@
+import asyncio
+import gzip
+import logging
+import os
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from bson import json_util
+
+from app.core.config import settings
+from app.services.mongodb_service import mongodb_service
+from app.services.rollups import DEFAULT_TYPE
+
+logger = logging.getLogger(__name__)
+
+# Extended JSON keeps ObjectId and datetime types, so a re-import restores documents exactly
+ARCHIVE_JSON_OPTIONS = json_util.RELAXED_JSON_OPTIONS
+
+
+def archive_path(root: str, result_type: str, day: date) -> str:
+    return os.path.join(root, result_type, f"{day:%Y}", f"{day:%m}", f"{day.isoformat()}.jsonl.gz")
+
+
+def write_archive(root: str, documents: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+    """Append documents to their type/day partitions; returns documents written per file."""
+    partitions: Dict[str, List[str]] = defaultdict(list)
+    for document in documents:
+        path = archive_path(root, document.get("type") or DEFAULT_TYPE, document["timestamp"].date())
+        partitions[path].append(json_util.dumps(document, json_options=ARCHIVE_JSON_OPTIONS))
+    for path, lines in partitions.items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Each append is a new gzip member; readers see one continuous stream
+        with gzip.open(path, "at", encoding="utf-8") as archive:
+            archive.write("\n".join(lines) + "\n")
+    return {path: len(lines) for path, lines in partitions.items()}
+
+
+def archive_types(root: str) -> List[str]:
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if os.path.isdir(os.path.join(root, name)))
+
+
+def read_archive(
+    root: str,
+    start: date,
+    end: date,
+    result_types: Optional[Iterable[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """Documents archived for the days in [start, end], one partition file at a time."""
+    for result_type in result_types or archive_types(root):
+        day = start
+        while day <= end:
+            path = archive_path(root, result_type, day)
+            if os.path.exists(path):
+                with gzip.open(path, "rt", encoding="utf-8") as archive:
+                    for line in archive:
+                        if line.strip():
+                            yield json_util.loads(line, json_options=ARCHIVE_JSON_OPTIONS)
+            day += timedelta(days=1)
+
+
+class RetentionJob:
+    """Archives results past their type's retention, then hands them to the TTL index for deletion."""
+
+    def __init__(
+        self,
+        policies: Optional[Dict[str, int]] = None,
+        archive_dir: Optional[str] = None,
+        interval: Optional[float] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.policies = policies if policies is not None else settings.RETENTION_DAYS
+        self.archive_dir = archive_dir if archive_dir is not None else settings.RETENTION_ARCHIVE_DIR
+        self.interval = interval if interval is not None else settings.RETENTION_INTERVAL
+        self.batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def start(self):
+        if self._task is None and self.policies:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run_once(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        if not await mongodb_service.has_retention_ttl():
+            # Stamping expire_at without the TTL index would archive results that are then never deleted
+            logger.error("Retention skipped: the retention_ttl index on expire_at is missing")
+            self.last_run = {"skipped": "retention_ttl index missing", "finished_at": time.time()}
+            return self.last_run
+        now = datetime.utcnow()
+        expire_at = now + timedelta(seconds=settings.RETENTION_GRACE_SECONDS)
+        expired: Dict[str, int] = {}
+        files = set()
+        for result_type, days in self.policies.items():
+            cutoff = now - timedelta(days=days)
+            expired[result_type] = 0
+            while True:
+                batch = await mongodb_service.find_expirable(result_type, cutoff, self.batch_size)
+                if not batch:
+                    break
+                ids = [document["_id"] for document in batch]
+                if self.archive_dir:
+                    # Written before the documents are stamped: a crash can only duplicate archive lines, never lose them
+                    written = await asyncio.to_thread(write_archive, self.archive_dir, batch)
+                    files.update(written)
+                await mongodb_service.mark_expiring(ids, expire_at)
+                expired[result_type] += len(ids)
+        # Bodies of results the TTL index deleted since the last run; the grace keeps in-flight writes safe
+        orphaned = await mongodb_service.sweep_orphaned_content(
+            now - timedelta(seconds=settings.RETENTION_GRACE_SECONDS), self.batch_size
+        )
+        self.last_run = {
+            "expired": expired,
+            "orphaned_bodies": orphaned,
+            "files": sorted(files),
+            "duration": round(time.monotonic() - started, 3),
+            "finished_at": time.time()
+        }
+        if any(expired.values()):
+            logger.info(f"Retention archived and expired {sum(expired.values())} results: {expired}")
+        return self.last_run
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Retention run failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+retention_job = RetentionJob()
@@ -0,0 +1,68 @@
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+GRANULARITY_HOUR = "hour"
+GRANULARITY_DAY = "day"
+GRANULARITY_ALL = "all"
+GRANULARITIES = (GRANULARITY_HOUR, GRANULARITY_DAY)
+
+# Search results are stored without a type
+DEFAULT_TYPE = "search"
+
+
+def naive_utc(at: Optional[datetime]) -> Optional[datetime]:
+    """Stored timestamps are naive UTC; convert offset-aware query bounds to match."""
+    if at is None or at.tzinfo is None:
+        return at
+    return at.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def bucket_start(at: datetime, granularity: str) -> datetime:
+    if granularity == GRANULARITY_HOUR:
+        return at.replace(minute=0, second=0, microsecond=0)
+    if granularity == GRANULARITY_DAY:
+        return at.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown rollup granularity '{granularity}'")
+
+
+def rollup_id(granularity: str, bucket: Optional[datetime], result_type: str) -> str:
+    if granularity == GRANULARITY_ALL:
+        return f"all:{result_type}"
+    return f"{granularity}:{bucket.isoformat()}:{result_type}"
+
+
+def rollup_increments(documents: Iterable[Dict[str, Any]], now: Optional[datetime] = None) -> Counter:
+    """Counts to add per (granularity, bucket, type) for a set of newly written documents."""
+    now = now or datetime.utcnow()
+    counts: Counter = Counter()
+    for document in documents:
+        at = document.get("timestamp") if isinstance(document.get("timestamp"), datetime) else now
+        result_type = document.get("type") or DEFAULT_TYPE
+        counts[(GRANULARITY_ALL, None, result_type)] += 1
+        for granularity in GRANULARITIES:
+            counts[(granularity, bucket_start(at, granularity), result_type)] += 1
+    return counts
+
+
+def range_buckets(start: datetime, end: datetime, granularity: str) -> List[datetime]:
+    step = timedelta(hours=1) if granularity == GRANULARITY_HOUR else timedelta(days=1)
+    buckets = []
+    current = bucket_start(start, granularity)
+    while current < end:
+        buckets.append(current)
+        current += step
+    return buckets
+
+
+def summarize_rollups(
+    rows: Iterable[Dict[str, Any]],
+    buckets: List[datetime]
+) -> Tuple[Dict[str, int], List[Dict[str, Any]]]:
+    """Per-type totals and a zero-filled per-bucket series from rollup documents."""
+    by_type: Counter = Counter()
+    by_bucket: Counter = Counter()
+    for row in rows:
+        by_type[row["type"]] += row["count"]
+        by_bucket[row["bucket"]] += row["count"]
+    return dict(by_type), [{"bucket": bucket, "count": by_bucket.get(bucket, 0)} for bucket in buckets]
@@ -0,0 +1,186 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BULK = "bulk"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BULK)
+
+# Set per request by the routes (or per job by the worker) and read when the call goes out
+current_priority: ContextVar[Optional[str]] = ContextVar("tavily_priority", default=None)
+current_tenant: ContextVar[Optional[str]] = ContextVar("tavily_tenant", default=None)
+
+
+class _Waiter:
+    __slots__ = ("future", "tenant", "enqueued")
+
+    def __init__(self, tenant: str):
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.tenant = tenant
+        self.enqueued = time.monotonic()
+
+
+class FairQueue:
+    """Weighted fair queue across tenants (start-time fair queueing with unit cost)."""
+
+    def __init__(self, weights: Dict[str, float]):
+        self.weights = weights
+        self.virtual_time = 0.0
+        self.last_finish: Dict[str, float] = {}
+        self.queued: Dict[str, int] = {}
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return sum(self.queued.values())
+
+    def push(self, waiter: _Waiter):
+        weight = max(self.weights.get(waiter.tenant, 1.0), 1e-6)
+        start = max(self.virtual_time, self.last_finish.get(waiter.tenant, 0.0))
+        finish = start + 1.0 / weight
+        self.last_finish[waiter.tenant] = finish
+        self.queued[waiter.tenant] = self.queued.get(waiter.tenant, 0) + 1
+        heapq.heappush(self._heap, (finish, next(self._seq), waiter))
+
+    def discard(self, waiter: _Waiter):
+        # The entry stays in the heap and is skipped when popped
+        self._decrement(waiter.tenant)
+
+    def pop(self) -> Optional[_Waiter]:
+        while self._heap:
+            finish, _, waiter = heapq.heappop(self._heap)
+            if waiter.future.done():
+                continue
+            self.virtual_time = max(self.virtual_time, finish - 1.0 / max(self.weights.get(waiter.tenant, 1.0), 1e-6))
+            self._decrement(waiter.tenant)
+            return waiter
+        return None
+
+    def _decrement(self, tenant: str):
+        remaining = self.queued.get(tenant, 0) - 1
+        if remaining > 0:
+            self.queued[tenant] = remaining
+            return
+        self.queued.pop(tenant, None)
+        # Idle tenants fall back to the current virtual time, so their history can go
+        if self.last_finish.get(tenant, 0.0) <= self.virtual_time:
+            self.last_finish.pop(tenant, None)
+
+
+class OutboundScheduler:
+    def __init__(
+        self,
+        capacity: Optional[int] = None,
+        interactive_reserve: Optional[int] = None,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        self.capacity = max(1, capacity if capacity is not None else settings.TAVILY_SCHEDULER_CAPACITY)
+        reserve = interactive_reserve if interactive_reserve is not None else settings.TAVILY_SCHEDULER_INTERACTIVE_RESERVE
+        # Slots bulk work may never take, so interactive calls rarely wait behind long bulk calls
+        self.interactive_reserve = min(max(0, reserve), self.capacity - 1)
+        weights = weights if weights is not None else settings.TAVILY_TENANT_WEIGHTS
+        self.queues = {priority: FairQueue(weights) for priority in PRIORITIES}
+        self.in_flight = {priority: 0 for priority in PRIORITIES}
+        self._recent_waits: Dict[str, Deque[float]] = {priority: deque(maxlen=500) for priority in PRIORITIES}
+        self.stats = {
+            priority: {"dispatched": 0, "queued_total": 0, "total_wait": 0.0, "max_wait": 0.0}
+            for priority in PRIORITIES
+        }
+
+    def _can_start(self, priority: str) -> bool:
+        total = sum(self.in_flight.values())
+        if total >= self.capacity:
+            return False
+        if priority == PRIORITY_BULK:
+            return self.in_flight[PRIORITY_BULK] < self.capacity - self.interactive_reserve
+        return True
+
+    def _grant(self, priority: str, wait: float):
+        self.in_flight[priority] += 1
+        stats = self.stats[priority]
+        stats["dispatched"] += 1
+        stats["total_wait"] += wait
+        stats["max_wait"] = max(stats["max_wait"], wait)
+        self._recent_waits[priority].append(wait)
+
+    def _dispatch(self):
+        for priority in PRIORITIES:
+            queue = self.queues[priority]
+            while len(queue) and self._can_start(priority):
+                waiter = queue.pop()
+                if waiter is None:
+                    break
+                self._grant(priority, time.monotonic() - waiter.enqueued)
+                waiter.future.set_result(None)
+            if len(queue):
+                # Lower classes only get capacity the higher ones cannot use
+                return
+
+    async def acquire(self, priority: str, tenant: str):
+        if priority not in self.queues:
+            priority = PRIORITY_INTERACTIVE
+        ahead = any(len(self.queues[p]) for p in PRIORITIES[:PRIORITIES.index(priority) + 1])
+        if not ahead and self._can_start(priority):
+            self._grant(priority, 0.0)
+            return
+
+        queue = self.queues[priority]
+        waiter = _Waiter(tenant)
+        queue.push(waiter)
+        self.stats[priority]["queued_total"] += 1
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Granted just as the caller went away: hand the slot on
+                self.release(priority)
+            else:
+                queue.discard(waiter)
+            raise
+
+    def release(self, priority: str):
+        if priority not in self.in_flight:
+            priority = PRIORITY_INTERACTIVE
+        self.in_flight[priority] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[str], tenant: str) -> AsyncIterator[None]:
+        priority = priority if priority in self.queues else PRIORITY_INTERACTIVE
+        await self.acquire(priority, tenant)
+        try:
+            yield
+        finally:
+            self.release(priority)
+
+    def get_state(self) -> Dict[str, Any]:
+        classes = {}
+        for priority in PRIORITIES:
+            stats = self.stats[priority]
+            waits = sorted(self._recent_waits[priority])
+            queue = self.queues[priority]
+            classes[priority] = {
+                "queued": len(queue),
+                "in_flight": self.in_flight[priority],
+                "dispatched": stats["dispatched"],
+                "queued_total": stats["queued_total"],
+                "avg_wait": round(stats["total_wait"] / stats["dispatched"], 4) if stats["dispatched"] else 0.0,
+                "p95_wait": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 4) if waits else 0.0,
+                "max_wait": round(stats["max_wait"], 4),
+                "queued_by_tenant": dict(queue.queued)
+            }
+        return {
+            "capacity": self.capacity,
+            "interactive_reserve": self.interactive_reserve,
+            "classes": classes
+        }
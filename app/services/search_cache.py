@@ -0,0 +1,108 @@
+import copy
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+
+from app.core.config import settings
+from app.services.mongodb_service import mongodb_service
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCache:
+    def __init__(self, max_entries: Optional[int] = None, ttl_seconds: Optional[int] = None):
+        self.max_entries = max_entries if max_entries is not None else settings.SEARCH_CACHE_MAX_ENTRIES
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.SEARCH_CACHE_TTL_SECONDS
+        self._entries: "OrderedDict[str, Tuple[datetime, Dict[str, Any]]]" = OrderedDict()
+        self.stats = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0
+        }
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    @classmethod
+    def make_key(cls, query: str, search_depth: str, max_results: int, include_answer: bool) -> str:
+        raw = json.dumps([cls.normalize_query(query), search_depth, max_results, include_answer])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _is_fresh(self, cached_at: datetime, max_age: Optional[int]) -> bool:
+        age = (datetime.utcnow() - cached_at).total_seconds()
+        limit = self.ttl_seconds if max_age is None else min(max_age, self.ttl_seconds)
+        return age <= limit
+
+    async def get(self, key: str, max_age: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            cached_at, value = entry
+            if self._is_fresh(cached_at, max_age):
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return copy.deepcopy(value)
+            if not self._is_fresh(cached_at, None):
+                del self._entries[key]
+
+        document = await self._get_persistent(key)
+        if document is not None and self._is_fresh(document["cached_at"], max_age):
+            self._remember(key, document["cached_at"], document["result"])
+            self.stats["persistent_hits"] += 1
+            return copy.deepcopy(document["result"])
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, result: Dict[str, Any]):
+        cached_at = datetime.utcnow()
+        value = copy.deepcopy(result)
+        self._remember(key, cached_at, value)
+        self.stats["stores"] += 1
+        await self._set_persistent(key, cached_at, value)
+
+    def _remember(self, key: str, cached_at: datetime, value: Dict[str, Any]):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (cached_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def _get_persistent(self, key: str) -> Optional[Dict[str, Any]]:
+        if mongodb_service.cache_collection is None:
+            return None
+        try:
+            min_cached_at = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+            return await mongodb_service.get_cached_search(key, min_cached_at)
+        except Exception as e:
+            logger.warning(f"Search cache lookup failed: {e}")
+            return None
+
+    async def _set_persistent(self, key: str, cached_at: datetime, value: Dict[str, Any]):
+        if mongodb_service.cache_collection is None:
+            return
+        try:
+            await mongodb_service.save_cached_search(key, cached_at, value)
+        except Exception as e:
+            logger.warning(f"Search cache write failed: {e}")
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["memory_hits"] + self.stats["persistent_hits"] + self.stats["misses"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds
+        }
@@ -0,0 +1,202 @@
+import logging
+import math
+import time
+import uuid
+import zlib
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+from urllib.parse import urljoin
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+import httpx
+
+from app.core.config import settings
+from app.services.native_crawler import RobotsCache, UrlFilter, native_crawler
+from app.services.url_guard import UnsafeUrlError, guarded_stream
+from app.services.url_utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b"\x1f\x8b"
+READ_SIZE = 64 * 1024
+# Content-Encodings decoded here rather than by httpx, so they go through the same bounded inflate
+CONTENT_DECODERS = {
+    "identity": None,
+    "gzip": zlib.MAX_WBITS | 16,
+    "x-gzip": zlib.MAX_WBITS | 16,
+    "deflate": zlib.MAX_WBITS,
+}
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+
+class SitemapTooLarge(ValueError):
+    """A sitemap file decompressed past MAP_SITEMAP_MAX_BYTES."""
+
+
+def _inflate(decompressor, data: bytes) -> Iterator[bytes]:
+    # In READ_SIZE steps, so a small compressed body cannot expand all at once
+    yield decompressor.decompress(data, READ_SIZE)
+    while decompressor.unconsumed_tail:
+        yield decompressor.decompress(decompressor.unconsumed_tail, READ_SIZE)
+
+
+class SitemapMapper:
+    """Lists a site's URLs from robots.txt sitemaps and nested sitemap indexes."""
+
+    def __init__(
+        self,
+        robots: Optional[RobotsCache] = None,
+        max_files: Optional[int] = None,
+        min_coverage: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        max_bytes: Optional[int] = None
+    ):
+        self.robots = robots or native_crawler.robots
+        self.max_files = max(1, max_files or settings.MAP_SITEMAP_MAX_FILES)
+        self.min_coverage = min_coverage if min_coverage is not None else settings.MAP_SITEMAP_MIN_COVERAGE
+        self.transport = transport
+        self.max_bytes = max_bytes or settings.MAP_SITEMAP_MAX_BYTES
+
+    async def map(
+        self,
+        url: str,
+        limit: Optional[int] = 10,
+        select_paths: Optional[List[str]] = None,
+        select_domains: Optional[List[str]] = None,
+        exclude_paths: Optional[List[str]] = None,
+        exclude_domains: Optional[List[str]] = None,
+        allow_external: bool = False,
+        timeout: Optional[int] = 60,
+        **ignored
+    ) -> Optional[Dict[str, Any]]:
+        """Return a map response built from sitemaps, or None when they are missing or cover too little."""
+        if "://" not in url:
+            url = f"https://{url}"
+        root = canonicalize_url(url)
+        limit = limit or 10
+        url_filter = UrlFilter(root, select_paths, select_domains, exclude_paths, exclude_domains, allow_external)
+        started = time.monotonic()
+        deadline = started + (timeout or 60)
+
+        async with httpx.AsyncClient(
+            transport=self.transport,
+            headers={"User-Agent": self.robots.user_agent, "Accept-Encoding": "gzip, deflate"},
+            timeout=settings.NATIVE_CRAWL_REQUEST_TIMEOUT,
+            follow_redirects=False
+        ) as client:
+            async def allow(hop_url: str) -> bool:
+                # Sitemap locations come from the site itself: hold them, and every redirect, to the crawl scope
+                return url_filter.allows_host(hop_url) and await self.robots.allowed(client, hop_url)
+
+            pending = await self.robots.sitemaps(client, root) or [urljoin(root, "/sitemap.xml")]
+            urls: List[str] = []
+            seen_urls = set()
+            fetched = set()
+
+            def add(page_url: str) -> bool:
+                canonical = canonicalize_url(page_url)
+                if len(urls) < limit and canonical not in seen_urls and url_filter.allows(canonical):
+                    seen_urls.add(canonical)
+                    urls.append(canonical)
+                return len(urls) >= limit
+
+            while pending and len(urls) < limit and len(fetched) < self.max_files:
+                if time.monotonic() >= deadline:
+                    logger.warning(f"Sitemap resolution for {root} hit its {timeout}s timeout")
+                    break
+                sitemap_url = pending.pop(0)
+                if sitemap_url in fetched:
+                    continue
+                fetched.add(sitemap_url)
+                if not url_filter.allows_host(sitemap_url):
+                    logger.info(f"Skipping sitemap {sitemap_url} outside the scope of {root}")
+                    continue
+
+                try:
+                    children = await self._read(client, sitemap_url, add, deadline, allow)
+                except (httpx.HTTPError, ParseError, zlib.error, SitemapTooLarge, UnsafeUrlError) as e:
+                    logger.info(f"Skipping unreadable sitemap {sitemap_url}: {e}")
+                    continue
+                pending.extend(child for child in children if child not in fetched)
+
+        # Sitemaps that list too few matching URLs are likely stale or partial: let the crawl find the rest
+        if not urls or len(urls) < math.ceil(self.min_coverage * limit):
+            logger.info(f"Sitemaps of {root} gave {len(urls)} of {limit} URLs, falling back to a crawl")
+            return None
+        return {
+            "base_url": root,
+            "results": urls,
+            "response_time": round(time.monotonic() - started, 3),
+            "request_id": uuid.uuid4().hex
+        }
+
+    async def _read(
+        self,
+        client: httpx.AsyncClient,
+        sitemap_url: str,
+        add_url: Callable[[str], bool],
+        deadline: float,
+        allow: Callable[[str], Awaitable[bool]]
+    ) -> List[str]:
+        # Streamed through a pull parser; finished <url> entries are dropped so memory stays bounded
+        parser = XMLPullParser(events=("start", "end"))
+        children: List[str] = []
+        done = False
+        stack: List[str] = []
+        root = None
+        body_decompressor = None
+        first = True
+        size = 0
+
+        def feed(data: bytes):
+            nonlocal done, root, size
+            size += len(data)
+            if size > self.max_bytes:
+                raise SitemapTooLarge(f"more than {self.max_bytes} bytes once decompressed")
+            parser.feed(data)
+            for event, element in parser.read_events():
+                name = _local(element.tag)
+                if event == "start":
+                    root = root if root is not None else element
+                    stack.append(name)
+                    continue
+                stack.pop()
+                if name == "loc" and stack and element.text:
+                    if stack[-1] == "sitemap":
+                        children.append(element.text.strip())
+                    elif stack[-1] == "url":
+                        done = add_url(element.text.strip()) or done
+                elif name in ("url", "sitemap") and root is not None:
+                    root.clear()
+
+        async with guarded_stream(client, sitemap_url, self.robots.guard, allow) as response:
+            if response.status_code >= 400:
+                return []
+            encoding = response.headers.get("content-encoding", "identity").strip().lower() or "identity"
+            if encoding not in CONTENT_DECODERS:
+                raise SitemapTooLarge(f"unsupported Content-Encoding '{encoding}', its size cannot be bounded")
+            wbits = CONTENT_DECODERS[encoding]
+            transfer_decompressor = zlib.decompressobj(wbits) if wbits is not None else None
+            # Raw bytes: httpx would inflate each Content-Encoding chunk whole, bypassing the limit
+            async for raw in response.aiter_raw():
+                pieces = _inflate(transfer_decompressor, raw) if transfer_decompressor else (raw,)
+                for piece in pieces:
+                    if first and piece:
+                        first = False
+                        # A .xml.gz file, possibly also sent with Content-Encoding: gzip
+                        if piece.startswith(GZIP_MAGIC):
+                            body_decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                    for data in _inflate(body_decompressor, piece) if body_decompressor else (piece,):
+                        feed(data)
+                        if done:
+                            break
+                    if done:
+                        break
+                if done or time.monotonic() >= deadline:
+                    break
+        return children
+
+
+sitemap_mapper = SitemapMapper()
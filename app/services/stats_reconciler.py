@@ -0,0 +1,58 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.services.mongodb_service import mongodb_service
+
+logger = logging.getLogger(__name__)
+
+
+class StatsReconciler:
+    """Periodically recounts the stats rollups from the results collection to correct drift."""
+
+    def __init__(
+        self,
+        interval: Optional[float] = None,
+        days: Optional[int] = None,
+        retention_days: Optional[Dict[str, int]] = None
+    ):
+        self.interval = interval if interval is not None else settings.STATS_RECONCILE_INTERVAL
+        self.days = max(1, days or settings.STATS_RECONCILE_DAYS)
+        self.retention_days = retention_days if retention_days is not None else settings.RETENTION_DAYS
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[Dict[str, Any]] = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def run_once(self) -> Dict[str, Any]:
+        started = time.monotonic()
+        days = self.days
+        if self.retention_days:
+            # Older buckets count results retention deleted on purpose: recounting them would zero the history
+            days = min(days, max(0, min(self.retention_days.values()) - 1))
+        result = await mongodb_service.reconcile_rollups(days)
+        self.last_run = {**result, "duration": round(time.monotonic() - started, 3), "finished_at": time.time()}
+        return self.last_run
+
+    async def _run(self):
+        # The first pass runs at startup, which also backfills rollups for existing data
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"Stats reconciliation failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+stats_reconciler = StatsReconciler()
@@ -1,9 +1,24 @@
+import asyncio
+import hashlib
 import httpx
+import json
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import AsyncIterator, Dict, Any, Optional
 from datetime import datetime
 
 from app.core.config import settings
+from app.services.search_cache import SearchCache
+from app.services.single_flight import SingleFlight
+from app.services.extract_cache import ExtractCache
+from app.services.url_utils import canonicalize_url
+from app.services.resilience import Resilience, CircuitOpenError
+from app.services.rate_limiter import RateLimiter, fingerprint_key
+from app.services.credit_ledger import CreditLedger
+from app.services.key_pool import KeyPool
+from app.services.hedging import Hedger
+from app.services.scheduler import OutboundScheduler, current_priority, current_tenant
+from app.services.latency_model import DepthLatencyModel, DEGRADED_CACHE
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +30,195 @@ class TavilyService:
         self.timeout = settings.TAVILY_TIMEOUT
         self.max_results = settings.TAVILY_MAX_RESULTS
         self.search_depth = settings.TAVILY_SEARCH_DEPTH
+        self._client: Optional[httpx.AsyncClient] = None
+        self.search_cache = SearchCache()
+        self.single_flight = SingleFlight()
+        self.extract_cache = ExtractCache()
+        self.resilience = Resilience()
+        self.rate_limiter = RateLimiter()
+        self.credit_ledger = CreditLedger()
+        self.key_pool = KeyPool(rate_limiter=self.rate_limiter)
+        self.hedger = Hedger()
+        self.scheduler = OutboundScheduler()
+        self.latency_model = DepthLatencyModel()
+        if not self.api_key and len(self.key_pool):
+            self.api_key = next(iter(self.key_pool.keys))
         
         if not self.api_key:
             logger.warning("TAVILY_API_KEY not set in environment variables")
+
+    async def start(self):
+        if self._client is not None:
+            return
+        
+        http2 = settings.TAVILY_HTTP2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+                http2 = False
+        
+        limits = httpx.Limits(
+            max_connections=settings.TAVILY_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.TAVILY_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.TAVILY_KEEPALIVE_EXPIRY
+        )
+        self._client = httpx.AsyncClient(timeout=self.timeout, limits=limits, http2=http2)
+        logger.info(
+            f"Tavily connection pool started (http2={http2}, "
+            f"max_connections={settings.TAVILY_MAX_CONNECTIONS})"
+        )
+        
+        await self._prewarm(settings.TAVILY_PREWARM_CONNECTIONS)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info("Tavily connection pool closed")
+
+    async def _prewarm(self, connections: int):
+        if connections <= 0 or self._client is None:
+            return
+        
+        async def _open_connection():
+            try:
+                await self._client.head(self.base_url)
+            except httpx.HTTPError as e:
+                logger.warning(f"Failed to pre-warm Tavily connection: {e}")
+        
+        await asyncio.gather(*(_open_connection() for _ in range(connections)))
+        logger.info(f"Pre-warmed {connections} Tavily connection(s)")
+
+    async def _post(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        active_key: str,
+        coalesce: bool = False,
+        hedge: bool = False
+    ) -> Dict[str, Any]:
+        if coalesce:
+            return await self.single_flight.do(
+                self._flight_key(endpoint, payload),
+                lambda: self._send(endpoint, payload, active_key, hedge)
+            )
+        return await self._send(endpoint, payload, active_key, hedge)
+
+    async def _send(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        active_key: str,
+        hedge: bool = False
+    ) -> Dict[str, Any]:
+        if hedge:
+            # Latency differs a lot between depths, so each depth gets its own hedge trigger
+            depth = payload.get("search_depth") or payload.get("extract_depth") or "basic"
+            attempt = lambda: self.hedger.run(
+                f"{endpoint}:{depth}",
+                lambda: self._request(endpoint, payload, active_key)
+            )
+        else:
+            attempt = lambda: self._request(endpoint, payload, active_key)
+        return await self.resilience.execute(endpoint, attempt)
+
+    async def _request(self, endpoint: str, payload: Dict[str, Any], active_key: str) -> Dict[str, Any]:
+        # Fair queueing is per tenant, which defaults to the caller's key rather than the pooled one
+        tenant = current_tenant.get() or fingerprint_key(active_key)
+        
+        # Server-side traffic is spread over the key pool; client-supplied keys are used as-is
+        pooled = len(self.key_pool) > 1 and active_key == self.api_key
+        if not pooled:
+            return await self._request_with_key(endpoint, payload, active_key, tenant)
+        
+        tried = set()
+        while True:
+            key = self.key_pool.select(endpoint, exclude=tried)
+            tried.add(key)
+            try:
+                return await self._request_with_key(endpoint, payload, key, tenant)
+            except httpx.HTTPStatusError as e:
+                # A rejected key says nothing about the request, so try the next key right away
+                if e.response.status_code != 401 or len(tried) >= len(self.key_pool):
+                    raise
+                logger.warning(f"Tavily {endpoint} rejected a pooled key, retrying with another key")
+
+    async def _request_with_key(
+        self,
+        endpoint: str,
+        payload: Dict[str, Any],
+        key: str,
+        tenant: str
+    ) -> Dict[str, Any]:
+        if payload.get("api_key") != key:
+            payload = {**payload, "api_key": key}
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {key}"
+        }
+        url = f"{self.base_url}/{endpoint}"
+        
+        # Every attempt, retries included, spends from the key's token bucket
+        await self.rate_limiter.acquire(key, endpoint)
+        
+        async with self.scheduler.slot(current_priority.get(), tenant):
+            self.key_pool.begin(key)
+            try:
+                if self._client is not None:
+                    response = await self._client.post(url, json=payload, headers=headers)
+                else:
+                    # No pool outside the app lifespan (scripts, tests): use a one-off client
+                    async with httpx.AsyncClient(timeout=self.timeout) as client:
+                        response = await client.post(url, json=payload, headers=headers)
+                response.raise_for_status()
+                data = response.json()
+            except httpx.HTTPStatusError as e:
+                self.key_pool.record_failure(key, e.response.status_code, Resilience.retry_after(e))
+                raise
+            except asyncio.CancelledError:
+                self.key_pool.release(key)
+                raise
+            except BaseException:
+                self.key_pool.record_failure(key)
+                raise
+        
+        self.key_pool.record_success(key)
+        self.credit_ledger.record(key, endpoint, payload, data)
+        return data
+
+    async def _stale_cached_search(
+        self,
+        query: str,
+        requested_depth: str,
+        max_results: int,
+        include_answer: bool
+    ) -> Optional[Dict[str, Any]]:
+        for depth in dict.fromkeys([requested_depth, "advanced", "basic"]):
+            cached = await self.search_cache.get(SearchCache.make_key(query, depth, max_results, include_answer))
+            if cached is not None:
+                cached["search_metadata"]["cached"] = True
+                return self._mark_depth(cached, requested_depth, DEGRADED_CACHE)
+        return None
+
+    @staticmethod
+    def _mark_depth(result: Dict[str, Any], requested_depth: str, degraded: Optional[str]) -> Dict[str, Any]:
+        result["search_metadata"]["requested_search_depth"] = requested_depth
+        result["search_metadata"]["degraded"] = degraded
+        return result
+
+    @staticmethod
+    def _hedging(hedge: Optional[bool]) -> bool:
+        return settings.TAVILY_HEDGE_ENABLED if hedge is None else hedge
+
+    @staticmethod
+    def _flight_key(endpoint: str, payload: Dict[str, Any]) -> str:
+        normalized = dict(payload)
+        if endpoint == "search":
+            normalized["query"] = SearchCache.normalize_query(normalized["query"])
+        raw = json.dumps([endpoint, normalized], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
     
     async def search(
         self,
@@ -25,45 +226,81 @@ class TavilyService:
         search_depth: Optional[str] = None,
         max_results: Optional[int] = None,
         include_answer: bool = True,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        max_age: Optional[int] = None,
+        no_cache: bool = False,
+        hedge: Optional[bool] = None,
+        deadline: Optional[float] = None
     ) -> Dict[str, Any]:
 
         active_key = api_key or self.api_key
         if not active_key:
             raise ValueError("Tavily API key is not configured. Please provide one or set it in your .env file")
         
-        logger.info(f"Searching Tavily for: '{query}'")
+        requested_depth = search_depth or self.search_depth
+        search_depth = requested_depth
+        degraded = None
+        if deadline is not None:
+            search_depth, degraded = self.latency_model.choose_depth(requested_depth, deadline - time.monotonic())
+        max_results = max_results or self.max_results
+        cache_key = SearchCache.make_key(query, search_depth, max_results, include_answer)
+        
+        if not no_cache:
+            cached = await self.search_cache.get(cache_key, max_age)
+            if cached is not None:
+                logger.info(f"Serving cached search result for: '{query}'")
+                cached["search_metadata"]["cached"] = True
+                return self._mark_depth(cached, requested_depth, degraded)
+            
+            if deadline is not None and self.latency_model.budget_spent(deadline - time.monotonic()):
+                # Not even a basic search fits: any cached answer beats a late one
+                stale = await self._stale_cached_search(query, requested_depth, max_results, include_answer)
+                if stale is not None:
+                    logger.info(f"Latency budget spent, serving older cached result for: '{query}'")
+                    return stale
+        
+        logger.info(f"Searching Tavily for: '{query}' ({search_depth})")
         
         payload = {
             "api_key": active_key,
             "query": query,
-            "search_depth": search_depth or self.search_depth,
-            "max_results": max_results or self.max_results,
+            "search_depth": search_depth,
+            "max_results": max_results,
             "include_answer": include_answer,
             "include_raw_content": False,
             "include_images": False
         }
         
+        started = time.monotonic()
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                headers = {
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {active_key}"
-                }
-                response = await client.post(
-                    f"{self.base_url}/search",
-                    json=payload,
-                    headers=headers
-                )
-                
-                response.raise_for_status()
-                
-                data = response.json()
-                result_count = len(data.get("results", []))
-                logger.info(f"Found {result_count} results for: '{query}'")
-                
-                return self._format_response(query, data, search_depth or self.search_depth)
+            call = self._post("search", payload, active_key, coalesce=True, hedge=self._hedging(hedge))
+            if deadline is None:
+                data = await call
+            else:
+                data = await asyncio.wait_for(call, timeout=max(0.001, deadline - started))
+            self.latency_model.record(search_depth, time.monotonic() - started)
+            result_count = len(data.get("results", []))
+            logger.info(f"Found {result_count} results for: '{query}'")
+            
+            result = self._format_response(query, data, search_depth)
+            await self.search_cache.set(cache_key, result)
+            return self._mark_depth(result, requested_depth, degraded)
                 
+        except CircuitOpenError:
+            raise
+        
+        except asyncio.TimeoutError:
+            # Keep the slow call in the model, or it would keep promising the same depth
+            self.latency_model.record(search_depth, time.monotonic() - started)
+            if not no_cache:
+                stale = await self._stale_cached_search(query, requested_depth, max_results, include_answer)
+                if stale is not None:
+                    logger.info(f"Search deadline passed, serving older cached result for: '{query}'")
+                    return stale
+            error_msg = "Search deadline exceeded before Tavily answered"
+            logger.error(f"Deadline exceeded for query '{query}' ({search_depth})")
+            raise ValueError(error_msg)
+            
         except httpx.HTTPStatusError as e:
             status_code = e.response.status_code
             
@@ -95,19 +332,114 @@ class TavilyService:
         extract_depth: Optional[str] = None,
         include_images: bool = False,
         include_answer: bool = False,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        no_cache: bool = False,
+        hedge: Optional[bool] = None
     ) -> Dict[str, Any]:
         active_key = api_key or self.api_key
         if not active_key:
             raise ValueError("Tavily API key is not configured. Please provide one or set it in your .env file")
         
-        logger.info(f"Extracting content from {len(urls)} URLs")
+        extract_depth = extract_depth or "basic"
+        unique_urls = list(dict.fromkeys(canonicalize_url(url) for url in urls))
+        started = time.monotonic()
+        chunk_size = max(1, settings.EXTRACT_CHUNK_SIZE)
+        
+        # An answer must be generated from every page at once, so it cannot reuse cached pages or span chunks
+        if include_answer and len(unique_urls) > chunk_size:
+            raise ValueError(f"include_answer supports at most {chunk_size} URLs per request, got {len(unique_urls)}")
+        read_cache = not (no_cache or include_answer)
+        results_by_url: Dict[str, Dict[str, Any]] = {}
+        cached_urls = []
+        pending_urls = []
+        for url in unique_urls:
+            cached = None
+            if read_cache:
+                cached = self.extract_cache.get(
+                    ExtractCache.make_key(url, extract_depth, include_images, query)
+                )
+            if cached is not None:
+                results_by_url[url] = cached
+                cached_urls.append(cached.get("url", url))
+            else:
+                pending_urls.append(url)
         
+        chunks = [pending_urls[i:i + chunk_size] for i in range(0, len(pending_urls), chunk_size)]
+        semaphore = asyncio.Semaphore(max(1, settings.EXTRACT_CONCURRENCY))
+        
+        logger.info(
+            f"Extracting content from {len(unique_urls)} URLs "
+            f"({len(cached_urls)} cached, {len(chunks)} chunk(s) to fetch)"
+        )
+        
+        async def _run(chunk: list[str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self._extract_chunk(
+                    chunk, query, extract_depth, include_images, include_answer, active_key,
+                    self._hedging(hedge)
+                )
+        
+        outcomes = await asyncio.gather(*(_run(chunk) for chunk in chunks), return_exceptions=True)
+        
+        failed_by_url: Dict[str, Dict[str, Any]] = {}
+        unmatched_results = []
+        answer = None
+        chunk_errors = []
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, Exception):
+                chunk_errors.append(outcome)
+                for url in chunk:
+                    failed_by_url[url] = {"url": url, "error": str(outcome)}
+                continue
+            
+            for result in outcome.get("results", []):
+                url = canonicalize_url(result.get("url", ""))
+                self.extract_cache.set(
+                    ExtractCache.make_key(url, extract_depth, include_images, query),
+                    result
+                )
+                if url in results_by_url or url not in chunk:
+                    unmatched_results.append(result)
+                else:
+                    results_by_url[url] = result
+            for failed in outcome.get("failed_results", []):
+                url = canonicalize_url(failed.get("url", ""))
+                failed_by_url.setdefault(url, failed)
+            answer = outcome.get("answer") or answer
+        
+        if chunk_errors and not results_by_url and not unmatched_results:
+            raise chunk_errors[0]
+        
+        results = [results_by_url[url] for url in unique_urls if url in results_by_url] + unmatched_results
+        failed_results = [
+            failed_by_url[url] for url in unique_urls
+            if url in failed_by_url and url not in results_by_url
+        ]
+        
+        return {
+            "results": results,
+            "failed_results": failed_results,
+            "answer": answer,
+            "response_time": round(time.monotonic() - started, 3),
+            "total": len(unique_urls),
+            "cached_urls": cached_urls
+        }
+
+    async def _extract_chunk(
+        self,
+        urls: list[str],
+        query: Optional[str],
+        extract_depth: str,
+        include_images: bool,
+        include_answer: bool,
+        active_key: str,
+        hedge: bool = False
+    ) -> Dict[str, Any]:
         payload = {
             "api_key": active_key,
             "urls": urls,
             "query": query,
-            "extract_depth": extract_depth or "basic",
+            "extract_depth": extract_depth,
             "include_images": include_images,
             "include_answer": include_answer
         }
@@ -115,25 +447,15 @@ class TavilyService:
         payload = {k: v for k, v in payload.items() if v is not None}
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                headers = {
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {active_key}"
-                }
-                response = await client.post(
-                    f"{self.base_url}/extract",
-                    json=payload,
-                    headers=headers
-                )
-                
-                response.raise_for_status()
-                
-                data = response.json()
-                result_count = len(data.get("results", []))
-                logger.info(f"Successfully extracted content from {result_count} URLs")
-                
-                return data
+            data = await self._post("extract", payload, active_key, coalesce=True, hedge=hedge)
+            result_count = len(data.get("results", []))
+            logger.info(f"Successfully extracted content from {result_count} of {len(urls)} URLs")
+            
+            return data
                 
+        except CircuitOpenError:
+            raise
+            
         except httpx.HTTPStatusError as e:
             status_code = e.response.status_code
             if status_code == 401:
@@ -185,25 +507,15 @@ class TavilyService:
         payload = {k: v for k, v in payload.items() if v is not None}
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                headers = {
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {active_key}"
-                }
-                response = await client.post(
-                    f"{self.base_url}/crawl",
-                    json=payload,
-                    headers=headers
-                )
-                
-                response.raise_for_status()
-                
-                data = response.json()
-                result_count = len(data.get("results", []))
-                logger.info(f"Successfully crawled and found {result_count} items")
-                
-                return data
+            data = await self._post("crawl", payload, active_key)
+            result_count = len(data.get("results", []))
+            logger.info(f"Successfully crawled and found {result_count} items")
+            
+            return data
                 
+        except CircuitOpenError:
+            raise
+            
         except httpx.HTTPStatusError as e:
             status_code = e.response.status_code
             response_text = e.response.text
@@ -258,25 +570,15 @@ class TavilyService:
         payload = {k: v for k, v in payload.items() if v is not None}
         
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                headers = {
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {active_key}"
-                }
-                response = await client.post(
-                    f"{self.base_url}/map",
-                    json=payload,
-                    headers=headers
-                )
-                
-                response.raise_for_status()
-                
-                data = response.json()
-                result_count = len(data.get("results", []))
-                logger.info(f"Successfully mapped and found {result_count} items")
-                
-                return data
+            data = await self._post("map", payload, active_key, coalesce=True)
+            result_count = len(data.get("results", []))
+            logger.info(f"Successfully mapped and found {result_count} items")
+            
+            return data
                 
+        except CircuitOpenError:
+            raise
+            
         except httpx.HTTPStatusError as e:
             status_code = e.response.status_code
             response_text = e.response.text
@@ -303,33 +605,109 @@ class TavilyService:
             raise ValueError(error_msg)
 
 
+    async def iter_batch_search(
+        self,
+        queries: list[str],
+        search_depth: Optional[str] = None,
+        max_results: Optional[int] = None,
+        include_answer: bool = True,
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_age: Optional[int] = None,
+        no_cache: bool = False,
+        hedge: Optional[bool] = None,
+        deadline_ms: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        # One budget for the whole batch, so queries still queued late get cheaper searches
+        deadline = time.monotonic() + deadline_ms / 1000 if deadline_ms else None
+        # Duplicate queries in the same batch share a single upstream call
+        unique_queries = list(dict.fromkeys(queries))
+        positions: Dict[str, list[int]] = {}
+        for index, query in enumerate(queries):
+            positions.setdefault(query, []).append(index)
+        
+        concurrency = max(1, max_concurrency or settings.TAVILY_BATCH_CONCURRENCY)
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        logger.info(
+            f"Starting batch search for {len(queries)} queries "
+            f"({len(unique_queries)} unique, concurrency={concurrency})"
+        )
+        
+        async def _run(i: int, query: str):
+            async with semaphore:
+                logger.info(f"[{i}/{len(unique_queries)}] Processing: '{query}'")
+                try:
+                    return query, await self.search(
+                        query, search_depth, max_results, include_answer, api_key,
+                        max_age=max_age, no_cache=no_cache, hedge=hedge, deadline=deadline
+                    )
+                except Exception as e:
+                    return query, e
+        
+        tasks = [asyncio.ensure_future(_run(i, query)) for i, query in enumerate(unique_queries, 1)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                query, outcome = await next_done
+                for n, index in enumerate(positions[query]):
+                    if isinstance(outcome, Exception):
+                        error_msg = str(outcome)
+                        logger.error(f"Error searching '{query}': {error_msg}")
+                        yield {"index": index, "query": query, "error": error_msg, "exception": outcome}
+                    else:
+                        # Each occurrence gets its own dict so storage can assign distinct _ids
+                        yield {
+                            "index": index,
+                            "query": query,
+                            "result": dict(outcome) if n else outcome,
+                            "cached": bool(outcome.get("search_metadata", {}).get("cached"))
+                        }
+        finally:
+            # Stop outstanding searches if the consumer goes away early
+            for task in tasks:
+                task.cancel()
+
     async def batch_search(
         self,
         queries: list[str],
         search_depth: Optional[str] = None,
         max_results: Optional[int] = None,
         include_answer: bool = True,
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_age: Optional[int] = None,
+        no_cache: bool = False,
+        hedge: Optional[bool] = None,
+        deadline_ms: Optional[int] = None
     ) -> Dict[str, Any]:
 
         results = []
         errors = []
+        cached_queries = []
         
-        logger.info(f"Starting batch search for {len(queries)} queries")
+        outcomes: list[Dict[str, Any]] = [None] * len(queries)
+        async for outcome in self.iter_batch_search(
+            queries, search_depth, max_results, include_answer, api_key,
+            max_concurrency=max_concurrency, max_age=max_age, no_cache=no_cache, hedge=hedge,
+            deadline_ms=deadline_ms
+        ):
+            outcomes[outcome["index"]] = outcome
         
-        for i, query in enumerate(queries, 1):
-            try:
-                logger.info(f"[{i}/{len(queries)}] Processing: '{query}'")
-                result = await self.search(query, search_depth, max_results, include_answer, api_key)
-                results.append(result)
-                
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(f"Error searching '{query}': {error_msg}")
+        breaker_errors = [outcome["exception"] for outcome in outcomes if isinstance(outcome.get("exception"), CircuitOpenError)]
+        if outcomes and len(breaker_errors) == len(outcomes):
+            # Nothing was attempted upstream: surface the open breaker so the API answers 503 with Retry-After
+            raise min(breaker_errors, key=lambda e: e.retry_after)
+        
+        for outcome in outcomes:
+            if "error" in outcome:
                 errors.append({
-                    "query": query,
-                    "error": error_msg
+                    "query": outcome["query"],
+                    "error": outcome["error"]
                 })
+            else:
+                results.append(outcome["result"])
+                if outcome["cached"] and outcome["query"] not in cached_queries:
+                    cached_queries.append(outcome["query"])
         
         logger.info(f"Batch search complete: {len(results)} successful, {len(errors)} failed")
         
@@ -340,7 +718,9 @@ class TavilyService:
                 "total": len(queries),
                 "successful": len(results),
                 "failed": len(errors)
-            }
+            },
+            # Served from the search cache: already stored when first fetched
+            "cached_queries": cached_queries
         }
     
     def _format_response(self, query: str, data: Dict[str, Any], search_depth: str) -> Dict[str, Any]:
@@ -365,7 +745,8 @@ class TavilyService:
             "search_metadata": {
                 "search_depth": search_depth,
                 "result_count": len(formatted_results),
-                "searched_at": datetime.utcnow()
+                "searched_at": datetime.utcnow(),
+                "cached": False
             }
         }
 
@@ -0,0 +1,122 @@
+import asyncio
+import ipaddress
+import logging
+import socket
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Resolver = Callable[[str, int], Awaitable[List[str]]]
+
+
+class UnsafeUrlError(ValueError):
+    """The URL points at a non-public address, or a redirect left the allowed scope."""
+
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address)
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    # is_global excludes loopback, RFC 1918, link-local (169.254.0.0/16, cloud metadata), CGNAT and reserved ranges
+    return ip.is_global and not ip.is_multicast
+
+
+async def _system_resolver(host: str, port: int) -> List[str]:
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return [info[4][0] for info in infos]
+
+
+class UrlGuard:
+    """Refuses server-side fetches of loopback, private and link-local addresses."""
+
+    def __init__(
+        self,
+        allow_private: Optional[bool] = None,
+        resolver: Optional[Resolver] = None,
+        cache_ttl: float = 60.0,
+        max_entries: Optional[int] = None
+    ):
+        self.allow_private = (
+            allow_private if allow_private is not None else settings.NATIVE_CRAWL_ALLOW_PRIVATE_NETWORKS
+        )
+        self.resolver = resolver or _system_resolver
+        self.cache_ttl = cache_ttl
+        self.max_entries = max_entries or settings.NATIVE_CRAWL_MAX_TRACKED_HOSTS
+        self._verdicts: "OrderedDict[Tuple[str, int], Tuple[float, Optional[str]]]" = OrderedDict()
+
+    async def check(self, url: str):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise UnsafeUrlError(f"Refusing to fetch {url}: only absolute http(s) URLs are allowed")
+        if self.allow_private:
+            return
+        host = parts.hostname.lower()
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+        except ValueError:
+            raise UnsafeUrlError(f"Refusing to fetch {url}: invalid port")
+
+        key = (host, port)
+        cached = self._verdicts.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_ttl:
+            self._verdicts.move_to_end(key)
+            problem = cached[1]
+        else:
+            problem = await self._inspect(host, port)
+            self._verdicts[key] = (time.monotonic(), problem)
+            self._verdicts.move_to_end(key)
+            while len(self._verdicts) > self.max_entries:
+                self._verdicts.popitem(last=False)
+        if problem:
+            raise UnsafeUrlError(f"Refusing to fetch {url}: {problem}")
+
+    async def _inspect(self, host: str, port: int) -> Optional[str]:
+        try:
+            addresses = [str(ipaddress.ip_address(host))]
+        except ValueError:
+            try:
+                addresses = await self.resolver(host, port)
+            except (OSError, UnicodeError) as e:
+                return f"could not resolve {host} ({e})"
+        if not addresses:
+            return f"could not resolve {host}"
+        # Every record must be public, or a mixed answer would let the connection land on a private one
+        blocked = [address for address in addresses if not is_public_address(address)]
+        if blocked:
+            return f"{host} resolves to non-public address {blocked[0]}"
+        return None
+
+
+@asynccontextmanager
+async def guarded_stream(
+    client: httpx.AsyncClient,
+    url: str,
+    guard: UrlGuard,
+    allow: Optional[Callable[[str], Awaitable[bool]]] = None,
+    max_redirects: Optional[int] = None
+) -> AsyncIterator[httpx.Response]:
+    """GET with redirects followed by hand, re-checking the address guard and `allow` at every hop.
+
+    The client must not follow redirects itself.
+    """
+    max_redirects = settings.NATIVE_CRAWL_MAX_REDIRECTS if max_redirects is None else max_redirects
+    for _ in range(max_redirects + 1):
+        await guard.check(url)
+        if allow is not None and not await allow(url):
+            raise UnsafeUrlError(f"Refusing to fetch {url}: outside the allowed scope")
+        async with client.stream("GET", url) as response:
+            location = response.headers.get("location")
+            if response.is_redirect and location:
+                url = urljoin(str(response.url), location)
+                continue
+            yield response
+            return
+    raise UnsafeUrlError(f"Refusing to fetch {url}: more than {max_redirects} redirects")
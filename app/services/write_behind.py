@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from pymongo.write_concern import WriteConcern
+
+from app.core.config import settings
+from app.services.hedging import LatencyTracker
+from app.services.mongodb_service import mongodb_service
+
+logger = logging.getLogger(__name__)
+
+
+def parse_write_concern(w: str, journal: bool) -> WriteConcern:
+    w = w.strip()
+    return WriteConcern(w=int(w) if w.isdigit() else w, j=journal or None)
+
+
+class WriteBehindPersister:
+    """Buffers result documents from the routes and writes them to MongoDB in unordered batches."""
+
+    def __init__(
+        self,
+        max_queue: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        write_concern: Optional[WriteConcern] = None
+    ):
+        self.max_queue = max(1, max_queue or settings.PERSIST_MAX_QUEUE)
+        self.batch_size = max(1, min(batch_size or settings.PERSIST_BATCH_SIZE, self.max_queue))
+        self.flush_interval = flush_interval if flush_interval is not None else settings.PERSIST_FLUSH_INTERVAL
+        self.write_concern = write_concern or parse_write_concern(
+            settings.PERSIST_WRITE_CONCERN, settings.PERSIST_WRITE_JOURNAL
+        )
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._space = asyncio.Condition()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._flush_latency = LatencyTracker(500)
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "failed": 0,
+            "flushes": 0,
+            "backpressure_waits": 0
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Write-behind persister started (batch {self.batch_size}, every {self.flush_interval}s)")
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Stop the flush loop once whatever is still buffered has been written."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        self._stopping = True
+        self._wake.set()
+        timeout = timeout if timeout is not None else settings.PERSIST_DRAIN_TIMEOUT
+        try:
+            await asyncio.wait_for(task, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Dropped {len(self._buffer)} buffered documents after a {timeout}s shutdown drain")
+            self.stats["failed"] += len(self._buffer)
+            self._buffer.clear()
+        finally:
+            self._stopping = False
+        logger.info("Write-behind persister stopped")
+
+    async def enqueue(self, documents: List[Dict[str, Any]]):
+        """Queue documents for the next flush; waits while the buffer is full."""
+        if not documents:
+            return
+        if self._task is None:
+            # Not started (no MongoDB, or tests): keep the old inline behaviour
+            await mongodb_service.insert_documents(documents, self.write_concern)
+            return
+
+        async with self._space:
+            for document in documents:
+                if len(self._buffer) >= self.max_queue:
+                    self.stats["backpressure_waits"] += 1
+                    self._wake.set()
+                    await self._space.wait_for(lambda: len(self._buffer) < self.max_queue)
+                self._buffer.append(document)
+                self.stats["enqueued"] += 1
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def enqueue_results(self, results: List[Dict[str, Any]]):
+        now = datetime.utcnow()
+        # Copies, so the route can keep serializing its own dicts while the batch is written
+        await self.enqueue([{"timestamp": now, **result} for result in results])
+
+    async def enqueue_crawl(self, crawl_data: Dict[str, Any]):
+        await self.enqueue([{"timestamp": datetime.utcnow(), **crawl_data, "type": "crawl"}])
+
+    async def enqueue_map(self, map_data: Dict[str, Any]):
+        await self.enqueue([{**map_data, "timestamp": datetime.utcnow(), "type": "map"}])
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._drain()
+        await self._drain()
+
+    async def _drain(self):
+        while self._buffer:
+            batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+            async with self._space:
+                self._space.notify_all()
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]):
+        started = time.monotonic()
+        try:
+            written = await mongodb_service.insert_documents(batch, self.write_concern)
+        except Exception as e:
+            logger.error(f"Write-behind flush of {len(batch)} documents failed: {e}")
+            written = 0
+        self._flush_latency.record(time.monotonic() - started)
+        self.stats["flushes"] += 1
+        self.stats["written"] += written
+        self.stats["failed"] += len(batch) - written
+
+    def get_state(self) -> Dict[str, Any]:
+        samples = self._flush_latency.samples
+        return {
+            "running": self.running,
+            "queue_depth": len(self._buffer),
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "write_concern": self.write_concern.document,
+            "last_flush_latency": round(samples[-1], 4) if samples else None,
+            "p95_flush_latency": round(self._flush_latency.percentile(95), 4) if samples else None,
+            **self.stats
+        }
+
+
+write_behind = WriteBehindPersister()
@@ -0,0 +1,131 @@
+"""Micro-benchmark for compressed content fields on realistic crawl documents.
+
+Builds crawl documents whose pages look like scraped markdown: a shared site header and
+footer, headings, link lists, and prose drawn from a Zipf-distributed vocabulary. For
+each codec it reports the compression ratio and the write cost (compress_fields plus
+BSON encoding, as MongoDBService does before insert_one). It also reports the read
+cost (BSON decoding plus decompress_fields), and whether the document fits
+MongoDB's 16 MB limit:
+
+    python -m benchmarks.compression_bench --pages 200 --page-chars 20000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+import bson
+
+# Settings require a MongoDB URI at import time; nothing here connects to it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+from app.services.compression import CODEC_NONE, CODEC_ZLIB, CODEC_ZSTD, compress_fields, decompress_fields, zstandard
+
+MONGODB_DOCUMENT_LIMIT = 16 * 1024 * 1024
+
+
+def build_vocabulary(rng: random.Random, size: int = 5000) -> List[str]:
+    letters = "etaoinshrdlcumwfgypbvkjxqz"
+    weights = [26 - i for i in range(len(letters))]
+    return ["".join(rng.choices(letters, weights=weights, k=rng.randint(2, 11))) for _ in range(size)]
+
+
+def build_page(rng: random.Random, vocabulary: List[str], zipf: List[float], site: str, index: int, chars: int) -> str:
+    header = f"[Home]({site}/) | [Docs]({site}/docs) | [Blog]({site}/blog) | [Pricing]({site}/pricing) | [Sign in]({site}/login)\n\n"
+    footer = f"\n\n---\nCopyright 2024 Example Corp. [Privacy]({site}/privacy) [Terms]({site}/terms) [Contact]({site}/contact)\n"
+    parts = [header, f"# {' '.join(rng.choices(vocabulary[:300], k=5)).title()}\n\n"]
+    size = len(header) + len(footer)
+    while size < chars:
+        roll = rng.random()
+        if roll < 0.1:
+            block = f"## {' '.join(rng.choices(vocabulary[:500], k=4)).title()}\n\n"
+        elif roll < 0.2:
+            block = "".join(
+                f"- [{' '.join(rng.choices(vocabulary[:800], k=3))}]({site}/page-{rng.randint(0, 5000)})\n"
+                for _ in range(rng.randint(3, 8))
+            ) + "\n"
+        else:
+            words = rng.choices(vocabulary, weights=zipf, k=rng.randint(40, 120))
+            block = " ".join(words).capitalize() + ".\n\n"
+        parts.append(block)
+        size += len(block)
+    parts.append(footer)
+    return "".join(parts)[:chars]
+
+
+def build_crawl_document(pages: int, page_chars: int, seed: int = 1) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(rng)
+    zipf = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    site = "https://bench.example"
+    return {
+        "base_url": site,
+        "type": "crawl",
+        "results": [
+            {
+                "url": f"{site}/page-{i}",
+                "title": f"Page {i}",
+                "raw_content": build_page(rng, vocabulary, zipf, site, i, page_chars),
+                "images": []
+            }
+            for i in range(pages)
+        ]
+    }
+
+
+def time_it(fn: Callable[[], Any], iterations: int) -> float:
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def run(pages: int, page_chars: int, min_chars: int, iterations: int) -> Dict[str, Any]:
+    document = build_crawl_document(pages, page_chars)
+    content_chars = sum(len(page["raw_content"]) for page in document["results"])
+    codecs = [(CODEC_NONE, None), (CODEC_ZLIB, 1), (CODEC_ZLIB, 6)]
+    if zstandard is not None:
+        codecs += [(CODEC_ZSTD, 1), (CODEC_ZSTD, 3), (CODEC_ZSTD, 9)]
+
+    results: Dict[str, Any] = {"pages": pages, "content_chars": content_chars, "codecs": {}}
+    baseline_bytes = None
+    for codec, level in codecs:
+        def write() -> bytes:
+            return bson.encode(compress_fields(document, codec, min_chars, level))
+
+        encoded = write()
+
+        def read():
+            decompress_fields([bson.decode(encoded)])
+
+        baseline_bytes = baseline_bytes or len(encoded)
+        name = codec if level is None else f"{codec}-{level}"
+        results["codecs"][name] = {
+            "document_bytes": len(encoded),
+            "ratio": round(baseline_bytes / len(encoded), 2),
+            "fits_16mb": len(encoded) <= MONGODB_DOCUMENT_LIMIT,
+            "write_ms": time_it(write, iterations),
+            "read_ms": time_it(read, iterations)
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compression ratio and cost for content fields in crawl documents")
+    parser.add_argument("--pages", type=int, default=200, help="Pages per crawl document")
+    parser.add_argument("--page-chars", type=int, default=20000, help="Size of each page's raw_content")
+    parser.add_argument("--min-chars", type=int, default=4096, help="Compress fields at least this long")
+    parser.add_argument("--iterations", type=int, default=10)
+    args = parser.parse_args()
+
+    print(json.dumps(run(args.pages, args.page_chars, args.min_chars, args.iterations), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+"""End-to-end load test for the Web Intelligence API against the local Tavily stand-in.
+
+By default this starts the stand-in and the API (uvicorn main:app) as subprocesses,
+drives every route with a closed-loop load generator and writes throughput and
+latency percentiles to a JSON baseline:
+
+    python -m benchmarks.load_test --duration 10 --concurrency 16
+    python -m benchmarks.load_test --compare benchmarks/baselines/<previous>.json
+
+Use --target to load an API that is already running (it must be configured with
+TAVILY_BASE_URL pointing at a stand-in, or it will spend real credits).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@dataclass
+class Scenario:
+    name: str
+    method: str
+    path: str
+    body: Optional[Callable[[], Dict[str, Any]]] = None
+    stream: bool = False
+
+
+def _unique() -> str:
+    return uuid.uuid4().hex[:8]
+
+
+SCENARIOS: List[Scenario] = [
+    Scenario("root", "GET", "/"),
+    Scenario("health", "GET", "/health"),
+    Scenario("health_upstream", "GET", "/health/upstream"),
+    Scenario("search", "POST", "/web_search/search", lambda: {
+        "queries": [f"load test query {_unique()}", f"second query {_unique()}"],
+        "search_depth": "basic",
+        "no_cache": True
+    }),
+    Scenario("search_cached", "POST", "/web_search/search", lambda: {
+        "queries": ["load test cached query"],
+        "search_depth": "basic"
+    }),
+    Scenario("search_stream", "POST", "/web_search/search/stream", lambda: {
+        "queries": [f"streamed query {_unique()}" for _ in range(3)],
+        "search_depth": "basic",
+        "no_cache": True
+    }, stream=True),
+    Scenario("search_results", "GET", "/web_search/results?limit=10"),
+    Scenario("search_stats", "GET", "/web_search/stats"),
+    Scenario("search_cache_stats", "GET", "/web_search/cache/stats"),
+    Scenario("extract", "POST", "/extract/", lambda: {
+        "urls": [f"https://stub.example/{_unique()}" for _ in range(5)],
+        "no_cache": True
+    }),
+    Scenario("crawl", "POST", "/crawl/", lambda: {"url": f"https://stub.example/{_unique()}", "limit": 10}),
+    Scenario("crawl_job_submit", "POST", "/crawl/jobs", lambda: {"url": f"https://stub.example/{_unique()}"}),
+    Scenario("map", "POST", "/map/", lambda: {"url": f"https://stub.example/{_unique()}", "limit": 20}),
+    Scenario("map_job_submit", "POST", "/map/jobs", lambda: {"url": f"https://stub.example/{_unique()}"}),
+    Scenario("beautify", "POST", "/beautify/correct", lambda: {"queries": ["pyhton fastapi tutrial"]}),
+    Scenario("flow", "POST", "/flow/generate", lambda: {"prompt": "search latest AI news and summarize"})
+]
+
+
+@dataclass
+class ScenarioResult:
+    latencies: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+    def record(self, status: str, latency: float):
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.latencies.append(latency)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100.0
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def summarize(result: ScenarioResult) -> Dict[str, Any]:
+    latencies = sorted(result.latencies)
+    ok = sum(count for status, count in result.statuses.items() if status.startswith("2"))
+    total = len(latencies)
+    return {
+        "requests": total,
+        "ok": ok,
+        "error_rate": round(1 - ok / total, 4) if total else 0.0,
+        "throughput_rps": round(total / result.elapsed, 2) if result.elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / total * 1000, 2) if total else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0
+        },
+        "statuses": result.statuses
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, duration: float, concurrency: int) -> ScenarioResult:
+    result = ScenarioResult()
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        while time.monotonic() < deadline:
+            body = scenario.body() if scenario.body else None
+            started = time.monotonic()
+            try:
+                if scenario.stream:
+                    async with client.stream(scenario.method, scenario.path, json=body) as response:
+                        async for _ in response.aiter_lines():
+                            pass
+                else:
+                    response = await client.request(scenario.method, scenario.path, json=body)
+                    response.read()
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            result.record(status, time.monotonic() - started)
+
+    started = time.monotonic()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed = time.monotonic() - started
+    return result
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(url: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Timed out waiting for {url}")
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def check_route_coverage(scenarios: List[Scenario]):
+    try:
+        os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+        from main import app
+    except Exception as e:
+        print(f"Could not import the app to check route coverage: {e}")
+        return
+
+    covered = {(s.method, s.path.split("?")[0]) for s in scenarios}
+    for route in app.routes:
+        methods = getattr(route, "methods", None) or set()
+        path = getattr(route, "path", "")
+        if path.startswith(("/docs", "/redoc", "/openapi")) or "{" in path:
+            continue
+        for method in methods - {"HEAD", "OPTIONS"}:
+            if (method, path) not in covered:
+                print(f"warning: route {method} {path} has no load-test scenario")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> bool:
+    regressed = False
+    print(f"\nComparison against {baseline['meta'].get('commit')} (threshold {threshold:.0%}):")
+    print(f"{'scenario':<22}{'p50':>16}{'p95':>16}{'p99':>16}{'rps':>16}")
+    for name, stats in current["scenarios"].items():
+        previous = baseline["scenarios"].get(name)
+        if previous is None:
+            continue
+        cells = []
+        for metric in ("p50", "p95", "p99"):
+            before, after = previous["latency_ms"][metric], stats["latency_ms"][metric]
+            change = (after - before) / before if before else 0.0
+            flag = "!" if change > threshold else " "
+            regressed |= metric != "p50" and change > threshold
+            cells.append(f"{after:>8.1f} {change:+6.0%}{flag}")
+        before, after = previous["throughput_rps"], stats["throughput_rps"]
+        change = (after - before) / before if before else 0.0
+        flag = "!" if change < -threshold else " "
+        regressed |= change < -threshold
+        cells.append(f"{after:>8.1f} {change:+6.0%}{flag}")
+        print(f"{name:<22}" + "".join(cells))
+    return regressed
+
+
+async def run(args) -> Dict[str, Any]:
+    selected = [s for s in SCENARIOS if not args.scenarios or s.name in args.scenarios]
+    async with httpx.AsyncClient(base_url=args.target, timeout=args.request_timeout) as client:
+        report = {}
+        for scenario in selected:
+            print(f"Running {scenario.name} for {args.duration:g}s at concurrency {args.concurrency}...")
+            result = await run_scenario(client, scenario, args.duration, args.concurrency)
+            report[scenario.name] = summarize(result)
+            latency = report[scenario.name]["latency_ms"]
+            print(
+                f"  {report[scenario.name]['throughput_rps']:.1f} req/s, "
+                f"p50 {latency['p50']:.1f} ms, p95 {latency['p95']:.1f} ms, p99 {latency['p99']:.1f} ms, "
+                f"statuses {report[scenario.name]['statuses']}"
+            )
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test every API route against a local Tavily stand-in")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run each scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per scenario")
+    parser.add_argument("--scenarios", nargs="*", help="Only run these scenarios")
+    parser.add_argument("--target", help="Base URL of an already running API (skips starting servers)")
+    parser.add_argument("--request-timeout", type=float, default=60.0)
+    parser.add_argument("--stub-latency-ms", type=float, default=200.0)
+    parser.add_argument("--stub-latency-distribution", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    parser.add_argument("--stub-error-rate", type=float, default=0.0)
+    parser.add_argument("--stub-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--stub-raw-content-bytes", type=int, default=5000)
+    parser.add_argument("--output", help="Where to write the JSON baseline (default: benchmarks/baselines/<commit>.json)")
+    parser.add_argument("--compare", help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Relative change that counts as a regression")
+    args = parser.parse_args()
+
+    check_route_coverage(SCENARIOS)
+
+    processes = []
+    stub_args = {
+        "latency_distribution": args.stub_latency_distribution,
+        "latency_ms": args.stub_latency_ms,
+        "error_rate": args.stub_error_rate,
+        "rate_limit_rate": args.stub_rate_limit_rate,
+        "raw_content_bytes": args.stub_raw_content_bytes
+    }
+    try:
+        if not args.target:
+            stub_port, api_port = _free_port(), _free_port()
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.tavily_stub", "--port", str(stub_port)]
+                + [item for key, value in stub_args.items() for item in (f"--{key.replace('_', '-')}", str(value))],
+                cwd=REPO_ROOT
+            ))
+            _wait_for(f"http://127.0.0.1:{stub_port}/")
+
+            env = {
+                **os.environ,
+                "TAVILY_BASE_URL": f"http://127.0.0.1:{stub_port}",
+                "TAVILY_API_KEY": "stub-key",
+                "OPENAI_API_KEY": "",
+                "MONGODB_URI": os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
+            }
+            processes.append(subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "main:app", "--port", str(api_port), "--log-level", "warning"],
+                cwd=REPO_ROOT,
+                env=env
+            ))
+            args.target = f"http://127.0.0.1:{api_port}"
+            _wait_for(f"{args.target}/health")
+
+        scenarios = asyncio.run(run(args))
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait(timeout=10)
+
+    commit = _git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "duration": args.duration,
+            "concurrency": args.concurrency,
+            "target": args.target,
+            "stub": stub_args if processes else None
+        },
+        "scenarios": scenarios
+    }
+
+    output = Path(args.output) if args.output else BASELINE_DIR / f"{commit or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote baseline to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if compare(report, baseline, args.threshold):
+            print("\nPerformance regression detected")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Micro-benchmark for response serialization on large crawl and extract payloads.
+
+Compares, through FastAPI in-process, the default path (route returns a dict or a
+model and FastAPI re-validates it against response_model and runs jsonable_encoder)
+with the fast path in app.api.responses (one validation, orjson or msgpack):
+
+    python -m benchmarks.serialization_bench --pages 200 --raw-content-bytes 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+import httpx
+from fastapi import FastAPI, Request
+
+# Settings require a MongoDB URI at import time; nothing here connects to it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:27017")
+
+from app.api.models.crawl import CrawlResponse
+from app.api.models.extract import ExtractResponse
+from app.api.responses import fast_response
+from benchmarks.tavily_stub import StubConfig, TavilyStub
+
+
+def build_payloads(pages: int, raw_content_bytes: int) -> Dict[str, Dict[str, Any]]:
+    stub = TavilyStub(StubConfig(results_per_request=pages, raw_content_bytes=raw_content_bytes, seed=1))
+    crawl = stub._build_payload("crawl", {"url": "https://bench.example", "limit": pages})
+    urls = [f"https://bench.example/page-{i}" for i in range(pages)]
+    extract_data = stub._build_payload("extract", {"urls": urls})
+    extract = {
+        "results": extract_data["results"],
+        "answer": None,
+        "failed_results": [],
+        "summary": {"total": pages, "successful": pages, "failed": 0, "cached": 0}
+    }
+    return {"crawl": crawl, "extract": extract}
+
+
+def build_app(payloads: Dict[str, Dict[str, Any]]) -> FastAPI:
+    app = FastAPI()
+
+    # Mirrors app/api/routes/crawl.py: the service dict is returned and FastAPI validates it
+    @app.post("/default/crawl", response_model=CrawlResponse)
+    async def default_crawl() -> Any:
+        return payloads["crawl"]
+
+    # Mirrors app/api/routes/extract.py: a model is built, then FastAPI validates it again
+    @app.post("/default/extract", response_model=ExtractResponse)
+    async def default_extract() -> Any:
+        return ExtractResponse(**payloads["extract"])
+
+    @app.post("/fast/crawl", response_model=CrawlResponse)
+    async def fast_crawl(request: Request) -> Any:
+        return fast_response(request, CrawlResponse, payloads["crawl"])
+
+    @app.post("/fast/extract", response_model=ExtractResponse)
+    async def fast_extract(request: Request) -> Any:
+        return fast_response(request, ExtractResponse, payloads["extract"])
+
+    return app
+
+
+async def time_route(client: httpx.AsyncClient, path: str, headers: Dict[str, str], iterations: int) -> Dict[str, float]:
+    await client.post(path, headers=headers)
+    samples: List[float] = []
+    size = 0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        response = await client.post(path, headers=headers)
+        samples.append(time.perf_counter() - started)
+        response.raise_for_status()
+        size = len(response.content)
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 3),
+        "min_ms": round(min(samples) * 1000, 3),
+        "bytes": size
+    }
+
+
+async def run(pages: int, raw_content_bytes: int, iterations: int) -> Dict[str, Any]:
+    app = build_app(build_payloads(pages, raw_content_bytes))
+    variants: Dict[str, Callable[[str], tuple]] = {
+        "default_json": lambda kind: (f"/default/{kind}", {}),
+        "fast_orjson": lambda kind: (f"/fast/{kind}", {}),
+        "fast_msgpack": lambda kind: (f"/fast/{kind}", {"Accept": "application/msgpack"})
+    }
+    results: Dict[str, Any] = {}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for kind in ("crawl", "extract"):
+            results[kind] = {}
+            for name, variant in variants.items():
+                path, headers = variant(kind)
+                results[kind][name] = await time_route(client, path, headers, iterations)
+            baseline = results[kind]["default_json"]["median_ms"]
+            for name in ("fast_orjson", "fast_msgpack"):
+                results[kind][name]["speedup"] = round(baseline / results[kind][name]["median_ms"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare default and fast response serialization")
+    parser.add_argument("--pages", type=int, default=200, help="Pages per crawl/extract payload")
+    parser.add_argument("--raw-content-bytes", type=int, default=20000, help="Size of each raw_content body")
+    parser.add_argument("--iterations", type=int, default=30)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.pages, args.raw_content_bytes, args.iterations))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""Local stand-in for the Tavily API, used for load testing without spending credits.
+
+Run it standalone with:
+
+    python -m benchmarks.tavily_stub --port 8765 --latency-ms 300 --rate-limit-rate 0.05
+
+and point the API at it with TAVILY_BASE_URL=http://127.0.0.1:8765.
+"""
+
+import argparse
+import asyncio
+import random
+import string
+import time
+import uuid
+from typing import Any, Dict, List, Literal, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
+
+
+class StubConfig(BaseModel):
+    latency_distribution: Literal["fixed", "uniform", "lognormal"] = Field(
+        "lognormal", description="Shape of the simulated upstream latency"
+    )
+    latency_ms: float = Field(200.0, ge=0, description="Median (lognormal), centre (uniform) or exact (fixed) latency")
+    latency_jitter_ms: float = Field(100.0, ge=0, description="Half-width of the uniform distribution")
+    latency_sigma: float = Field(0.5, ge=0, description="Sigma of the lognormal distribution (tail heaviness)")
+    endpoint_latency_factor: Dict[str, float] = Field(
+        default_factory=lambda: {"search": 1.0, "extract": 1.5, "crawl": 4.0, "map": 2.0},
+        description="Per-endpoint multiplier applied to the sampled latency"
+    )
+    error_rate: float = Field(0.0, ge=0, le=1, description="Fraction of requests answered with a 500")
+    rate_limit_rate: float = Field(0.0, ge=0, le=1, description="Fraction of requests answered with a 429")
+    retry_after_seconds: Optional[float] = Field(1.0, ge=0, description="Retry-After sent with 429s (None to omit)")
+    results_per_request: int = Field(5, ge=0, description="Results returned by search, crawl and map")
+    content_bytes: int = Field(500, ge=0, description="Size of each result's content snippet")
+    raw_content_bytes: int = Field(5000, ge=0, description="Size of each raw_content body (extract and crawl)")
+    seed: Optional[int] = Field(None, description="Seed for reproducible runs")
+
+
+class TavilyStub:
+    def __init__(self, config: Optional[StubConfig] = None):
+        self.config = config or StubConfig()
+        self.random = random.Random(self.config.seed)
+        self.stats: Dict[str, Dict[str, int]] = {}
+        self.app = self._build_app()
+
+    def sample_latency(self, endpoint: str) -> float:
+        config = self.config
+        if config.latency_distribution == "fixed":
+            latency = config.latency_ms
+        elif config.latency_distribution == "uniform":
+            latency = self.random.uniform(
+                max(0.0, config.latency_ms - config.latency_jitter_ms),
+                config.latency_ms + config.latency_jitter_ms
+            )
+        else:
+            latency = config.latency_ms * self.random.lognormvariate(0, config.latency_sigma)
+        return latency * config.endpoint_latency_factor.get(endpoint, 1.0) / 1000.0
+
+    def _text(self, size: int) -> str:
+        if size <= 0:
+            return ""
+        word = "".join(self.random.choices(string.ascii_lowercase, k=7))
+        return ((word + " ") * (size // 8 + 1))[:size]
+
+    def _page(self, url: str, raw: bool) -> Dict[str, Any]:
+        page = {
+            "url": url,
+            "title": f"Stub page {url.rsplit('/', 1)[-1] or 'index'}",
+            "content": self._text(self.config.content_bytes)
+        }
+        if raw:
+            page["raw_content"] = self._text(self.config.raw_content_bytes)
+            page["images"] = []
+        return page
+
+    def _record(self, endpoint: str, outcome: str):
+        counters = self.stats.setdefault(endpoint, {"requests": 0, "ok": 0, "rate_limited": 0, "errors": 0})
+        counters["requests"] += 1
+        counters[outcome] += 1
+
+    async def _respond(self, endpoint: str, body: Dict[str, Any]) -> JSONResponse:
+        started = time.monotonic()
+        await asyncio.sleep(self.sample_latency(endpoint))
+
+        roll = self.random.random()
+        if roll < self.config.rate_limit_rate:
+            self._record(endpoint, "rate_limited")
+            headers = {}
+            if self.config.retry_after_seconds is not None:
+                headers["Retry-After"] = f"{self.config.retry_after_seconds:g}"
+            return JSONResponse({"detail": "Rate limit exceeded"}, status_code=429, headers=headers)
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            self._record(endpoint, "errors")
+            return JSONResponse({"detail": "Injected upstream error"}, status_code=500)
+
+        self._record(endpoint, "ok")
+        payload = self._build_payload(endpoint, body)
+        payload["response_time"] = round(time.monotonic() - started, 3)
+        payload["request_id"] = uuid.uuid4().hex
+        return JSONResponse(payload)
+
+    def _build_payload(self, endpoint: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        count = self.config.results_per_request
+        if endpoint == "search":
+            count = min(count, body.get("max_results") or count)
+            results = [
+                {**self._page(f"https://stub.example/{i}", raw=False), "score": round(1 - i / 100, 3)}
+                for i in range(count)
+            ]
+            answer = self._text(200) if body.get("include_answer") else None
+            return {"query": body.get("query"), "answer": answer, "results": results}
+
+        if endpoint == "extract":
+            urls: List[str] = body.get("urls") or []
+            return {
+                "results": [self._page(url, raw=True) for url in urls],
+                "failed_results": [],
+                "answer": self._text(200) if body.get("include_answer") else None
+            }
+
+        base_url = (body.get("url") or "https://stub.example").rstrip("/")
+        count = min(count, body.get("limit") or count)
+        usage = {"credits": max(1, count // 10)}
+        if endpoint == "crawl":
+            results = [self._page(f"{base_url}/page-{i}", raw=True) for i in range(count)]
+            return {"base_url": base_url, "results": results, "usage": usage}
+        return {
+            "base_url": base_url,
+            "results": [f"{base_url}/page-{i}" for i in range(count)],
+            "usage": usage
+        }
+
+    def _build_app(self) -> FastAPI:
+        app = FastAPI(title="Tavily stand-in", docs_url=None, redoc_url=None)
+
+        async def handle(endpoint: str, request: Request) -> JSONResponse:
+            try:
+                body = await request.json()
+            except ValueError:
+                body = {}
+            return await self._respond(endpoint, body)
+
+        def make_route(endpoint: str):
+            async def route(request: Request) -> JSONResponse:
+                return await handle(endpoint, request)
+            return route
+
+        for endpoint in ("search", "extract", "crawl", "map"):
+            app.add_api_route(f"/{endpoint}", make_route(endpoint), methods=["POST"])
+
+        # The API pre-warms its connection pool with HEAD requests on the base URL
+        @app.api_route("/", methods=["GET", "HEAD"])
+        async def root() -> Dict[str, str]:
+            return {"status": "ok"}
+
+        @app.get("/__stats")
+        async def get_stats() -> Dict[str, Any]:
+            return self.stats
+
+        @app.post("/__config")
+        async def update_config(update: Dict[str, Any]) -> Dict[str, Any]:
+            self.config = StubConfig(**{**self.config.model_dump(), **update})
+            if "seed" in update:
+                self.random.seed(self.config.seed)
+            return self.config.model_dump()
+
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local Tavily stand-in server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    for name, field in StubConfig.model_fields.items():
+        if field.annotation in (int, float, Optional[int], Optional[float]):
+            kind = int if field.annotation in (int, Optional[int]) else float
+            parser.add_argument(f"--{name.replace('_', '-')}", type=kind, default=field.default, help=field.description)
+    parser.add_argument("--latency-distribution", choices=["fixed", "uniform", "lognormal"], default="lognormal")
+    args = parser.parse_args()
+
+    config = StubConfig(**{
+        name: getattr(args, name) for name in StubConfig.model_fields
+        if hasattr(args, name)
+    })
+
+    import uvicorn
+    uvicorn.run(TavilyStub(config).app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
-from app.api.routes import search, extract, crawl, map, beautify, flow
+from app.api.routes import search, extract, crawl, map, beautify, flow, usage
 from app.services.mongodb_service import MongoDBService
+from app.services.tavily_service import tavily_service
+from app.services.job_queue import job_queue
+from app.services.job_worker import job_worker
+from app.services.write_behind import write_behind
+from app.services.stats_reconciler import stats_reconciler
+from app.services.retention import retention_job
 from app.core.config import settings
 
 logging.basicConfig(
@@ -28,15 +34,66 @@ async def lifespan(app: FastAPI):
         # Don't raise - allow app to continue without MongoDB
         app.state.mongodb_service = None
     
+    if app.state.mongodb_service and settings.PERSIST_WRITE_BEHIND_ENABLED:
+        write_behind.start()
+    
+    if app.state.mongodb_service and settings.STATS_RECONCILE_ENABLED:
+        stats_reconciler.start()
+    
+    if app.state.mongodb_service and settings.RETENTION_DAYS:
+        retention_job.start()
+    
+    try:
+        await tavily_service.start()
+    except Exception as e:
+        logger.warning(f"Failed to start Tavily connection pool: {e}. Requests will use per-call clients.")
+    
+    if app.state.mongodb_service:
+        try:
+            # Heartbeats even without workers: this process holds the caller keys of the jobs it accepts
+            await job_queue.ensure_indexes()
+            await job_queue.start()
+        except Exception as e:
+            logger.warning(f"Failed to start job queue heartbeat: {e}. Caller-key jobs may be failed by other workers.")
+    
+    if app.state.mongodb_service and settings.JOB_WORKERS_ENABLED:
+        try:
+            await job_worker.start()
+        except Exception as e:
+            logger.warning(f"Failed to start job worker: {e}. Crawl and map jobs will wait for another worker.")
+    
     yield
     
     logger.info("Shutting down FastAPI application...")
+    try:
+        await job_worker.stop()
+    except Exception as e:
+        logger.error(f"Error stopping job worker: {e}")
+    
+    try:
+        await job_queue.stop()
+    except Exception as e:
+        logger.error(f"Error stopping job queue heartbeat: {e}")
+    
+    await stats_reconciler.stop()
+    await retention_job.stop()
+    
+    try:
+        await write_behind.stop()
+    except Exception as e:
+        logger.error(f"Error draining write-behind persister: {e}")
+    
     if mongodb_service:
         try:
             await mongodb_service.close()
             logger.info("MongoDB connection closed")
         except Exception as e:
             logger.error(f"Error closing MongoDB connection: {e}")
+    
+    try:
+        await tavily_service.close()
+    except Exception as e:
+        logger.error(f"Error closing Tavily connection pool: {e}")
 
 
 app = FastAPI(
@@ -62,6 +119,7 @@ app.include_router(crawl.router, prefix="/crawl", tags=["Crawl"])
 app.include_router(map.router, prefix="/map", tags=["Map"])
 app.include_router(beautify.router, prefix="/beautify", tags=["Beautify"])
 app.include_router(flow.router, prefix="/flow", tags=["Flow"])
+app.include_router(usage.router, prefix="/usage", tags=["Usage"])
 
 
 @app.get("/", tags=["Health"])
@@ -83,6 +141,32 @@ async def health_check():
     }
 
 
+@app.get("/health/upstream", tags=["Health"])
+async def upstream_health():
+    return {
+        "tavily": tavily_service.resilience.get_state(),
+        "hedging": tavily_service.hedger.get_state(),
+        "scheduler": tavily_service.scheduler.get_state(),
+        "search_latency": tavily_service.latency_model.get_state()
+    }
+
+
+@app.get("/health/persistence", tags=["Health"])
+async def persistence_health():
+    return write_behind.get_state()
+
+
+@app.get("/health/indexes", tags=["Health"])
+async def index_health():
+    if not app.state.mongodb_service:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="MongoDB is not connected")
+    patterns = await app.state.mongodb_service.explain_query_plans()
+    return {
+        "all_indexed": all(pattern["uses_index"] for pattern in patterns.values()),
+        "patterns": patterns
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
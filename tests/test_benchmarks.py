@@ -0,0 +1,127 @@
+"""Tests for the benchmarks package (Tavily stand-in and load-test helpers)."""
+
+import httpx
+import pytest
+from unittest.mock import patch
+
+from benchmarks.compression_bench import run as run_compression_bench
+from benchmarks.load_test import ScenarioResult, percentile, summarize
+from benchmarks.tavily_stub import StubConfig, TavilyStub
+from app.services.tavily_service import TavilyService
+
+
+def stub_client(**config):
+    stub = TavilyStub(StubConfig(latency_distribution="fixed", latency_ms=0, seed=1, **config))
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub.app), base_url="http://stub")
+    return stub, client
+
+
+class TestTavilyStub:
+    """Tests for the local Tavily stand-in."""
+
+    @pytest.mark.asyncio
+    async def test_endpoints_return_configured_payload_sizes(self):
+        """Test each endpoint answers with Tavily-shaped payloads of the configured size."""
+        stub, client = stub_client(results_per_request=3, content_bytes=50, raw_content_bytes=100)
+        async with client:
+            search = (await client.post("/search", json={"query": "q", "include_answer": True})).json()
+            extract = (await client.post("/extract", json={"urls": ["https://a.test/1", "https://a.test/2"]})).json()
+            crawl = (await client.post("/crawl", json={"url": "https://a.test"})).json()
+            site_map = (await client.post("/map", json={"url": "https://a.test", "limit": 2})).json()
+        
+        assert len(search["results"]) == 3 and search["answer"]
+        assert len(search["results"][0]["content"]) == 50
+        assert [r["url"] for r in extract["results"]] == ["https://a.test/1", "https://a.test/2"]
+        assert len(crawl["results"][0]["raw_content"]) == 100
+        assert site_map["results"] == ["https://a.test/page-0", "https://a.test/page-1"]
+        assert stub.stats["search"]["ok"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_injection(self):
+        """Test 429s are injected with a Retry-After header."""
+        stub, client = stub_client(rate_limit_rate=1.0, retry_after_seconds=2)
+        async with client:
+            response = await client.post("/search", json={"query": "q"})
+        
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "2"
+        assert stub.stats["search"]["rate_limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_runtime_config_update(self):
+        """Test the stand-in can be reconfigured while running."""
+        stub, client = stub_client()
+        async with client:
+            await client.post("/__config", json={"error_rate": 1.0})
+            response = await client.post("/map", json={"url": "https://a.test"})
+        
+        assert response.status_code == 500
+
+    def test_latency_distributions(self):
+        """Test sampled latencies follow the configured distribution."""
+        stub = TavilyStub(StubConfig(latency_distribution="uniform", latency_ms=100, latency_jitter_ms=50, seed=1))
+        samples = [stub.sample_latency("search") for _ in range(200)]
+        assert all(0.05 <= s <= 0.15 for s in samples)
+        
+        stub.config = StubConfig(latency_distribution="fixed", latency_ms=100)
+        assert stub.sample_latency("crawl") == pytest.approx(0.4)
+
+    @pytest.mark.asyncio
+    async def test_tavily_service_against_stub(self):
+        """Test TavilyService works end to end against the stand-in."""
+        stub, client = stub_client()
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = "stub-key"
+            mock_settings.TAVILY_BASE_URL = "http://stub"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "basic"
+            service = TavilyService()
+        service._client = client
+        
+        with patch('app.services.search_cache.mongodb_service') as mock_mongodb:
+            mock_mongodb.cache_collection = None
+            result = await service.search("stub query")
+        
+        assert result["search_metadata"]["result_count"] == 5
+        await service.close()
+
+
+class TestLoadTestStatistics:
+    """Tests for load-test summary statistics."""
+
+    def test_percentile_interpolates(self):
+        """Test percentiles use linear interpolation between ranks."""
+        values = [1.0, 2.0, 3.0, 4.0, 5.0]
+        assert percentile(values, 50) == 3.0
+        assert percentile(values, 95) == pytest.approx(4.8)
+        assert percentile([], 99) == 0.0
+
+    def test_summarize(self):
+        """Test throughput, error rate and latency summary."""
+        result = ScenarioResult(elapsed=2.0)
+        for latency in (0.1, 0.2, 0.3, 0.4):
+            result.record("200", latency)
+        result.record("503", 0.5)
+        
+        summary = summarize(result)
+        
+        assert summary["requests"] == 5
+        assert summary["ok"] == 4
+        assert summary["error_rate"] == 0.2
+        assert summary["throughput_rps"] == 2.5
+        assert summary["latency_ms"]["p50"] == 300.0
+        assert summary["statuses"] == {"200": 4, "503": 1}
+
+
+class TestCompressionBench:
+    """Tests for the compression benchmark."""
+
+    def test_reports_ratio_and_cost(self):
+        """Test every codec is measured and compression shrinks realistic pages."""
+        results = run_compression_bench(pages=5, page_chars=8000, min_chars=4096, iterations=1)
+
+        assert results["content_chars"] == 40000
+        assert results["codecs"]["none"]["ratio"] == 1.0
+        assert results["codecs"]["zlib-6"]["ratio"] > 1.5
+        assert all(entry["fits_16mb"] and entry["write_ms"] >= 0 for entry in results["codecs"].values())
@@ -0,0 +1,118 @@
+"""Tests for app.services.compression module and compressed storage in MongoDBService."""
+
+import bson
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.compression import (
+    compress_fields,
+    compress_text,
+    decompress_fields,
+    decompress_text,
+    is_compressed,
+    resolve_codec
+)
+from app.services.content_refs import content_hash
+from app.services.mongodb_service import MongoDBService
+
+PAGE = "# Title\n\nSome scraped page text with repeated boilerplate. " * 200
+
+rollups = MagicMock()
+rollups.bulk_write = AsyncMock()
+
+
+class AsyncCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class TestCompression:
+    """Tests for compressing content fields."""
+
+    @pytest.mark.parametrize("codec", ["zlib", "zstd"])
+    def test_round_trip_through_bson(self, codec):
+        """Test a compressed field survives BSON encoding and records its codec."""
+        value = compress_text(PAGE, codec)
+        decoded = bson.decode(bson.encode({"raw_content": value}))["raw_content"]
+
+        assert decoded["codec"] == codec
+        assert decoded["size"] == len(PAGE)
+        assert len(decoded["data"]) < len(PAGE) / 5
+        assert decompress_text(decoded) == PAGE
+
+    def test_compress_fields_threshold_and_copy(self):
+        """Test only large fields are compressed, in a copy of the document."""
+        document = {"content": "short", "results": [{"url": "a", "raw_content": PAGE}, "https://b"]}
+
+        stored = compress_fields(document, "zlib", min_size=1000)
+
+        assert stored["content"] == "short"
+        assert is_compressed(stored["results"][0]["raw_content"])
+        assert stored["results"][1] == "https://b"
+        assert document["results"][0]["raw_content"] == PAGE
+        assert compress_fields(document, "none", min_size=0) is document
+
+    def test_decompress_fields(self):
+        """Test fields are decoded in place, or blanked when content is not wanted."""
+        stored = compress_fields({"results": [{"raw_content": PAGE}]}, "zstd", min_size=0)
+
+        assert decompress_fields([dict(stored, results=[dict(stored["results"][0])])])[0]["results"][0]["raw_content"] == PAGE
+        assert decompress_fields([stored], keep=False)[0]["results"][0]["raw_content"] is None
+
+    def test_resolve_codec(self):
+        """Test zstd falls back to zlib without the package and unknown codecs fail."""
+        with patch("app.services.compression.zstandard", None):
+            assert resolve_codec("zstd") == "zlib"
+        assert resolve_codec("none") == "none"
+        with pytest.raises(ValueError):
+            resolve_codec("lz4")
+
+
+class TestMongoDBServiceCompression:
+    """Tests for compression on write and decompression on read."""
+
+    @pytest.mark.asyncio
+    async def test_inline_fields_compressed_without_dedup(self):
+        """Test large content left inline is compressed before insert."""
+        service = MongoDBService()
+        collection = MagicMock()
+        collection.insert_many = AsyncMock(return_value=MagicMock(inserted_ids=[1]))
+        with patch.object(service, "collection", collection), \
+             patch.object(service, "compression_codec", "zlib"), \
+             patch("app.services.mongodb_service.settings") as mock_settings:
+            mock_settings.CONTENT_DEDUP_ENABLED = False
+            mock_settings.CONTENT_COMPRESSION_MIN_CHARS = 4096
+            mock_settings.CONTENT_COMPRESSION_LEVEL = None
+            await service.insert_documents([{"results": [{"url": "a", "raw_content": PAGE}]}])
+
+        stored = collection.insert_many.call_args.args[0][0]
+        assert stored["results"][0]["raw_content"]["codec"] == "zlib"
+
+    @pytest.mark.asyncio
+    async def test_content_store_bodies_compressed_and_joined(self):
+        """Test deduplicated bodies are stored compressed and come back as text."""
+        service = MongoDBService()
+        content = MagicMock()
+        content.bulk_write = AsyncMock()
+        collection = MagicMock()
+        collection.insert_many = AsyncMock(return_value=MagicMock(inserted_ids=[1]))
+        db = MagicMock()
+        db.__getitem__.side_effect = lambda name: content if name == "page_content" else rollups
+        with patch.object(service, "collection", collection), patch.object(service, "db", db), \
+             patch.object(service, "compression_codec", "zstd"):
+            await service.insert_documents([{"results": [{"url": "a", "raw_content": PAGE}]}])
+            operation = content.bulk_write.call_args.args[0][0]
+            body = operation._doc["$setOnInsert"]["body"]
+            content.find.return_value = AsyncCursor([{"_id": content_hash(PAGE), "body": body}])
+            documents = await service.join_content([{"results": [{"raw_content_ref": content_hash(PAGE)}]}])
+
+        assert body["codec"] == "zstd"
+        assert documents[0]["results"][0]["raw_content"] == PAGE
+
@@ -0,0 +1,152 @@
+"""Tests for app.services.content_refs module and content dedup in MongoDBService."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.content_refs import content_hash, dehydrate, hydrate, referenced_hashes
+from app.services.mongodb_service import MongoDBService
+
+PAGE = "page body " * 50
+
+rollups = MagicMock()
+rollups.bulk_write = AsyncMock()
+
+
+class AsyncCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+
+class TestContentRefs:
+    """Tests for swapping page bodies with content hashes."""
+
+    def test_dehydrate_top_level_and_nested(self):
+        """Test bodies in the document and in its results are replaced by references."""
+        document = {"query": "q", "content": PAGE, "results": [{"url": "a", "raw_content": PAGE}, "https://b"]}
+
+        stored, bodies = dehydrate(document)
+
+        digest = content_hash(PAGE)
+        assert stored["content_ref"] == digest and "content" not in stored
+        assert stored["results"][0] == {"url": "a", "raw_content_ref": digest}
+        assert stored["results"][1] == "https://b"
+        assert bodies == {digest: PAGE}
+        # The caller's document is left alone
+        assert document["content"] == PAGE and document["results"][0]["raw_content"] == PAGE
+
+    def test_small_bodies_stay_inline(self):
+        """Test bodies under the minimum size are not referenced."""
+        document = {"content": "short", "raw_content": None}
+
+        stored, bodies = dehydrate(document, min_size=10)
+
+        assert stored is document
+        assert bodies == {}
+
+    def test_round_trip(self):
+        """Test hydrate restores exactly what dehydrate removed."""
+        document = {"content": PAGE, "results": [{"url": "a", "raw_content": PAGE + "x"}]}
+        stored, bodies = dehydrate(document)
+
+        assert referenced_hashes([stored]) == set(bodies)
+        assert hydrate([stored], bodies) == [document]
+
+    def test_missing_body_hydrates_to_none(self):
+        """Test a dangling reference becomes an empty field rather than leaking the hash."""
+        assert hydrate([{"content_ref": "abc"}], {}) == [{"content": None}]
+
+
+class TestMongoDBServiceContentDedup:
+    """Tests for content dedup on insert and the join on read."""
+
+    @pytest.mark.asyncio
+    async def test_insert_stores_bodies_once_before_documents(self):
+        """Test repeated bodies are upserted once by hash and results hold only references."""
+        service = MongoDBService()
+        calls = []
+        content = MagicMock()
+        content.bulk_write = AsyncMock(side_effect=lambda ops, ordered: calls.append(("content", ops)))
+        collection = MagicMock()
+        collection.insert_many = AsyncMock(
+            side_effect=lambda docs, ordered: calls.append(("results", docs)) or MagicMock(inserted_ids=[1, 2])
+        )
+        db = MagicMock()
+        db.__getitem__.side_effect = lambda name: content if name == "page_content" else rollups
+        with patch.object(service, "collection", collection), patch.object(service, "db", db):
+            written = await service.insert_documents([{"url": "a", "content": PAGE}, {"url": "b", "content": PAGE}])
+
+        assert written == 2
+        assert [name for name, _ in calls] == ["content", "results"]
+        assert len(calls[0][1]) == 1
+        assert [doc["content_ref"] for doc in calls[1][1]] == [content_hash(PAGE)] * 2
+        assert all("content" not in doc for doc in calls[1][1])
+
+    @pytest.mark.asyncio
+    async def test_dedup_can_be_disabled(self):
+        """Test documents are inserted as-is when content dedup is off."""
+        service = MongoDBService()
+        collection = MagicMock()
+        collection.insert_many = AsyncMock(return_value=MagicMock(inserted_ids=[1]))
+        with patch.object(service, "collection", collection), \
+             patch("app.services.mongodb_service.settings") as mock_settings:
+            mock_settings.CONTENT_DEDUP_ENABLED = False
+            mock_settings.CONTENT_COMPRESSION_MIN_CHARS = 4096
+            mock_settings.CONTENT_COMPRESSION_LEVEL = None
+            await service.insert_documents([{"content": PAGE}])
+
+        assert collection.insert_many.call_args.args[0] == [{"content": PAGE}]
+
+    @pytest.mark.asyncio
+    async def test_join_content(self):
+        """Test referenced bodies are fetched in one query and put back."""
+        service = MongoDBService()
+        digest = content_hash(PAGE)
+        content = MagicMock()
+        content.find.return_value = AsyncCursor([{"_id": digest, "body": PAGE}])
+        db = MagicMock()
+        db.__getitem__.side_effect = lambda name: content if name == "page_content" else rollups
+        with patch.object(service, "db", db):
+            documents = await service.join_content([{"results": [{"url": "a", "raw_content_ref": digest}]}])
+
+        assert documents == [{"results": [{"url": "a", "raw_content": PAGE}]}]
+        assert content.find.call_args.args[0] == {"_id": {"$in": [digest]}}
+
+    @pytest.mark.asyncio
+    async def test_migration_pages_by_id_and_reports_savings(self):
+        """Test the migration walks batches by _id, rewrites embedded documents and counts duplicate text."""
+        service = MongoDBService()
+        batches = [
+            [{"_id": 1, "content": PAGE}, {"_id": 2, "content": "short"}],
+            [{"_id": 3, "results": [{"url": "a", "raw_content": PAGE}]}],
+            [],
+        ]
+        collection = MagicMock()
+        cursors = []
+        for batch in batches:
+            cursor = MagicMock()
+            cursor.sort.return_value = cursor
+            cursor.limit.return_value = cursor
+            cursor.to_list = AsyncMock(return_value=batch)
+            cursors.append(cursor)
+        collection.find.side_effect = cursors
+        collection.bulk_write = AsyncMock()
+        content = MagicMock()
+        content.bulk_write = AsyncMock()
+        db = MagicMock()
+        db.__getitem__.side_effect = lambda name: content if name == "page_content" else rollups
+        with patch.object(service, "collection", collection), patch.object(service, "db", db):
+            stats = await service.migrate_content_refs(batch_size=2)
+
+        assert stats == {
+            "scanned": 3, "converted": 2, "bodies": 1, "embedded_chars": 2 * len(PAGE), "unique_chars": len(PAGE)
+        }
+        assert collection.find.call_args_list[1].args[0]["_id"] == {"$gt": 2}
+        assert collection.bulk_write.await_count == 2
+        assert content.bulk_write.await_count == 2
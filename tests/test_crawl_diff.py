@@ -0,0 +1,147 @@
+"""Tests for app.services.crawl_diff module."""
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+from app.services.crawl_diff import (
+    apply_incremental_crawl,
+    content_fingerprint,
+    crawl_state_key,
+    diff_pages
+)
+from app.services.job_worker import run_crawl_job
+
+
+def page(url, body, title="Title"):
+    return {"url": url, "title": title, "raw_content": body}
+
+
+class TestFingerprints:
+    """Tests for content fingerprints and crawl state keys."""
+
+    def test_whitespace_does_not_change_fingerprint(self):
+        """Test reflowed but identical content keeps its fingerprint."""
+        assert content_fingerprint(page("u", "a  b\nc")) == content_fingerprint(page("u", "a b c"))
+        assert content_fingerprint(page("u", "a b c")) != content_fingerprint(page("u", "a b d"))
+        assert content_fingerprint(page("u", "a", title="x")) != content_fingerprint(page("u", "a", title="y"))
+
+    def test_state_key_depends_on_scope(self):
+        """Test crawls of the same root with a different scope are tracked separately."""
+        base = crawl_state_key("https://Example.com/", {"limit": 10})
+        
+        assert crawl_state_key("https://example.com", {"limit": 10, "api_key": "other"}) == base
+        assert crawl_state_key("https://example.com", {"limit": 20}) != base
+        assert crawl_state_key("https://example.com", {"limit": 10, "backend": "native"}) != crawl_state_key(
+            "https://example.com", {"limit": 10, "backend": "tavily"}
+        )
+
+
+class TestDiffPages:
+    """Tests for diff_pages."""
+
+    def test_classifies_pages(self):
+        """Test pages are split into new, changed, unchanged and removed."""
+        previous = {
+            "https://example.com/same": content_fingerprint(page("https://example.com/same", "same")),
+            "https://example.com/edited": content_fingerprint(page("https://example.com/edited", "old")),
+            "https://example.com/gone": "f" * 64
+        }
+        pages = [
+            page("https://example.com/same", "same"),
+            page("https://example.com/edited", "new"),
+            page("https://example.com/fresh", "fresh"),
+            page("https://example.com/fresh", "fresh")
+        ]
+        
+        diff = diff_pages(previous, pages)
+        
+        assert [p["url"] for p in diff["pages"]] == ["https://example.com/edited", "https://example.com/fresh"]
+        assert diff["new_urls"] == ["https://example.com/fresh"]
+        assert diff["changed_urls"] == ["https://example.com/edited"]
+        assert diff["unchanged_urls"] == ["https://example.com/same"]
+        assert diff["removed_urls"] == ["https://example.com/gone"]
+        assert len(diff["fingerprints"]) == 3
+
+    def test_all_lists_use_canonical_urls(self):
+        """Test new, changed, unchanged and removed URLs can be compared with each other."""
+        previous = {"https://example.com/a": content_fingerprint(page("https://example.com/a", "old"))}
+        pages = [page("HTTPS://Example.com/a#top", "new"), page("https://example.com:443", "home")]
+        
+        diff = diff_pages(previous, pages)
+        
+        assert diff["changed_urls"] == ["https://example.com/a"]
+        assert diff["new_urls"] == ["https://example.com/"]
+        assert diff["pages"][0]["url"] == "HTTPS://Example.com/a#top"
+
+
+class TestApplyIncrementalCrawl:
+    """Tests for apply_incremental_crawl."""
+
+    @pytest.mark.asyncio
+    async def test_first_crawl_then_repeat(self):
+        """Test a repeat crawl returns only what changed since the stored fingerprints."""
+        stored = {}
+        
+        async def save(state_key, root_url, fingerprints, crawled_at):
+            stored[state_key] = {"pages": dict(fingerprints), "crawled_at": crawled_at}
+        
+        persist = AsyncMock(return_value="result-1")
+        first = {"results": [page("https://example.com/a", "a"), page("https://example.com/b", "b")]}
+        second = {"results": [page("https://example.com/a", "a"), page("https://example.com/c", "c")]}
+        with patch('app.services.crawl_diff.mongodb_service') as mock_mongodb:
+            mock_mongodb.get_crawl_fingerprints = AsyncMock(side_effect=lambda key: stored.get(key))
+            mock_mongodb.save_crawl_fingerprints = AsyncMock(side_effect=save)
+            
+            assert await apply_incremental_crawl(first, "https://example.com", {"limit": 10}, persist) == "result-1"
+            await apply_incremental_crawl(second, "https://example.com", {"limit": 10}, persist)
+        
+        assert len(first["results"]) == 2
+        assert first["incremental"]["previous_crawl_at"] is None
+        assert [p["url"] for p in second["results"]] == ["https://example.com/c"]
+        assert second["incremental"]["unchanged_urls"] == ["https://example.com/a"]
+        assert second["incremental"]["removed_urls"] == ["https://example.com/b"]
+        assert isinstance(second["incremental"]["previous_crawl_at"], datetime)
+        assert persist.await_args_list[1].args[0] is second
+
+    @pytest.mark.asyncio
+    async def test_fingerprints_kept_when_results_are_not_stored(self):
+        """Test pages whose results failed to persist are reported as changed again on the next crawl."""
+        with patch('app.services.crawl_diff.mongodb_service') as mock_mongodb:
+            mock_mongodb.get_crawl_fingerprints = AsyncMock(return_value=None)
+            mock_mongodb.save_crawl_fingerprints = AsyncMock()
+            
+            result_id = await apply_incremental_crawl(
+                {"results": [page("https://example.com/a", "a")]}, "https://example.com", {}, AsyncMock(return_value=None)
+            )
+            with pytest.raises(RuntimeError):
+                await apply_incremental_crawl(
+                    {"results": [page("https://example.com/a", "a")]}, "https://example.com", {},
+                    AsyncMock(side_effect=RuntimeError("write failed"))
+                )
+        
+        assert result_id is None
+        mock_mongodb.save_crawl_fingerprints.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_crawl_job_strips_flag_and_reports_diff(self):
+        """Test the incremental flag is not sent upstream and the job summary has diff counts."""
+        crawl_data = {"base_url": "https://example.com", "results": [page("https://example.com/a", "a")]}
+        with patch('app.services.crawl_backends.tavily_service') as mock_tavily, \
+                patch('app.services.job_worker.mongodb_service') as mock_mongodb, \
+                patch('app.services.crawl_diff.mongodb_service') as mock_diff_mongodb:
+            mock_tavily.crawl = AsyncMock(return_value=crawl_data)
+            mock_mongodb.save_crawl_results = AsyncMock(return_value="result-1")
+            mock_diff_mongodb.get_crawl_fingerprints = AsyncMock(return_value=None)
+            mock_diff_mongodb.save_crawl_fingerprints = AsyncMock()
+            
+            result_id, summary = await run_crawl_job(
+                {"url": "https://example.com", "api_key": "key", "incremental": True}
+            )
+        
+        assert "incremental" not in mock_tavily.crawl.call_args.kwargs
+        assert result_id == "result-1"
+        mock_diff_mongodb.save_crawl_fingerprints.assert_awaited_once()
+        assert summary == {
+            "result_count": 1, "new_urls": 1, "changed_urls": 0, "unchanged_urls": 0, "removed_urls": 0
+        }
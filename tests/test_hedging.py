@@ -0,0 +1,172 @@
+"""Tests for app.services.hedging module."""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.services.hedging import Hedger, LatencyTracker
+from app.services.tavily_service import TavilyService
+
+
+def make_hedger(**overrides):
+    options = dict(percentile=90, budget_ratio=1.0, min_samples=5, min_delay=0.01, window=50)
+    options.update(overrides)
+    return Hedger(**options)
+
+
+def warm_up(hedger, operation="search:advanced", latency=0.02, count=10):
+    for _ in range(count):
+        hedger.tracker(operation).record(latency)
+
+
+class TestLatencyTracker:
+    """Tests for LatencyTracker class."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles over the window."""
+        tracker = LatencyTracker(window=100)
+        for value in range(1, 101):
+            tracker.record(value / 100)
+        
+        assert tracker.percentile(50) == 0.5
+        assert tracker.percentile(95) == 0.95
+        assert tracker.percentile(100) == 1.0
+
+
+class TestHedger:
+    """Tests for Hedger class."""
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_before_enough_samples(self):
+        """Test the first calls only build up latency history."""
+        hedger = make_hedger()
+        
+        async def call():
+            await asyncio.sleep(0.01)
+            return "ok"
+        
+        assert await hedger.run("search:advanced", call) == "ok"
+        assert hedger.stats["hedged"] == 0
+        assert len(hedger.tracker("search:advanced").samples) == 1
+
+    @pytest.mark.asyncio
+    async def test_slow_primary_is_hedged_and_cancelled(self):
+        """Test a hedge wins over a slow primary, which is then cancelled."""
+        hedger = make_hedger()
+        warm_up(hedger)
+        calls = []
+        cancelled = []
+        
+        async def call():
+            attempt = len(calls)
+            calls.append(attempt)
+            try:
+                await asyncio.sleep(1.0 if attempt == 0 else 0.01)
+            except asyncio.CancelledError:
+                cancelled.append(attempt)
+                raise
+            return f"attempt-{attempt}"
+        
+        assert await hedger.run("search:advanced", call) == "attempt-1"
+        await asyncio.sleep(0)
+        assert cancelled == [0]
+        assert hedger.stats["hedged"] == 1
+        assert hedger.stats["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self):
+        """Test calls answering before the trigger never send a duplicate."""
+        hedger = make_hedger()
+        warm_up(hedger, latency=0.2)
+        
+        async def call():
+            return "ok"
+        
+        assert await hedger.run("search:advanced", call) == "ok"
+        assert hedger.stats["hedged"] == 0
+
+    @pytest.mark.asyncio
+    async def test_budget_caps_hedges(self):
+        """Test hedges stay within the configured fraction of calls."""
+        hedger = make_hedger(budget_ratio=0.25, window=1000)
+        warm_up(hedger, latency=0.001, count=1000)
+        
+        async def call():
+            await asyncio.sleep(0.02)
+            return "ok"
+        
+        for _ in range(8):
+            await hedger.run("search:advanced", call)
+        
+        assert hedger.stats["hedged"] == 2
+        assert hedger.stats["budget_exhausted"] == 6
+
+    @pytest.mark.asyncio
+    async def test_failed_primary_falls_back_to_hedge(self):
+        """Test an attempt failing after the hedge started does not fail the call."""
+        hedger = make_hedger()
+        warm_up(hedger)
+        calls = []
+        
+        async def call():
+            attempt = len(calls)
+            calls.append(attempt)
+            if attempt == 0:
+                await asyncio.sleep(0.05)
+                raise ValueError("primary failed")
+            await asyncio.sleep(0.1)
+            return "hedge"
+        
+        assert await hedger.run("search:advanced", call) == "hedge"
+
+    @pytest.mark.asyncio
+    async def test_both_failing_raises_first_error(self):
+        """Test the first error surfaces when every attempt fails."""
+        hedger = make_hedger()
+        warm_up(hedger)
+        calls = []
+        
+        async def call():
+            attempt = len(calls)
+            calls.append(attempt)
+            await asyncio.sleep(0.05 if attempt == 0 else 0.1)
+            raise ValueError(f"attempt {attempt} failed")
+        
+        with pytest.raises(ValueError, match="attempt 0 failed"):
+            await hedger.run("search:advanced", call)
+
+
+class TestTavilyServiceHedging:
+    """Tests for hedging in TavilyService."""
+
+    @pytest.mark.asyncio
+    async def test_search_hedges_slow_upstream(self):
+        """Test an opted-in search is answered by the hedge when the first request stalls."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = "test-key"
+            mock_settings.TAVILY_BASE_URL = "https://api.tavily.com"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "basic"
+            service = TavilyService()
+        service.hedger = make_hedger()
+        warm_up(service.hedger, operation="search:basic", latency=0.01)
+        requests = []
+        
+        async def handler(request):
+            requests.append(request)
+            if len(requests) == 1:
+                await asyncio.sleep(1.0)
+            return httpx.Response(200, json={"results": [], "answer": f"answer {len(requests)}"})
+        
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch('app.services.search_cache.mongodb_service') as mock_mongodb, \
+                patch('app.services.credit_ledger.mongodb_service') as mock_ledger_mongodb:
+            mock_mongodb.cache_collection = None
+            mock_ledger_mongodb.db = None
+            result = await service.search("slow query", no_cache=True, hedge=True)
+        
+        assert result["answer"] == "answer 2"
+        assert len(requests) == 2
+        assert service.hedger.stats["hedge_wins"] == 1
@@ -0,0 +1,94 @@
+"""Tests for app.services.job_queue module."""
+
+import pytest
+from datetime import datetime
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.job_queue import JobQueue
+
+
+@pytest.fixture
+def queue():
+    """Create a JobQueue over a mocked jobs collection."""
+    queue = JobQueue()
+    collection = MagicMock()
+    collection.insert_one = AsyncMock()
+    collection.update_one = AsyncMock(return_value=MagicMock(modified_count=1))
+    collection.update_many = AsyncMock(return_value=MagicMock(modified_count=1))
+    instances = MagicMock()
+    instances.update_one = AsyncMock()
+    collection.instances = instances
+    with patch("app.services.job_queue.mongodb_service") as mock_mongodb:
+        mock_mongodb.db = {queue.collection_name: collection, queue.instances_collection_name: instances}
+        yield queue, collection
+
+
+class TestJobQueueApiKeys:
+    """Tests for keeping caller API keys out of MongoDB."""
+
+    @pytest.mark.asyncio
+    async def test_api_key_is_not_persisted(self, queue):
+        """Test the stored job has no key and the worker gets it back from memory."""
+        queue, collection = queue
+        job = await queue.submit("crawl", {"url": "https://example.com", "api_key": "caller-key"})
+
+        stored = collection.insert_one.call_args.args[0]
+        assert "api_key" not in stored["params"]
+        assert stored["key_holder"] == queue.instance_id
+        assert queue.job_params(stored) == {"url": "https://example.com", "api_key": "caller-key"}
+
+        await queue.complete(job["_id"], "worker", "result", {})
+        assert queue.job_params(stored) is None
+
+    @pytest.mark.asyncio
+    async def test_jobs_without_key_run_anywhere(self, queue):
+        """Test jobs using the server's keys carry no holder and need nothing from memory."""
+        queue, collection = queue
+        await queue.submit("map", {"url": "https://example.com"})
+
+        stored = collection.insert_one.call_args.args[0]
+        assert stored["key_holder"] is None
+        assert JobQueue().job_params(stored) == {"url": "https://example.com"}
+
+
+class TestJobQueueHolders:
+    """Tests for heartbeats of processes holding caller keys."""
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_extends_instance_expiry(self, queue):
+        """Test a heartbeat upserts this instance with an expiry JOB_INSTANCE_TTL ahead."""
+        queue, collection = queue
+        await queue.heartbeat()
+
+        query, update = collection.instances.update_one.call_args.args
+        assert query == {"_id": queue.instance_id}
+        assert (update["$set"]["expires_at"] - datetime.utcnow()).total_seconds() > queue.instance_ttl - 5
+        assert collection.instances.update_one.call_args.kwargs["upsert"] is True
+
+    @pytest.mark.asyncio
+    async def test_only_jobs_of_silent_holders_fail(self, queue):
+        """Test a busy holder with a fresh heartbeat keeps its backlog; a lapsed one loses it."""
+        queue, collection = queue
+        collection.distinct = AsyncMock(return_value=["busy", "dead"])
+        collection.instances.distinct = AsyncMock(return_value=["busy"])
+
+        await queue.fail_exhausted()
+
+        orphan_query = collection.update_many.call_args_list[1].args[0]
+        assert orphan_query["key_holder"] == {"$in": ["dead"]}
+        assert {"status": "queued"} in orphan_query["$or"]
+        holder_query = collection.instances.distinct.call_args.args[1]
+        assert holder_query["_id"] == {"$in": ["busy", "dead"]}
+        assert "$gt" in holder_query["expires_at"]
+
+    @pytest.mark.asyncio
+    async def test_no_orphan_sweep_while_holders_live(self, queue):
+        """Test nothing beyond exhausted leases is failed when every holder is heartbeating."""
+        queue, collection = queue
+        collection.distinct = AsyncMock(return_value=["busy"])
+        collection.instances.distinct = AsyncMock(return_value=["busy"])
+
+        assert await queue.fail_exhausted() == 1
+        assert collection.update_many.await_count == 1
+        assert "$unset" not in collection.update_many.call_args.args[1]
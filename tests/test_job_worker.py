@@ -0,0 +1,105 @@
+"""Tests for app.services.job_worker module."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.job_worker import JobWorker
+
+
+def make_job(job_type="crawl", attempts=1, max_attempts=3):
+    return {
+        "_id": "job-1",
+        "type": job_type,
+        "params": {"url": "https://example.com", "api_key": "key"},
+        "attempts": attempts,
+        "max_attempts": max_attempts
+    }
+
+
+@pytest.fixture
+def queue():
+    """Create a mocked job queue."""
+    queue = MagicMock()
+    queue.visibility_timeout = 300
+    queue.lease = AsyncMock(return_value=None)
+    queue.fail_exhausted = AsyncMock(return_value=0)
+    queue.complete = AsyncMock(return_value=True)
+    queue.fail = AsyncMock(return_value=True)
+    queue.extend_lease = AsyncMock(return_value=True)
+    queue.job_params = lambda job: dict(job["params"])
+    return queue
+
+
+class TestJobWorkerProcess:
+    """Tests for JobWorker.process."""
+
+    @pytest.mark.asyncio
+    async def test_successful_job_is_completed(self, queue):
+        """Test a handler result is recorded on the job."""
+        handler = AsyncMock(return_value=("result-id", {"result_count": 3}))
+        worker = JobWorker(queue=queue, handlers={"crawl": handler}, concurrency=1)
+        
+        await worker.process(make_job())
+        
+        handler.assert_awaited_once_with({"url": "https://example.com", "api_key": "key"})
+        queue.complete.assert_awaited_once_with("job-1", worker.worker_id, "result-id", {"result_count": 3})
+        queue.fail.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_failed_job_is_reported(self, queue):
+        """Test handler errors are passed to the queue for retry or failure."""
+        handler = AsyncMock(side_effect=ValueError("Rate limit exceeded."))
+        worker = JobWorker(queue=queue, handlers={"crawl": handler}, concurrency=1)
+        job = make_job()
+        
+        await worker.process(job)
+        
+        queue.fail.assert_awaited_once_with(job, worker.worker_id, "Rate limit exceeded.")
+        queue.complete.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unknown_job_type_fails_permanently(self, queue):
+        """Test jobs without a handler are not retried."""
+        worker = JobWorker(queue=queue, handlers={}, concurrency=1)
+        job = make_job(job_type="unknown")
+        
+        await worker.process(job)
+        
+        failed_job = queue.fail.call_args.args[0]
+        assert failed_job["attempts"] == failed_job["max_attempts"]
+
+
+class TestJobWorkerLifecycle:
+    """Tests for starting and stopping the worker loops."""
+
+    @pytest.mark.asyncio
+    async def test_worker_leases_and_runs_jobs(self, queue):
+        """Test the run loop leases queued jobs and stops cleanly."""
+        done = asyncio.Event()
+        
+        async def handler(params):
+            done.set()
+            return "result-id", {}
+        
+        queue.lease = AsyncMock(side_effect=[make_job()] + [None] * 100)
+        worker = JobWorker(queue=queue, handlers={"crawl": handler}, concurrency=2, poll_interval=0.01)
+        
+        await worker.start()
+        await asyncio.wait_for(done.wait(), timeout=1)
+        await worker.stop()
+        
+        queue.complete.assert_awaited_once()
+        assert worker._tasks == []
+
+    @pytest.mark.asyncio
+    async def test_lease_errors_do_not_stop_the_worker(self, queue):
+        """Test transient queue errors are logged and polling continues."""
+        queue.lease = AsyncMock(side_effect=[Exception("mongo down"), None, None, None])
+        worker = JobWorker(queue=queue, handlers={}, concurrency=1, poll_interval=0.01)
+        
+        await worker.start()
+        await asyncio.sleep(0.05)
+        await worker.stop()
+        
+        assert queue.lease.await_count >= 2
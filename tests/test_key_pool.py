@@ -0,0 +1,147 @@
+"""Tests for app.services.key_pool module."""
+
+import asyncio
+import httpx
+import pytest
+from unittest.mock import patch
+
+from app.services.key_pool import KeyPool
+from app.services.rate_limiter import RateLimiter
+from app.services.tavily_service import TavilyService
+
+KEYS = ["tvly-key-one-0001", "tvly-key-two-0002", "tvly-key-three-0003"]
+
+
+def make_pool(keys=KEYS, rate_limiter=None):
+    return KeyPool(keys, rate_limiter, rate_limited_cooldown=30.0, unauthorized_cooldown=600.0)
+
+
+class TestKeyPool:
+    """Tests for KeyPool class."""
+
+    def test_prefers_key_with_most_rate_budget(self):
+        """Test selection follows the remaining token bucket budget."""
+        limiter = RateLimiter(rates={"search": 0.001}, bursts={"search": 3})
+        pool = make_pool(rate_limiter=limiter)
+        limiter._bucket(KEYS[0], "search").tokens = 0.5
+        limiter._bucket(KEYS[1], "search").tokens = 2.5
+        limiter._bucket(KEYS[2], "search").tokens = 1.5
+        
+        assert pool.select("search") == KEYS[1]
+
+    def test_prefers_least_busy_key_without_limits(self):
+        """Test in-flight requests break ties when no limiter is configured."""
+        pool = make_pool()
+        pool.begin(KEYS[0])
+        pool.begin(KEYS[1])
+        
+        assert pool.select("search") == KEYS[2]
+
+    def test_rate_limited_key_leaves_rotation(self):
+        """Test a 429 cools the key down for at least its Retry-After."""
+        pool = make_pool(keys=KEYS[:2])
+        pool.begin(KEYS[0])
+        pool.record_failure(KEYS[0], 429, retry_after=120.0)
+        
+        assert all(pool.select("search") == KEYS[1] for _ in range(5))
+        state = pool.get_state()
+        assert state["available"] == 1
+        assert state["keys"][0]["cooldown_reason"] == "rate_limited"
+        assert state["keys"][0]["cooldown_remaining"] > 100
+        assert state["keys"][0]["rate_limited"] == 1
+
+    def test_all_cooling_down_uses_first_to_recover(self):
+        """Test the pool degrades to the soonest-available key instead of failing."""
+        pool = make_pool(keys=KEYS[:2])
+        pool.record_failure(KEYS[0], 401)
+        pool.record_failure(KEYS[1], 429)
+        
+        assert pool.select("search") == KEYS[1]
+
+    def test_stats_and_throughput(self):
+        """Test per-key counters and throughput are reported."""
+        pool = make_pool(keys=KEYS[:1])
+        for _ in range(3):
+            pool.begin(KEYS[0])
+            pool.record_success(KEYS[0])
+        pool.begin(KEYS[0])
+        pool.record_failure(KEYS[0], 500)
+        
+        key = pool.get_state()["keys"][0]
+        assert key["key_hint"] == "tvly-...0001"
+        assert (key["requests"], key["successes"], key["errors"], key["in_flight"]) == (4, 3, 1, 0)
+        assert key["throughput_per_second"] == pytest.approx(3 / 60, abs=1e-3)
+        assert key["available"] is True
+
+
+class TestTavilyServiceKeyPool:
+    """Tests for key pool integration in TavilyService."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a TavilyService over a three-key pool and a mock client."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = KEYS[0]
+            mock_settings.TAVILY_BASE_URL = "https://api.tavily.com"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "advanced"
+            service = TavilyService()
+        service.key_pool = make_pool(rate_limiter=service.rate_limiter)
+        service.rate_limiter.rates = {}
+        service.seen = []
+        service.revoked = {KEYS[1]}
+        
+        def handler(request):
+            key = request.headers["Authorization"].split()[-1]
+            service.seen.append(key)
+            if key in service.revoked:
+                return httpx.Response(401, json={"detail": "Unauthorized"})
+            return httpx.Response(200, json={"results": [], "answer": "ok"})
+        
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch('app.services.search_cache.mongodb_service') as mock_mongodb, \
+                patch('app.services.credit_ledger.mongodb_service') as mock_ledger_mongodb:
+            mock_mongodb.cache_collection = None
+            mock_ledger_mongodb.db = None
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_server_traffic_is_spread_and_skips_revoked_keys(self, service):
+        """Test pooled requests rotate keys and a 401 moves on to another key."""
+        for i in range(6):
+            await service.search(f"query {i}", no_cache=True)
+        
+        assert set(service.seen) == set(KEYS)
+        assert service.seen.count(KEYS[1]) == 1
+        state = {key["key_hint"]: key for key in service.key_pool.get_state()["keys"]}
+        assert state["tvly-...0002"]["unauthorized"] == 1
+        assert state["tvly-...0002"]["available"] is False
+
+    @pytest.mark.asyncio
+    async def test_client_key_bypasses_pool(self, service):
+        """Test a key supplied by the client is never swapped for a pooled one."""
+        await service.search("query", api_key="tvly-client-key-9999", no_cache=True)
+        
+        assert service.seen == ["tvly-client-key-9999"]
+        assert service.key_pool.get_state()["keys"][0]["requests"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_is_not_a_key_failure(self, service):
+        """Test an abandoned call (hedge loser, deadline) frees its slot without counting an error."""
+        started = asyncio.Event()
+        
+        async def slow_post(*args, **kwargs):
+            started.set()
+            await asyncio.sleep(10)
+        
+        service._client.post = slow_post
+        task = asyncio.ensure_future(service._request_with_key("search", {"query": "q"}, KEYS[0], "tenant"))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        
+        keys = service.key_pool.get_state()["keys"]
+        assert sum(key["errors"] for key in keys) == 0
+        assert sum(key["in_flight"] for key in keys) == 0
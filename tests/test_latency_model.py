@@ -0,0 +1,42 @@
+"""Tests for app.services.latency_model module."""
+
+from app.services.latency_model import DEGRADED_DEPTH, DepthLatencyModel
+
+
+def make_model(**overrides):
+    options = dict(quantile=90, priors={"basic": 1.0, "advanced": 3.0}, window=100, min_samples=3)
+    options.update(overrides)
+    return DepthLatencyModel(**options)
+
+
+class TestDepthLatencyModel:
+    """Tests for DepthLatencyModel class."""
+
+    def test_uses_priors_until_enough_samples(self):
+        """Test the configured priors stand in for a cold model."""
+        model = make_model()
+        model.record("advanced", 0.5)
+        
+        assert model.estimate("advanced") == 3.0
+        model.record("advanced", 0.5)
+        model.record("advanced", 0.7)
+        assert model.estimate("advanced") == 0.7
+
+    def test_choose_depth(self):
+        """Test advanced is kept only when it fits the remaining budget."""
+        model = make_model()
+        
+        assert model.choose_depth("advanced", 5.0) == ("advanced", None)
+        assert model.choose_depth("advanced", 2.0) == ("basic", DEGRADED_DEPTH)
+        assert model.choose_depth("basic", 0.1) == ("basic", None)
+        assert model.budget_spent(0.5) is True
+        assert model.budget_spent(1.5) is False
+
+    def test_state(self):
+        """Test the state reports estimates and sample counts per depth."""
+        model = make_model()
+        model.record("basic", 0.2)
+        
+        state = model.get_state()
+        assert state["depths"]["basic"] == {"estimate": 1.0, "samples": 1}
+        assert state["depths"]["advanced"]["samples"] == 0
@@ -0,0 +1,147 @@
+"""Tests for app.services.mongodb_service module."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+from app.services.mongodb_service import RESULT_INDEXES, RETENTION_TTL_INDEX, MongoDBService, plan_index_usage
+
+
+def fake_cursor(documents=None, explanation=None):
+    cursor = MagicMock()
+    cursor.sort.return_value = cursor
+    cursor.limit.return_value = cursor
+    cursor.to_list = AsyncMock(return_value=documents or [])
+    cursor.explain = AsyncMock(return_value=explanation)
+    return cursor
+
+
+def explain_doc(winning_plan):
+    return {"queryPlanner": {"winningPlan": winning_plan}}
+
+
+class TestPlanIndexUsage:
+    """Tests for reading index usage out of explain() plans."""
+
+    def test_index_scan_below_fetch_and_limit(self):
+        """Test an IXSCAN nested under other stages is found with its index name."""
+        plan = {"stage": "LIMIT", "inputStage": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "timestamp_desc"}}}
+
+        assert plan_index_usage(plan) == (True, "timestamp_desc")
+
+    def test_text_and_slot_based_plans(self):
+        """Test text plans and the slot-based engine's queryPlan wrapper are understood."""
+        text_plan = {"stage": "SORT", "inputStage": {"stage": "TEXT_MATCH", "inputStage": {"stage": "TEXT_OR", "inputStages": [
+            {"stage": "IXSCAN", "indexName": "query_text"}
+        ]}}}
+        sbe_plan = {"queryPlan": {"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "type_timestamp"}}}
+
+        assert plan_index_usage(text_plan)[0] is True
+        assert plan_index_usage(sbe_plan) == (True, "type_timestamp")
+
+    def test_collection_scan(self):
+        """Test a COLLSCAN plan reports no index."""
+        plan = {"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}}
+
+        assert plan_index_usage(plan) == (False, None)
+
+
+class TestMongoDBServiceIndexes:
+    """Tests for index bootstrap, text search and the explain check."""
+
+    @pytest.mark.asyncio
+    async def test_ensure_indexes(self):
+        """Test the result indexes are created and conflicts are logged instead of raised."""
+        service = MongoDBService()
+        collection = MagicMock()
+        collection.create_indexes = AsyncMock(return_value=["timestamp_desc"])
+        db = MagicMock()
+        db.__getitem__.return_value.create_index = AsyncMock()
+        with patch.object(service, "collection", collection), patch.object(service, "db", db):
+            await service.ensure_indexes()
+            collection.create_indexes.side_effect = OperationFailure("IndexOptionsConflict")
+            await service.ensure_indexes()
+
+        names = {index.document["name"] for index in RESULT_INDEXES}
+        assert names == {
+            "timestamp_id_desc", "type_timestamp_id", "result_urls", "query_text",
+            "content_ref", "raw_content_ref", "results_content_ref", "results_raw_content_ref"
+        }
+        collection.create_indexes.assert_any_await(RESULT_INDEXES)
+        collection.create_indexes.assert_awaited_with([RETENTION_TTL_INDEX])
+        db.__getitem__.assert_called_with(service.stats_collection_name)
+        db.__getitem__.return_value.create_index.assert_awaited_with([("granularity", ASCENDING), ("bucket", ASCENDING)])
+
+    @pytest.mark.asyncio
+    async def test_retention_ttl_created_despite_other_conflicts(self):
+        """Test the TTL index gets its own call, so a conflict on another index cannot block it."""
+        service = MongoDBService()
+        collection = MagicMock()
+        collection.create_indexes = AsyncMock(side_effect=[OperationFailure("IndexOptionsConflict"), ["retention_ttl"]])
+        collection.index_information = AsyncMock(return_value={
+            "_id_": {"key": [("_id", 1)]},
+            "retention_ttl": {"key": [("expire_at", 1)], "expireAfterSeconds": 0}
+        })
+        db = MagicMock()
+        db.__getitem__.return_value.create_index = AsyncMock()
+        with patch.object(service, "collection", collection), patch.object(service, "db", db):
+            await service.ensure_indexes()
+            assert await service.has_retention_ttl()
+            collection.index_information.return_value = {"expire_at_1": {"key": [("expire_at", 1)]}}
+            assert not await service.has_retention_ttl()
+
+        assert collection.create_indexes.await_args_list[1].args == ([RETENTION_TTL_INDEX],)
+
+    @pytest.mark.asyncio
+    async def test_cache_ttl_change_updates_existing_index(self):
+        """Test a changed cache TTL is applied with collMod instead of failing the connection."""
+        service = MongoDBService()
+        cache_collection = MagicMock()
+        cache_collection.create_index = AsyncMock(side_effect=OperationFailure("IndexOptionsConflict"))
+        db = MagicMock()
+        db.command = AsyncMock()
+        with patch.object(service, "cache_collection", cache_collection), patch.object(service, "db", db):
+            await service._ensure_cache_ttl()
+
+        args, kwargs = db.command.call_args
+        assert args == ("collMod", service.cache_collection_name)
+        assert kwargs["index"]["keyPattern"] == {"cached_at": 1}
+
+    @pytest.mark.asyncio
+    async def test_search_by_query_uses_text_search(self):
+        """Test query search uses $text ordered by relevance instead of an unanchored regex."""
+        service = MongoDBService()
+        collection = MagicMock()
+        cursor = fake_cursor([{"_id": "abc", "query": "python asyncio", "score": 11.0}])
+        collection.find.return_value = cursor
+        with patch.object(service, "collection", collection):
+            results = await service.search_by_query("asyncio", limit=5)
+
+        query, projection = collection.find.call_args.args
+        assert query == {"$text": {"$search": "asyncio"}}
+        assert projection == {"score": {"$meta": "textScore"}}
+        assert cursor.sort.call_args.args[0][0] == ("score", {"$meta": "textScore"})
+        assert results[0]["query"] == "python asyncio"
+
+    @pytest.mark.asyncio
+    async def test_explain_query_plans(self):
+        """Test every query pattern is explained and collection scans are flagged."""
+        service = MongoDBService()
+        collection = MagicMock()
+        indexed = explain_doc({"stage": "FETCH", "inputStage": {"stage": "IXSCAN", "indexName": "timestamp_desc"}})
+        scanned = explain_doc({"stage": "COLLSCAN"})
+        collection.find.side_effect = [
+            fake_cursor(explanation=indexed),
+            fake_cursor(explanation=indexed),
+            fake_cursor(explanation=indexed),
+            fake_cursor(explanation=indexed),
+            fake_cursor(explanation=indexed),
+            fake_cursor(explanation=scanned),
+        ]
+        with patch.object(service, "collection", collection):
+            report = await service.explain_query_plans()
+
+        assert set(report) == {"recent_results", "recent_by_type", "stats_window", "results_page", "search_by_query", "results_by_url"}
+        assert report["recent_results"] == {"uses_index": True, "index": "timestamp_desc"}
+        assert report["results_by_url"] == {"uses_index": False, "index": None}
@@ -0,0 +1,290 @@
+"""Tests for app.services.native_crawler module."""
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.crawl_backends import resolve_backend, run_crawl, run_map
+from app.services.native_crawler import HostThrottle, NativeCrawler, PageParser, RobotsCache, UrlFilter
+from app.services.url_guard import UnsafeUrlError, UrlGuard, is_public_address
+
+
+SITE = {
+    "/robots.txt": ("text/plain", "User-agent: *\nDisallow: /private\n"),
+    "/": ("text/html", """
+        <html><head><title>Home</title><link rel="icon" href="/icon.png"></head>
+        <body><h1>Welcome</h1><p>Hello <b>world</b></p><script>var x = 1;</script>
+        <a href="/docs">Docs</a><a href="/blog">Blog</a><a href="/private/secret">Secret</a>
+        <a href="/docs#intro">Docs again</a><a href="https://other.test/page">Elsewhere</a>
+        <a href="/guide.pdf">Guide</a><img src="/logo.png"></body></html>
+    """),
+    "/docs": ("text/html", """
+        <html><head><title>Docs</title></head><body><ul><li>One</li><li>Two</li></ul>
+        <a href="/docs/deep">Deep</a></body></html>
+    """),
+    "/docs/deep": ("text/html", "<html><head><title>Deep</title></head><body>Deep page</body></html>"),
+    "/blog": ("text/html", "<html><head><title>Blog</title></head><body>Posts</body></html>"),
+    "/private/secret": ("text/html", "<html><body>Secret</body></html>"),
+    "/guide.pdf": ("application/pdf", "%PDF-1.4"),
+}
+
+
+def site_transport(requests=None):
+    def handler(request):
+        if requests is not None:
+            requests.append(str(request.url))
+        if request.url.host != "site.test" or request.url.path not in SITE:
+            return httpx.Response(404, text="not found")
+        content_type, body = SITE[request.url.path]
+        return httpx.Response(200, text=body, headers={"content-type": content_type})
+    return httpx.MockTransport(handler)
+
+
+async def public_resolver(host, port):
+    return ["93.184.216.34"]
+
+
+def make_crawler(requests=None, transport=None, **kwargs):
+    return NativeCrawler(
+        politeness_delay=0,
+        transport=transport or site_transport(requests),
+        url_guard=UrlGuard(allow_private=False, resolver=public_resolver),
+        **kwargs
+    )
+
+
+class TestPageParser:
+    """Tests for the streaming HTML parser."""
+
+    def test_collects_text_links_and_metadata_across_chunks(self):
+        """Test a page fed in small chunks yields the same content as a single feed."""
+        _, body = SITE["/"]
+        parser = PageParser("https://site.test/", collect_text=True, markdown=True)
+        for start in range(0, len(body), 7):
+            parser.feed(body[start:start + 7])
+        parser.close()
+
+        assert parser.title == "Home"
+        assert parser.favicon == "https://site.test/icon.png"
+        assert "https://site.test/docs" in parser.links
+        assert parser.images == ["https://site.test/logo.png"]
+        assert "# Welcome" in parser.text
+        assert "Hello world" in parser.text
+        assert "var x" not in parser.text
+
+
+class TestUrlFilter:
+    """Tests for crawl scope filtering."""
+
+    def test_external_links_need_allow_external(self):
+        """Test links to other hosts are dropped unless explicitly allowed."""
+        assert not UrlFilter("https://site.test/", None, None, None, None, False).allows("https://other.test/a")
+        assert UrlFilter("https://site.test/", None, None, None, None, True).allows("https://other.test/a")
+
+    def test_path_filters(self):
+        """Test select and exclude path patterns apply to the URL path."""
+        url_filter = UrlFilter("https://site.test/", ["/docs.*"], None, ["/docs/internal.*"], None, False)
+
+        assert url_filter.allows("https://site.test/docs/a")
+        assert not url_filter.allows("https://site.test/blog")
+        assert not url_filter.allows("https://site.test/docs/internal/x")
+
+
+class TestNativeCrawler:
+    """Tests for NativeCrawler crawl and map."""
+
+    @pytest.mark.asyncio
+    async def test_crawl_honors_robots_and_dedups(self):
+        """Test disallowed pages are never fetched and fragment variants are fetched once."""
+        requests = []
+        crawler = make_crawler(requests)
+
+        result = await crawler.crawl("https://site.test/", max_depth=1, limit=20, include_favicon=True)
+
+        urls = [page["url"] for page in result["results"]]
+        assert urls[0] == "https://site.test/"
+        assert "https://site.test/docs" in urls
+        assert "https://site.test/blog" in urls
+        assert not any("private" in url for url in requests)
+        assert requests.count("https://site.test/docs") == 1
+        # Non-HTML documents have no content for crawl, external hosts are out of scope
+        assert not any(url.endswith(".pdf") for url in urls)
+        assert not any("other.test" in url for url in urls)
+        assert result["results"][0]["favicon"] == "https://site.test/icon.png"
+        assert result["results"][0]["images"] == []
+
+    @pytest.mark.asyncio
+    async def test_depth_breadth_and_limit(self):
+        """Test max_depth, max_breadth and limit bound the crawl."""
+        crawler = make_crawler()
+
+        shallow = await crawler.crawl("https://site.test/", max_depth=1, limit=20)
+        deep = await crawler.crawl("https://site.test/", max_depth=2, limit=20)
+        narrow = await crawler.crawl("https://site.test/", max_depth=1, max_breadth=1, limit=20)
+        limited = await crawler.crawl("https://site.test/", max_depth=2, limit=2)
+
+        assert "https://site.test/docs/deep" not in [page["url"] for page in shallow["results"]]
+        assert "https://site.test/docs/deep" in [page["url"] for page in deep["results"]]
+        assert [page["url"] for page in narrow["results"]] == ["https://site.test/", "https://site.test/docs"]
+        assert len(limited["results"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_crawl_markdown_content(self):
+        """Test markdown output marks headings and list items."""
+        result = await make_crawler().crawl("https://site.test/docs", max_depth=1, limit=1)
+
+        assert result["results"][0]["title"] == "Docs"
+        assert "- One" in result["results"][0]["raw_content"]
+
+    @pytest.mark.asyncio
+    async def test_map_lists_urls_with_filters(self):
+        """Test map returns URLs only, including non-HTML documents, within the selected paths."""
+        crawler = make_crawler()
+
+        everything = await crawler.map("https://site.test/", max_depth=1, limit=20)
+        docs_only = await crawler.map("https://site.test/", max_depth=2, limit=20, exclude_paths=["/blog"])
+
+        assert "https://site.test/guide.pdf" in everything["results"]
+        assert "https://site.test/blog" not in docs_only["results"]
+        assert "https://site.test/docs/deep" in docs_only["results"]
+        assert all(isinstance(url, str) for url in everything["results"])
+
+
+class TestNativeCrawlerSafety:
+    """Tests for the address guard, manual redirects and bounded per-host state."""
+
+    def test_non_public_addresses(self):
+        """Test loopback, private, link-local and mapped addresses are not public."""
+        for address in ("127.0.0.1", "10.1.2.3", "192.168.0.1", "169.254.169.254", "::1", "fe80::1", "::ffff:10.0.0.1"):
+            assert not is_public_address(address)
+        assert is_public_address("93.184.216.34")
+
+    @pytest.mark.asyncio
+    async def test_guard_checks_resolved_addresses(self):
+        """Test hostnames resolving to private addresses and private IP literals are refused."""
+        async def resolver(host, port):
+            return ["93.184.216.34", "10.0.0.5"] if host == "mixed.test" else ["93.184.216.34"]
+
+        guard = UrlGuard(allow_private=False, resolver=resolver)
+
+        await guard.check("https://site.test/")
+        with pytest.raises(UnsafeUrlError):
+            await guard.check("https://mixed.test/")
+        with pytest.raises(UnsafeUrlError):
+            await guard.check("http://169.254.169.254/latest/meta-data/")
+        await UrlGuard(allow_private=True, resolver=resolver).check("http://127.0.0.1:8080/")
+
+    @pytest.mark.asyncio
+    async def test_redirects_are_rechecked_at_every_hop(self):
+        """Test redirects to private addresses, other hosts or robots-disallowed paths are not followed."""
+        requests = []
+        redirects = {
+            "/": "/hop",
+            "/hop": "/docs",
+            "/meta": "http://169.254.169.254/latest/meta-data/",
+            "/away": "https://other.test/page",
+            "/sneaky": "/private/secret",
+        }
+
+        def handler(request):
+            requests.append(str(request.url))
+            if request.url.host == "site.test" and request.url.path in redirects:
+                return httpx.Response(302, headers={"location": redirects[request.url.path]})
+            return site_transport().handle_request(request)
+
+        crawler = make_crawler(transport=httpx.MockTransport(handler))
+        followed = await crawler.crawl("https://site.test/", max_depth=0, limit=1)
+        blocked = [await crawler.crawl(f"https://site.test{path}", max_depth=0, limit=1) for path in ("/meta", "/away", "/sneaky")]
+
+        assert [page["url"] for page in followed["results"]] == ["https://site.test/docs"]
+        assert all(result["results"] == [] for result in blocked)
+        assert not any("169.254" in url or "other.test" in url or "private" in url for url in requests)
+
+    @pytest.mark.asyncio
+    async def test_redirects_to_one_page_give_one_result(self):
+        """Test links that redirect to an already crawled page do not add duplicate results."""
+        def handler(request):
+            if request.url.path == "/":
+                body = '<html><body><a href="/docs">Docs</a><a href="/old-docs">Old</a><a href="/v1/docs">V1</a></body></html>'
+                return httpx.Response(200, text=body, headers={"content-type": "text/html"})
+            if request.url.path in ("/old-docs", "/v1/docs"):
+                return httpx.Response(301, headers={"location": "/docs"})
+            return site_transport().handle_request(request)
+
+        crawler = make_crawler(transport=httpx.MockTransport(handler))
+        result = await crawler.crawl("https://site.test/", max_depth=1, limit=10)
+
+        assert [page["url"] for page in result["results"]] == ["https://site.test/", "https://site.test/docs"]
+
+    @pytest.mark.asyncio
+    async def test_robots_server_error_disallows(self):
+        """Test a 5xx robots.txt is treated as disallow rather than allow-all."""
+        def handler(request):
+            if request.url.path == "/robots.txt":
+                return httpx.Response(503)
+            return httpx.Response(200, text="<html></html>", headers={"content-type": "text/html"})
+
+        crawler = make_crawler(transport=httpx.MockTransport(handler))
+        result = await crawler.crawl("https://site.test/", max_depth=0, limit=1)
+
+        assert result["results"] == []
+
+    @pytest.mark.asyncio
+    async def test_page_cap_counts_bytes(self):
+        """Test max_page_bytes limits encoded bytes, not decoded characters."""
+        body = "<html><body>" + "é" * 1000 + "</body></html>"
+
+        def handler(request):
+            if request.url.path == "/robots.txt":
+                return httpx.Response(404)
+            return httpx.Response(200, content=body.encode(), headers={"content-type": "text/html; charset=utf-8"})
+
+        crawler = make_crawler(transport=httpx.MockTransport(handler), max_page_bytes=512)
+        result = await crawler.crawl("https://site.test/", max_depth=0, limit=1)
+
+        assert len(result["results"][0]["raw_content"].encode()) <= 512
+
+    @pytest.mark.asyncio
+    async def test_per_host_state_is_bounded(self):
+        """Test robots entries and idle host throttles are evicted beyond their cap."""
+        throttle = HostThrottle(concurrency=1, delay=0, max_hosts=2)
+        for host in ("a.test", "b.test", "c.test"):
+            async with throttle.slot(host):
+                pass
+        robots = RobotsCache("TestBot", 3600, UrlGuard(allow_private=False, resolver=public_resolver), max_entries=2)
+        async with httpx.AsyncClient(transport=site_transport()) as client:
+            for host in ("a.test", "b.test", "c.test"):
+                await robots.allowed(client, f"https://{host}/")
+
+        assert list(throttle._hosts) == ["b.test", "c.test"]
+        assert list(robots._entries) == ["https://b.test", "https://c.test"]
+
+
+class TestCrawlBackends:
+    """Tests for crawl backend dispatch."""
+
+    def test_resolve_backend(self):
+        """Test the request backend overrides the configured default and unknown names fail."""
+        with patch("app.services.crawl_backends.settings") as mock_settings:
+            mock_settings.CRAWL_BACKEND = "tavily"
+            assert resolve_backend(None) == "tavily"
+            assert resolve_backend("native") == "native"
+            with pytest.raises(ValueError):
+                resolve_backend("scrapy")
+
+    @pytest.mark.asyncio
+    async def test_dispatch(self):
+        """Test the native backend never receives the Tavily key."""
+        with patch("app.services.crawl_backends.native_crawler") as native, \
+             patch("app.services.crawl_backends.tavily_service") as tavily:
+            native.crawl = AsyncMock(return_value={"results": []})
+            native.map = AsyncMock(return_value={"results": []})
+            tavily.crawl = AsyncMock(return_value={"results": []})
+
+            await run_crawl({"url": "https://site.test", "api_key": "tvly-x"}, "native")
+            await run_map({"url": "https://site.test", "api_key": "tvly-x"}, "native")
+            await run_crawl({"url": "https://site.test", "api_key": "tvly-x"}, "tavily")
+
+        native.crawl.assert_awaited_once_with(url="https://site.test")
+        native.map.assert_awaited_once_with(url="https://site.test")
+        tavily.crawl.assert_awaited_once_with(url="https://site.test", api_key="tvly-x")
@@ -0,0 +1,181 @@
+"""Tests for app.services.pagination module, keyset pages and the NDJSON export."""
+
+import json
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.api.routes import search
+from app.services.mongodb_service import MongoDBService
+from app.services.pagination import RESULT_SORT, decode_cursor, encode_cursor, results_filter
+
+NOW = datetime(2026, 5, 1, 12, 0, 0, 123000)
+
+
+def stored(count):
+    # Pairs share a timestamp so the _id tie-break matters
+    return [
+        {"_id": ObjectId(), "timestamp": NOW - timedelta(seconds=index // 2), "type": "crawl"}
+        for index in range(count)
+    ]
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+        self.closed = False
+        self.sort = MagicMock(return_value=self)
+        self.limit = MagicMock(return_value=self)
+        self.batch_size = MagicMock(return_value=self)
+
+    async def to_list(self, length=None):
+        return [dict(document) for document in self.documents[:self.limit.call_args.args[0]]]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield dict(document)
+
+    async def close(self):
+        self.closed = True
+
+
+class TestCursorTokens:
+    """Tests for opaque keyset cursors."""
+
+    def test_round_trip(self):
+        """Test a cursor decodes to the timestamp and _id it was built from."""
+        document = {"_id": ObjectId(), "timestamp": NOW}
+
+        assert decode_cursor(encode_cursor(document)) == (NOW, document["_id"])
+
+    def test_invalid_cursor(self):
+        """Test garbage and tampered tokens raise ValueError."""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+        with pytest.raises(ValueError):
+            decode_cursor(encode_cursor({"_id": "xyz", "timestamp": NOW}))
+
+    def test_filter_seeks_past_cursor(self):
+        """Test type, window and cursor combine into one keyset query."""
+        last_id = ObjectId()
+        query = results_filter("crawl", start=NOW - timedelta(days=1), end=NOW, cursor=encode_cursor({"_id": last_id, "timestamp": NOW}))
+
+        assert query["type"] == "crawl"
+        assert query["timestamp"] == {"$gte": NOW - timedelta(days=1), "$lt": NOW}
+        assert query["$or"] == [{"timestamp": {"$lt": NOW}}, {"timestamp": NOW, "_id": {"$lt": last_id}}]
+        assert results_filter() == {}
+
+    def test_filter_window_is_naive_utc(self):
+        """Test a Z-suffixed or offset window is compared against stored naive-UTC timestamps."""
+        query = results_filter(
+            start=datetime.fromisoformat("2026-03-04T10:00:00Z"),
+            end=datetime.fromisoformat("2026-03-04T14:00:00+02:00")
+        )
+
+        assert query["timestamp"] == {"$gte": datetime(2026, 3, 4, 10), "$lt": datetime(2026, 3, 4, 12)}
+
+    def test_search_filter_matches_untyped_documents(self):
+        """Test type=search selects search results stored without a type, and nothing else."""
+        untyped = {"_id": ObjectId(), "timestamp": NOW, "query": "q"}
+        typed = {**untyped, "type": "search"}
+        crawl = {**untyped, "type": "crawl"}
+        clause = results_filter("search")["type"]
+
+        matched = [doc for doc in (untyped, typed, crawl) if doc.get("type") in clause["$in"]]
+
+        assert clause == {"$in": [None, "search"]}
+        assert matched == [untyped, typed]
+
+
+class TestMongoDBServiceResults:
+    """Tests for paging and streaming stored results."""
+
+    @pytest.mark.asyncio
+    async def test_results_page_returns_next_cursor(self):
+        """Test a full page carries a cursor after its last row and the last page carries none."""
+        service = MongoDBService()
+        documents = stored(5)
+        collection = MagicMock()
+        collection.find.side_effect = [FakeCursor(documents), FakeCursor(documents[3:])]
+        with patch.object(service, "collection", collection), patch.object(service, "db", MagicMock()):
+            first = await service.get_results_page(limit=3, result_type="crawl")
+            second = await service.get_results_page(limit=3, cursor=first["next_cursor"])
+
+        assert [doc["_id"] for doc in first["results"]] == [str(doc["_id"]) for doc in documents[:3]]
+        assert decode_cursor(first["next_cursor"]) == (documents[2]["timestamp"], documents[2]["_id"])
+        assert collection.find.call_args.args[0]["$or"][1]["_id"] == {"$lt": documents[2]["_id"]}
+        assert len(second["results"]) == 2
+        assert second["next_cursor"] is None
+
+    @pytest.mark.asyncio
+    async def test_iter_results_batches(self):
+        """Test the export reads one sorted cursor in fixed-size batches and closes it."""
+        service = MongoDBService()
+        cursor = FakeCursor(stored(5))
+        collection = MagicMock()
+        collection.find.return_value = cursor
+        with patch.object(service, "collection", collection), patch.object(service, "db", MagicMock()):
+            batches = [batch async for batch in service.iter_results(result_type="crawl", batch_size=2)]
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        cursor.sort.assert_called_once_with(RESULT_SORT)
+        cursor.batch_size.assert_called_once_with(2)
+        assert cursor.closed
+
+
+class TestResultRoutes:
+    """Tests for the results and export endpoints."""
+
+    @pytest.mark.asyncio
+    async def test_export_streams_ndjson(self):
+        """Test the export emits one JSON document per line."""
+        async def batches(**kwargs):
+            yield [{"_id": "a", "timestamp": NOW}, {"_id": "b", "timestamp": NOW}]
+            yield [{"_id": "c", "timestamp": NOW}]
+
+        app = FastAPI()
+        app.include_router(search.router, prefix="/web_search")
+        with patch.object(search, "mongodb_service") as mock_service:
+            mock_service.iter_results = MagicMock(side_effect=batches)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.get("/web_search/results/export", params={"type": "crawl"})
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [line["_id"] for line in lines] == ["a", "b", "c"]
+        assert lines[0]["timestamp"] == NOW.isoformat()
+        assert mock_service.iter_results.call_args.kwargs["result_type"] == "crawl"
+
+    @pytest.mark.asyncio
+    async def test_results_by_url(self):
+        """Test the lookup passes the URL through unchanged and validates the limit."""
+        app = FastAPI()
+        app.include_router(search.router, prefix="/web_search")
+        with patch.object(search, "mongodb_service") as mock_service:
+            mock_service.get_results_by_url = AsyncMock(return_value=[{"_id": "a", "query": "q"}])
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.get("/web_search/results/by-url", params={"url": "https://example.com/a", "limit": 5})
+                too_many = await client.get("/web_search/results/by-url", params={"url": "https://example.com/a", "limit": 500})
+
+        assert response.json() == {"count": 1, "results": [{"_id": "a", "query": "q"}]}
+        mock_service.get_results_by_url.assert_awaited_once_with("https://example.com/a", limit=5, include_content=True)
+        assert too_many.status_code == 400
+
+    @pytest.mark.asyncio
+    async def test_bad_cursor_is_a_client_error(self):
+        """Test an undecodable cursor is reported as 400 rather than 500."""
+        app = FastAPI()
+        app.include_router(search.router, prefix="/web_search")
+        with patch.object(search, "mongodb_service") as mock_service:
+            mock_service.get_results_page = AsyncMock(side_effect=ValueError("Invalid pagination cursor"))
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                response = await client.get("/web_search/results", params={"cursor": "junk"})
+
+        assert response.status_code == 400
@@ -0,0 +1,154 @@
+"""Tests for app.services.rate_limiter and app.services.credit_ledger modules."""
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.credit_ledger import CreditLedger, estimate_credits
+from app.services.rate_limiter import RateLimiter, TokenBucket, fingerprint_key, mask_key
+
+
+class TestKeyHelpers:
+    """Tests for API key fingerprinting and masking."""
+
+    def test_fingerprint_is_stable_and_short(self):
+        """Test the fingerprint does not leak the key and is deterministic."""
+        assert fingerprint_key("tvly-secret-key") == fingerprint_key("tvly-secret-key")
+        assert len(fingerprint_key("tvly-secret-key")) == 12
+        assert "secret" not in fingerprint_key("tvly-secret-key")
+
+    def test_mask_key(self):
+        """Test keys are masked for display."""
+        assert mask_key("tvly-abcdefgh1234") == "tvly-...1234"
+        assert mask_key("short") == "***"
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket class."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_wait(self):
+        """Test the bucket serves its burst immediately and delays the next call."""
+        bucket = TokenBucket(rate=100.0, capacity=2)
+        
+        assert await bucket.acquire() == 0.0
+        assert await bucket.acquire() == 0.0
+        wait = await bucket.acquire()
+        
+        assert wait > 0
+        assert bucket.stats["delayed"] == 1
+        assert bucket.snapshot()["acquired"] == 3
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter class."""
+
+    @pytest.mark.asyncio
+    async def test_buckets_are_per_key_and_operation(self):
+        """Test each key gets its own bucket per operation."""
+        limiter = RateLimiter(rates={"search": 100.0}, bursts={"search": 1})
+        
+        await limiter.acquire("tvly-key-one-0001", "search")
+        assert await limiter.acquire("tvly-key-two-0002", "search") == 0.0
+        assert await limiter.acquire("tvly-key-one-0001", "search") > 0
+        
+        state = limiter.get_state()
+        assert len(state["keys"]) == 2
+        assert state["limits"]["search"] == {"rate_per_second": 100.0, "burst": 1}
+
+    @pytest.mark.asyncio
+    async def test_unlimited_operations(self):
+        """Test operations without a positive rate are not limited."""
+        limiter = RateLimiter(rates={"search": 0}, bursts={})
+        
+        for _ in range(5):
+            assert await limiter.acquire("tvly-key-one-0001", "search") == 0.0
+            assert await limiter.acquire("tvly-key-one-0001", "map") == 0.0
+        assert limiter.get_state()["keys"] == {}
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_buckets_are_evicted(self):
+        """Test per-key buckets stay bounded, dropping the least recently used once they have refilled."""
+        limiter = RateLimiter(rates={"search": 1.0}, bursts={"search": 5}, max_buckets=2)
+        clock = [1000.0]
+        
+        with patch("app.services.rate_limiter.time.monotonic", side_effect=lambda: clock[0]):
+            await limiter.acquire("tvly-key-one-0001", "search")
+            await limiter.acquire("tvly-key-two-0002", "search")
+            clock[0] += 10
+            await limiter.acquire("tvly-key-one-0001", "search")
+            await limiter.acquire("tvly-key-three-003", "search")
+        
+        hints = {entry["key_hint"] for entry in limiter.get_state()["keys"].values()}
+        assert hints == {"tvly-...0001", "tvly-...-003"}
+
+    @pytest.mark.asyncio
+    async def test_drained_buckets_are_not_evicted(self):
+        """Test a key cannot regain a full burst by pushing its partly spent bucket out of the map."""
+        limiter = RateLimiter(rates={"search": 0.01}, bursts={"search": 2}, max_buckets=1)
+        
+        await limiter.acquire("tvly-key-one-0001", "search")
+        await limiter.acquire("tvly-key-one-0001", "search")
+        await limiter.acquire("tvly-key-two-0002", "search")
+        
+        assert limiter.available("tvly-key-one-0001", "search") < 1.0
+        assert len(limiter._buckets) == 2
+
+
+class TestCreditLedger:
+    """Tests for CreditLedger class."""
+
+    def test_estimate_credits(self):
+        """Test the credit estimates per operation and depth."""
+        assert estimate_credits("search", {"search_depth": "basic"}, {}) == 1
+        assert estimate_credits("search", {"search_depth": "advanced"}, {}) == 2
+        assert estimate_credits("extract", {"extract_depth": "advanced"}, {"results": [{}] * 6}) == 4
+        assert estimate_credits("map", {}, {"results": ["u"] * 11}) == 2
+        assert estimate_credits("crawl", {"extract_depth": "basic"}, {"results": [{}] * 10}) == 3
+
+    @pytest.mark.asyncio
+    async def test_prefers_reported_usage(self):
+        """Test credits reported by Tavily win over the estimate."""
+        ledger = CreditLedger()
+        with patch('app.services.credit_ledger.mongodb_service') as mock_mongo:
+            mock_mongo.db = None
+            first = ledger.record("tvly-key-one-0001", "crawl", {}, {"results": [], "usage": {"credits": 7}})
+            second = ledger.record("tvly-key-one-0001", "search", {"search_depth": "advanced"}, {"results": []})
+            ledger_view = await ledger.get_ledger()
+        
+        assert first == {"credits": 7, "estimated": False}
+        assert second == {"credits": 2, "estimated": True}
+        assert ledger_view["source"] == "memory"
+        entry = ledger_view["keys"][0]
+        assert entry["key_hint"] == "tvly-...0001"
+        assert entry["credits"] == 9
+        assert entry["estimated_credits"] == 2
+        assert entry["by_operation"]["crawl"]["requests"] == 1
+
+    @pytest.mark.asyncio
+    async def test_persists_to_mongodb(self):
+        """Test usage is upserted to MongoDB in the background when connected."""
+        ledger = CreditLedger()
+        with patch('app.services.credit_ledger.mongodb_service') as mock_mongo:
+            mock_mongo.db = object()
+            mock_mongo.record_credit_usage = AsyncMock()
+            ledger.record("tvly-key-one-0001", "search", {}, {"results": []})
+            for task in list(ledger._pending):
+                await task
+        
+        args = mock_mongo.record_credit_usage.call_args.args
+        assert args[0] == fingerprint_key("tvly-key-one-0001")
+        assert args[2] == "search"
+        assert args[4] == 1
+        assert args[5] is True
+
+    @pytest.mark.asyncio
+    async def test_in_process_totals_are_bounded(self):
+        """Test the in-memory fallback keeps only the most recently used entries."""
+        ledger = CreditLedger(max_entries=2)
+        with patch('app.services.credit_ledger.mongodb_service') as mock_mongo:
+            mock_mongo.db = None
+            for key in ("tvly-key-one-0001", "tvly-key-two-0002", "tvly-key-three-003"):
+                ledger.record(key, "search", {}, {"results": []})
+            ledger_view = await ledger.get_ledger()
+        
+        assert [entry["key_hint"] for entry in ledger_view["keys"]] == ["tvly-...0002", "tvly-...-003"]
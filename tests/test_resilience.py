@@ -0,0 +1,193 @@
+"""Tests for app.services.resilience module."""
+
+import pytest
+import httpx
+from unittest.mock import patch
+
+from app.services.resilience import CircuitBreaker, CircuitOpenError, Resilience, RetryBudget
+
+
+def status_error(status_code, headers=None):
+    request = httpx.Request("POST", "https://api.tavily.com/search")
+    response = httpx.Response(status_code, headers=headers, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def make_resilience(**overrides):
+    options = dict(
+        max_attempts=3,
+        base_delay=0.001,
+        max_delay=0.01,
+        max_elapsed=5.0,
+        budget_ratio=0.2,
+        failure_threshold=3,
+        reset_timeout=60.0
+    )
+    options.update(overrides)
+    return Resilience(**options)
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker class."""
+
+    def test_opens_after_threshold(self):
+        """Test the breaker opens after consecutive failures and rejects calls."""
+        breaker = CircuitBreaker("search", failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.before_call()
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        assert breaker.stats["rejected"] == 1
+
+    def test_half_open_allows_single_probe(self):
+        """Test a single probe is let through after the reset timeout."""
+        breaker = CircuitBreaker("search", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Test a failing probe reopens the breaker."""
+        breaker = CircuitBreaker("search", failure_threshold=5, reset_timeout=0)
+        breaker.state = CircuitBreaker.HALF_OPEN
+        breaker.record_failure()
+        
+        assert breaker.state == CircuitBreaker.OPEN
+
+
+class TestRetryBudget:
+    """Tests for RetryBudget class."""
+
+    def test_withdraw_until_empty(self):
+        """Test retries are refused once tokens run out."""
+        budget = RetryBudget(ratio=0.5, min_tokens=2)
+        assert budget.withdraw()
+        assert budget.withdraw()
+        assert not budget.withdraw()
+        
+        budget.deposit()
+        budget.deposit()
+        assert budget.withdraw()
+
+
+class TestResilienceExecute:
+    """Tests for Resilience.execute."""
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self):
+        """Test transient failures are retried until success."""
+        resilience = make_resilience()
+        outcomes = [httpx.ConnectError("boom"), status_error(503), {"ok": True}]
+        
+        async def call():
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        
+        assert await resilience.execute("search", call) == {"ok": True}
+        assert resilience.stats["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_errors(self):
+        """Test 4xx errors other than 429 are raised immediately."""
+        resilience = make_resilience()
+        attempts = 0
+        
+        async def call():
+            nonlocal attempts
+            attempts += 1
+            raise status_error(401)
+        
+        with pytest.raises(httpx.HTTPStatusError):
+            await resilience.execute("search", call)
+        assert attempts == 1
+        assert resilience.breaker("search").consecutive_failures == 0
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        """Test the last error is raised once attempts are exhausted."""
+        resilience = make_resilience(failure_threshold=10)
+        attempts = 0
+        
+        async def call():
+            nonlocal attempts
+            attempts += 1
+            raise status_error(429)
+        
+        with pytest.raises(httpx.HTTPStatusError):
+            await resilience.execute("search", call)
+        assert attempts == 3
+
+    @pytest.mark.asyncio
+    async def test_honors_retry_after(self):
+        """Test the Retry-After header sets the minimum backoff."""
+        resilience = make_resilience()
+        calls = []
+        
+        async def call():
+            calls.append(1)
+            if len(calls) == 1:
+                raise status_error(429, headers={"Retry-After": "2"})
+            return "ok"
+        
+        with patch('app.services.resilience.asyncio.sleep') as mock_sleep:
+            assert await resilience.execute("search", call) == "ok"
+        assert mock_sleep.call_args.args[0] == 2.0
+
+    @pytest.mark.asyncio
+    async def test_retry_after_beyond_deadline_is_not_retried(self):
+        """Test a Retry-After longer than the retry deadline fails fast."""
+        resilience = make_resilience(max_elapsed=1.0)
+        
+        async def call():
+            raise status_error(429, headers={"Retry-After": "30"})
+        
+        with pytest.raises(httpx.HTTPStatusError):
+            await resilience.execute("search", call)
+        assert resilience.stats["retries"] == 0
+
+    @pytest.mark.asyncio
+    async def test_retry_budget_limits_retries(self):
+        """Test retries stop when the shared retry budget is empty."""
+        resilience = make_resilience(failure_threshold=100)
+        resilience.budget.tokens = 0
+        
+        async def call():
+            raise httpx.ReadTimeout("slow")
+        
+        with pytest.raises(httpx.ReadTimeout):
+            await resilience.execute("search", call)
+        assert resilience.stats["budget_exhausted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_open_breaker_fails_fast_per_operation(self):
+        """Test an open breaker rejects calls for its operation only."""
+        resilience = make_resilience(max_attempts=1, failure_threshold=2)
+        
+        async def failing():
+            raise httpx.ConnectError("down")
+        
+        async def working():
+            return "ok"
+        
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                await resilience.execute("crawl", failing)
+        
+        with pytest.raises(CircuitOpenError):
+            await resilience.execute("crawl", working)
+        assert await resilience.execute("search", working) == "ok"
+        
+        state = resilience.get_state()
+        assert state["breakers"]["crawl"]["state"] == "open"
+        assert state["breakers"]["search"]["state"] == "closed"
@@ -0,0 +1,72 @@
+"""Tests for app.api.responses module (fast orjson/msgpack response path)."""
+
+import httpx
+import msgpack
+import orjson
+import pytest
+from fastapi import FastAPI, Request
+from unittest.mock import patch
+
+from app.api.models.crawl import CrawlResponse
+from app.api.responses import fast_response, wants_fast_response
+
+CRAWL_DATA = {
+    "base_url": "https://example.com",
+    "results": [{"url": "https://example.com/a", "raw_content": "body", "extra": "dropped"}],
+    "usage": {"credits": 1},
+    "_id": "added-by-mongodb"
+}
+
+
+def make_client(data):
+    app = FastAPI()
+
+    @app.post("/crawl", response_model=CrawlResponse)
+    async def crawl(request: Request):
+        if wants_fast_response(request):
+            return fast_response(request, CrawlResponse, data)
+        return data
+
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+class TestFastResponse:
+    """Tests for fast_response and content negotiation."""
+
+    @pytest.mark.asyncio
+    async def test_msgpack_matches_default_json(self):
+        """Test the msgpack body carries the same filtered payload as the default path."""
+        async with make_client(CRAWL_DATA) as client:
+            default = await client.post("/crawl")
+            packed = await client.post("/crawl", headers={"Accept": "application/msgpack"})
+        
+        assert packed.headers["content-type"] == "application/msgpack"
+        assert msgpack.unpackb(packed.content) == default.json()
+        assert "_id" not in default.json()
+        assert "extra" not in default.json()["results"][0]
+
+    @pytest.mark.asyncio
+    async def test_orjson_when_enabled(self):
+        """Test FAST_RESPONSES switches plain JSON requests to the orjson path."""
+        async with make_client(CRAWL_DATA) as client:
+            default = await client.post("/crawl")
+            with patch('app.api.responses.settings') as mock_settings:
+                mock_settings.FAST_RESPONSES = True
+                fast = await client.post("/crawl")
+        
+        assert fast.headers["content-type"] == "application/json"
+        assert orjson.loads(fast.content) == default.json()
+
+    @pytest.mark.asyncio
+    async def test_validation_failure_is_not_a_client_error(self):
+        """Test an invalid service payload raises a non-ValueError so it maps to a 500."""
+        app = FastAPI()
+
+        @app.post("/crawl")
+        async def crawl(request: Request):
+            return fast_response(request, CrawlResponse, {"results": [{"title": "missing url"}]})
+
+        with pytest.raises(RuntimeError) as exc_info:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                await client.post("/crawl", headers={"Accept": "application/msgpack"})
+        assert not isinstance(exc_info.value, ValueError)
@@ -0,0 +1,163 @@
+"""Tests for app.services.retention module and the retention queries in MongoDBService."""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.mongodb_service import MongoDBService
+from app.services.retention import RetentionJob, archive_path, read_archive, write_archive
+
+DAY = datetime(2026, 2, 14, 9, 30)
+
+
+def result(result_type=None, at=DAY):
+    document = {"_id": ObjectId(), "timestamp": at, "query": "q", "results": [{"url": "https://a", "raw_content": "body"}]}
+    if result_type:
+        document["type"] = result_type
+    return document
+
+
+async def async_iter(documents):
+    for document in documents:
+        yield document
+
+
+class TestArchive:
+    """Tests for the gzipped JSONL archive."""
+
+    def test_round_trip_across_appends(self, tmp_path):
+        """Test repeated appends to a partition read back in order with BSON types intact."""
+        first, second, crawl = result(), result(), result("crawl")
+
+        write_archive(str(tmp_path), [first])
+        written = write_archive(str(tmp_path), [second, crawl])
+        restored = list(read_archive(str(tmp_path), DAY.date(), DAY.date()))
+
+        assert written == {
+            archive_path(str(tmp_path), "search", DAY.date()): 1,
+            archive_path(str(tmp_path), "crawl", DAY.date()): 1
+        }
+        assert sorted(doc["_id"] for doc in restored) == sorted([first["_id"], second["_id"], crawl["_id"]])
+        assert isinstance(restored[0]["timestamp"], datetime)
+
+    def test_read_filters_days_and_types(self, tmp_path):
+        """Test only partitions inside the day range and requested types are read."""
+        write_archive(str(tmp_path), [result("crawl"), result("crawl", DAY + timedelta(days=2)), result("map")])
+
+        restored = list(read_archive(str(tmp_path), date(2026, 2, 14), date(2026, 2, 15), ["crawl"]))
+
+        assert len(restored) == 1
+        assert restored[0]["type"] == "crawl"
+
+
+class TestRetentionJob:
+    """Tests for the archive-then-expire pass."""
+
+    @pytest.mark.asyncio
+    async def test_archives_before_marking(self, tmp_path):
+        """Test each batch is written to disk before it is stamped for TTL deletion."""
+        batch = [result("crawl"), result("crawl")]
+        events = []
+        with patch("app.services.retention.mongodb_service") as mock_service:
+            mock_service.has_retention_ttl = AsyncMock(return_value=True)
+            mock_service.find_expirable = AsyncMock(side_effect=[batch, []])
+            mock_service.mark_expiring = AsyncMock(side_effect=lambda ids, expire_at: events.append(("mark", ids)))
+            mock_service.sweep_orphaned_content = AsyncMock(return_value=3)
+            job = RetentionJob(policies={"crawl": 30}, archive_dir=str(tmp_path), batch_size=2)
+            with patch("app.services.retention.write_archive", side_effect=lambda root, docs: events.append(("write", len(docs))) or {}):
+                summary = await job.run_once()
+
+        assert events == [("write", 2), ("mark", [doc["_id"] for doc in batch])]
+        assert summary["expired"] == {"crawl": 2}
+        assert summary["orphaned_bodies"] == 3
+        result_type, cutoff, limit = mock_service.find_expirable.call_args.args
+        assert result_type == "crawl"
+        assert datetime.utcnow() - cutoff > timedelta(days=29)
+
+    @pytest.mark.asyncio
+    async def test_skipped_without_ttl_index(self, tmp_path):
+        """Test nothing is archived or stamped while the TTL index that would delete it is missing."""
+        with patch("app.services.retention.mongodb_service") as mock_service:
+            mock_service.has_retention_ttl = AsyncMock(return_value=False)
+            mock_service.find_expirable = AsyncMock()
+            mock_service.mark_expiring = AsyncMock()
+            summary = await RetentionJob(policies={"crawl": 30}, archive_dir=str(tmp_path)).run_once()
+
+        assert summary["skipped"] == "retention_ttl index missing"
+        mock_service.find_expirable.assert_not_awaited()
+        mock_service.mark_expiring.assert_not_awaited()
+
+    def test_not_started_without_policies(self):
+        """Test no background task is created when no type has a retention period."""
+        job = RetentionJob(policies={})
+        job.start()
+
+        assert job._task is None
+
+
+class TestMongoDBServiceRetention:
+    """Tests for expiry selection, TTL stamping and re-import."""
+
+    @pytest.mark.asyncio
+    async def test_find_expirable_untyped_search_results(self):
+        """Test search retention covers documents stored without a type and skips stamped ones."""
+        service = MongoDBService()
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.limit.return_value = cursor
+        cursor.to_list = AsyncMock(return_value=[])
+        collection = MagicMock()
+        collection.find.return_value = cursor
+        with patch.object(service, "collection", collection):
+            await service.find_expirable("search", DAY, 100)
+
+        query = collection.find.call_args.args[0]
+        assert query == {"type": {"$in": [None, "search"]}, "timestamp": {"$lt": DAY}, "expire_at": {"$exists": False}}
+        cursor.sort.assert_called_once_with("timestamp", 1)
+
+    @pytest.mark.asyncio
+    async def test_sweep_removes_only_unreferenced_bodies(self):
+        """Test stale bodies no result references are deleted and referenced ones are kept."""
+        service = MongoDBService()
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.limit.return_value = cursor
+        cursor.__aiter__.side_effect = [async_iter([{"_id": "kept"}, {"_id": "gone"}]), async_iter([])]
+        content = MagicMock()
+        content.find.return_value = cursor
+        content.delete_many = AsyncMock(return_value=MagicMock(deleted_count=1))
+        collection = MagicMock()
+        collection.distinct = AsyncMock(side_effect=lambda path, query: ["kept", "other"] if path == "results.raw_content_ref" else [])
+        db = MagicMock()
+        db.__getitem__.return_value = content
+        with patch.object(service, "db", db), patch.object(service, "collection", collection):
+            removed = await service.sweep_orphaned_content(DAY, batch_size=2)
+
+        delete_query = content.delete_many.call_args.args[0]
+        assert removed == 1
+        assert delete_query["_id"] == {"$in": ["gone"]}
+        assert delete_query["$or"][0] == {"stored_at": {"$lt": DAY}}
+        assert content.find.call_args_list[1].args[0]["_id"] == {"$gt": "gone"}
+
+    @pytest.mark.asyncio
+    async def test_restore_upserts_by_id_with_new_expiry(self):
+        """Test restored documents keep their _id and get a fresh expiry."""
+        service = MongoDBService()
+        collection = MagicMock()
+        collection.bulk_write = AsyncMock(return_value=MagicMock(upserted_count=1, modified_count=0))
+        document = result("crawl")
+        expire_at = DAY + timedelta(days=7)
+        with patch.object(service, "collection", collection), \
+             patch("app.services.mongodb_service.settings") as mock_settings:
+            mock_settings.CONTENT_DEDUP_ENABLED = False
+            mock_settings.CONTENT_COMPRESSION_MIN_CHARS = 4096
+            mock_settings.CONTENT_COMPRESSION_LEVEL = None
+            restored = await service.restore_documents([document], expire_at)
+
+        operation = collection.bulk_write.call_args.args[0][0]
+        assert restored == 1
+        assert operation._filter == {"_id": document["_id"]}
+        assert operation._doc["expire_at"] == expire_at
+        assert "expire_at" not in document
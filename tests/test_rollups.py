@@ -0,0 +1,201 @@
+"""Tests for app.services.rollups module and rollup-backed stats in MongoDBService."""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.mongodb_service import MongoDBService
+from app.services.rollups import bucket_start, range_buckets, rollup_increments, summarize_rollups
+from app.services.stats_reconciler import StatsReconciler
+
+
+class AsyncCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+    async def to_list(self, length=None):
+        return list(self.documents)
+
+
+def rollup_collection(rows):
+    """Fake stats collection answering find() from rows by granularity."""
+    collection = MagicMock()
+    collection.bulk_write = AsyncMock()
+
+    def find(query):
+        if "$or" in query:
+            granularities = {clause["granularity"] for clause in query["$or"]}
+        else:
+            granularities = {query["granularity"]}
+        return AsyncCursor([row for row in rows if row["granularity"] in granularities])
+
+    collection.find.side_effect = find
+    return collection
+
+
+def service_with(rollups, collection=None):
+    service = MongoDBService()
+    db = MagicMock()
+    db.__getitem__.return_value = rollups
+    return service, patch.object(service, "db", db), patch.object(service, "collection", collection or MagicMock())
+
+
+class TestRollups:
+    """Tests for computing and summarizing rollup counters."""
+
+    def test_increments_per_bucket_and_type(self):
+        """Test each document counts once per granularity, typed or defaulted to search."""
+        at = datetime(2026, 3, 4, 15, 42)
+        counts = rollup_increments([
+            {"timestamp": at, "type": "crawl"},
+            {"timestamp": at + timedelta(minutes=5)},
+            {"timestamp": at + timedelta(hours=1)}
+        ])
+
+        assert counts[("all", None, "search")] == 2
+        assert counts[("hour", datetime(2026, 3, 4, 15), "search")] == 1
+        assert counts[("hour", datetime(2026, 3, 4, 16), "search")] == 1
+        assert counts[("day", datetime(2026, 3, 4), "search")] == 2
+        assert counts[("day", datetime(2026, 3, 4), "crawl")] == 1
+
+    def test_buckets_and_summary(self):
+        """Test range buckets are aligned and the series is zero-filled."""
+        buckets = range_buckets(datetime(2026, 3, 4, 10, 30), datetime(2026, 3, 4, 13), "hour")
+        rows = [
+            {"bucket": datetime(2026, 3, 4, 10), "type": "search", "count": 3},
+            {"bucket": datetime(2026, 3, 4, 12), "type": "crawl", "count": 2}
+        ]
+
+        by_type, series = summarize_rollups(rows, buckets)
+
+        assert buckets == [datetime(2026, 3, 4, 10), datetime(2026, 3, 4, 11), datetime(2026, 3, 4, 12)]
+        assert by_type == {"search": 3, "crawl": 2}
+        assert [point["count"] for point in series] == [3, 0, 2]
+        with pytest.raises(ValueError):
+            bucket_start(datetime(2026, 3, 4), "week")
+
+
+class TestMongoDBServiceStats:
+    """Tests for stats served from rollups and for reconciliation."""
+
+    @pytest.mark.asyncio
+    async def test_get_stats_from_rollups(self):
+        """Test totals, last-24h, per-type and range figures come from rollup documents."""
+        hour = bucket_start(datetime.utcnow(), "hour")
+        rows = [
+            {"granularity": "all", "bucket": None, "type": "search", "count": 40},
+            {"granularity": "all", "bucket": None, "type": "crawl", "count": 2},
+            {"granularity": "hour", "bucket": hour, "type": "search", "count": 5},
+            {"granularity": "hour", "bucket": hour - timedelta(hours=2), "type": "crawl", "count": 1}
+        ]
+        service, patch_db, patch_collection = service_with(rollup_collection(rows))
+        with patch_db, patch_collection:
+            stats = await service.get_stats(by_type=True, start=hour - timedelta(hours=2), end=hour + timedelta(hours=1))
+
+        assert stats["total_results"] == 42
+        assert stats["results_last_24h"] == 6
+        assert stats["by_type"]["crawl"] == {"total": 2, "last_24h": 1}
+        assert stats["range"]["count"] == 6
+        assert [point["count"] for point in stats["range"]["series"]] == [1, 0, 5]
+        assert stats["range"]["by_type"] == {"search": 5, "crawl": 1}
+
+    @pytest.mark.asyncio
+    async def test_get_stats_accepts_offset_aware_range(self):
+        """Test start/end sent with a Z suffix or an offset select the same naive-UTC buckets."""
+        rows = [{"granularity": "hour", "bucket": datetime(2026, 3, 4, 10), "type": "search", "count": 3}]
+        service, patch_db, patch_collection = service_with(rollup_collection(rows))
+        with patch_db, patch_collection:
+            stats = await service.get_stats(
+                start=datetime.fromisoformat("2026-03-04T10:00:00Z"),
+                end=datetime.fromisoformat("2026-03-04T14:00:00+02:00")
+            )
+
+        assert stats["range"]["start"] == datetime(2026, 3, 4, 10)
+        assert stats["range"]["end"] == datetime(2026, 3, 4, 12)
+        assert [point["count"] for point in stats["range"]["series"]] == [3, 0]
+
+    @pytest.mark.asyncio
+    async def test_get_stats_rejects_oversized_range(self):
+        """Test a range with too many buckets or an unknown granularity is refused."""
+        service, patch_db, patch_collection = service_with(rollup_collection([]))
+        with patch_db, patch_collection:
+            with pytest.raises(ValueError):
+                await service.get_stats(start=datetime(2020, 1, 1), end=datetime(2026, 1, 1))
+            with pytest.raises(ValueError):
+                await service.get_stats(granularity="week")
+
+    @pytest.mark.asyncio
+    async def test_reconcile_corrects_drifted_counters(self):
+        """Test closed buckets and totals are recounted and only differences are written."""
+        yesterday = bucket_start(datetime.utcnow(), "day") - timedelta(days=1)
+        hour = yesterday + timedelta(hours=9)
+        rollups = rollup_collection([
+            {"granularity": "hour", "bucket": hour, "type": "search", "count": 4},
+            {"granularity": "day", "bucket": yesterday, "type": "search", "count": 3},
+            {"granularity": "all", "bucket": None, "type": "search", "count": 4}
+        ])
+        collection = MagicMock()
+        collection.aggregate.side_effect = [
+            AsyncCursor([{"_id": {"type": "search", "hour": hour.isoformat()}, "count": 4}]),
+            AsyncCursor([{"_id": "search", "count": 4}])
+        ]
+        service, patch_db, patch_collection = service_with(rollups, collection)
+        with patch_db, patch_collection:
+            result = await service.reconcile_rollups(days=2)
+
+        assert result == {"checked": 3, "corrected": 1}
+        operation = rollups.bulk_write.call_args.args[0][0]
+        assert operation._doc["$set"]["granularity"] == "day"
+        assert operation._doc["$set"]["count"] == 4
+
+    @pytest.mark.asyncio
+    async def test_insert_records_rollups(self):
+        """Test stored documents increment their rollup counters."""
+        rollups = rollup_collection([])
+        collection = MagicMock()
+        collection.insert_many = AsyncMock(return_value=MagicMock(inserted_ids=[1, 2]))
+        service, patch_db, patch_collection = service_with(rollups, collection)
+        with patch_db, patch_collection, patch("app.services.mongodb_service.settings") as mock_settings:
+            mock_settings.CONTENT_DEDUP_ENABLED = False
+            mock_settings.CONTENT_COMPRESSION_MIN_CHARS = 4096
+            mock_settings.CONTENT_COMPRESSION_LEVEL = None
+            await service.insert_documents([{"query": "a"}, {"type": "crawl"}])
+
+        operations = rollups.bulk_write.call_args.args[0]
+        increments = {op._filter["_id"]: op._doc["$inc"]["count"] for op in operations}
+        assert increments["all:search"] == 1
+        assert increments["all:crawl"] == 1
+        assert len(operations) == 6
+
+
+class TestStatsReconciler:
+    """Tests for the background reconciler."""
+
+    @pytest.mark.asyncio
+    async def test_run_once_records_last_run(self):
+        """Test a pass reconciles the configured window and keeps its outcome."""
+        reconciler = StatsReconciler(interval=60, days=3, retention_days={})
+        with patch("app.services.stats_reconciler.mongodb_service") as mock_service:
+            mock_service.reconcile_rollups = AsyncMock(return_value={"checked": 10, "corrected": 2})
+            result = await reconciler.run_once()
+
+        mock_service.reconcile_rollups.assert_awaited_once_with(3)
+        assert result["corrected"] == 2
+        assert reconciler.last_run is result
+
+    @pytest.mark.asyncio
+    async def test_window_stays_inside_shortest_retention(self):
+        """Test buckets old enough to hold deliberately expired results are never recounted."""
+        reconciler = StatsReconciler(interval=60, days=7, retention_days={"crawl": 3, "search": 30})
+        with patch("app.services.stats_reconciler.mongodb_service") as mock_service:
+            mock_service.reconcile_rollups = AsyncMock(return_value={"checked": 0, "corrected": 0})
+            await reconciler.run_once()
+
+        mock_service.reconcile_rollups.assert_awaited_once_with(2)
@@ -0,0 +1,130 @@
+"""Tests for app.services.scheduler module."""
+
+import asyncio
+import pytest
+
+from app.services.scheduler import (
+    PRIORITY_BULK,
+    PRIORITY_INTERACTIVE,
+    FairQueue,
+    OutboundScheduler,
+    _Waiter
+)
+
+
+async def occupy(scheduler, priority, tenant, release_event, order=None):
+    async with scheduler.slot(priority, tenant):
+        if order is not None:
+            order.append((priority, tenant))
+        await release_event.wait()
+
+
+class TestFairQueue:
+    """Tests for FairQueue class."""
+
+    @pytest.mark.asyncio
+    async def test_interleaves_tenants_by_weight(self):
+        """Test a heavy tenant's backlog does not starve a light one."""
+        queue = FairQueue({"gold": 2.0})
+        for _ in range(6):
+            queue.push(_Waiter("bulk-tenant"))
+        for _ in range(4):
+            queue.push(_Waiter("gold"))
+        
+        order = [queue.pop().tenant for _ in range(9)]
+        
+        assert order[:3].count("gold") == 2
+        assert order.count("gold") == 4
+        assert len(queue) == 1
+
+    @pytest.mark.asyncio
+    async def test_discarded_waiters_are_skipped(self):
+        """Test cancelled waiters leave the queue."""
+        queue = FairQueue({})
+        first = _Waiter("a")
+        second = _Waiter("b")
+        queue.push(first)
+        queue.push(second)
+        first.future.cancel()
+        queue.discard(first)
+        
+        assert len(queue) == 1
+        assert queue.pop() is second
+        assert queue.pop() is None
+
+
+class TestOutboundScheduler:
+    """Tests for OutboundScheduler class."""
+
+    @pytest.mark.asyncio
+    async def test_interactive_overtakes_queued_bulk(self):
+        """Test interactive calls are dispatched before bulk calls queued earlier."""
+        scheduler = OutboundScheduler(capacity=1, interactive_reserve=0, weights={})
+        release = asyncio.Event()
+        order = []
+        holder = asyncio.ensure_future(occupy(scheduler, PRIORITY_BULK, "t1", release))
+        await asyncio.sleep(0)
+        
+        waiting = [
+            asyncio.ensure_future(occupy(scheduler, PRIORITY_BULK, "t1", release, order)),
+            asyncio.ensure_future(occupy(scheduler, PRIORITY_BULK, "t2", release, order)),
+        ]
+        await asyncio.sleep(0)
+        waiting.append(asyncio.ensure_future(occupy(scheduler, PRIORITY_INTERACTIVE, "t3", release, order)))
+        await asyncio.sleep(0)
+        
+        state = scheduler.get_state()["classes"]
+        assert state[PRIORITY_BULK]["queued"] == 2
+        assert state[PRIORITY_INTERACTIVE]["queued"] == 1
+        
+        release.set()
+        await asyncio.gather(holder, *waiting)
+        
+        assert order[0] == (PRIORITY_INTERACTIVE, "t3")
+        assert scheduler.get_state()["classes"][PRIORITY_BULK]["dispatched"] == 3
+
+    @pytest.mark.asyncio
+    async def test_bulk_cannot_take_reserved_slots(self):
+        """Test bulk work leaves the interactive reserve free."""
+        scheduler = OutboundScheduler(capacity=3, interactive_reserve=1, weights={})
+        release = asyncio.Event()
+        bulk = [asyncio.ensure_future(occupy(scheduler, PRIORITY_BULK, "t", release)) for _ in range(3)]
+        await asyncio.sleep(0)
+        
+        assert scheduler.in_flight[PRIORITY_BULK] == 2
+        
+        async with scheduler.slot(PRIORITY_INTERACTIVE, "dashboard"):
+            assert scheduler.in_flight[PRIORITY_INTERACTIVE] == 1
+        
+        release.set()
+        await asyncio.gather(*bulk)
+        state = scheduler.get_state()["classes"]
+        assert state[PRIORITY_INTERACTIVE]["max_wait"] == 0.0
+        assert state[PRIORITY_BULK]["queued_total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_does_not_leak_capacity(self):
+        """Test cancelling a queued call frees its place and later calls still run."""
+        scheduler = OutboundScheduler(capacity=1, interactive_reserve=0, weights={})
+        release = asyncio.Event()
+        holder = asyncio.ensure_future(occupy(scheduler, PRIORITY_INTERACTIVE, "t", release))
+        await asyncio.sleep(0)
+        queued = asyncio.ensure_future(occupy(scheduler, PRIORITY_INTERACTIVE, "t", release))
+        await asyncio.sleep(0)
+        
+        queued.cancel()
+        await asyncio.gather(queued, return_exceptions=True)
+        assert scheduler.get_state()["classes"][PRIORITY_INTERACTIVE]["queued"] == 0
+        
+        release.set()
+        await holder
+        async with scheduler.slot(PRIORITY_INTERACTIVE, "t"):
+            pass
+        assert scheduler.in_flight == {PRIORITY_INTERACTIVE: 0, PRIORITY_BULK: 0}
+
+    @pytest.mark.asyncio
+    async def test_unknown_priority_is_interactive(self):
+        """Test calls without a priority context default to interactive."""
+        scheduler = OutboundScheduler(capacity=2, interactive_reserve=0, weights={})
+        async with scheduler.slot(None, "t"):
+            assert scheduler.in_flight[PRIORITY_INTERACTIVE] == 1
@@ -0,0 +1,140 @@
+"""Tests for app.services.search_cache module."""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.search_cache import SearchCache
+
+
+def make_result(query="test"):
+    return {
+        "query": query,
+        "answer": "answer",
+        "results": [],
+        "search_metadata": {
+            "search_depth": "basic",
+            "result_count": 0,
+            "searched_at": datetime.utcnow(),
+            "cached": False
+        }
+    }
+
+
+class TestSearchCacheKey:
+    """Tests for cache key normalization."""
+
+    def test_key_ignores_case_and_whitespace(self):
+        """Test equivalent queries produce the same key."""
+        assert SearchCache.make_key("  Python   FastAPI ", "basic", 5, True) == \
+            SearchCache.make_key("python fastapi", "basic", 5, True)
+
+    def test_key_depends_on_parameters(self):
+        """Test different search parameters produce different keys."""
+        base = SearchCache.make_key("q", "basic", 5, True)
+        assert base != SearchCache.make_key("q", "advanced", 5, True)
+        assert base != SearchCache.make_key("q", "basic", 10, True)
+        assert base != SearchCache.make_key("q", "basic", 5, False)
+
+
+class TestSearchCacheMemoryTier:
+    """Tests for the in-process LRU tier."""
+
+    @pytest.fixture(autouse=True)
+    def no_mongodb(self):
+        """Disable the persistent tier."""
+        with patch('app.services.search_cache.mongodb_service') as mock_mongodb:
+            mock_mongodb.cache_collection = None
+            yield
+
+    @pytest.mark.asyncio
+    async def test_get_returns_copy(self):
+        """Test hits return independent copies of the stored result."""
+        cache = SearchCache(max_entries=10, ttl_seconds=60)
+        await cache.set("k", make_result())
+        
+        first = await cache.get("k")
+        first["mutated"] = True
+        second = await cache.get("k")
+        
+        assert "mutated" not in second
+        assert cache.stats["memory_hits"] == 2
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test least recently used entries are evicted first."""
+        cache = SearchCache(max_entries=2, ttl_seconds=60)
+        await cache.set("a", make_result("a"))
+        await cache.set("b", make_result("b"))
+        await cache.get("a")
+        await cache.set("c", make_result("c"))
+        
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        assert cache.stats["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_and_max_age(self):
+        """Test TTL expiry and per-request max_age."""
+        cache = SearchCache(max_entries=10, ttl_seconds=60)
+        await cache.set("k", make_result())
+        cached_at, value = cache._entries["k"]
+        cache._entries["k"] = (cached_at - timedelta(seconds=30), value)
+        
+        assert await cache.get("k", max_age=10) is None
+        assert await cache.get("k") is not None
+        
+        cache._entries["k"] = (cached_at - timedelta(seconds=120), value)
+        assert await cache.get("k") is None
+        assert "k" not in cache._entries
+
+    @pytest.mark.asyncio
+    async def test_stats(self):
+        """Test hit/miss counters and hit ratio."""
+        cache = SearchCache(max_entries=10, ttl_seconds=60)
+        await cache.get("missing")
+        await cache.set("k", make_result())
+        await cache.get("k")
+        
+        stats = cache.get_stats()
+        assert stats["misses"] == 1
+        assert stats["memory_hits"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["entries"] == 1
+
+
+class TestSearchCachePersistentTier:
+    """Tests for the MongoDB-backed tier."""
+
+    @pytest.mark.asyncio
+    async def test_persistent_hit_populates_memory(self):
+        """Test a MongoDB hit is promoted into the memory tier."""
+        with patch('app.services.search_cache.mongodb_service') as mock_mongodb:
+            mock_mongodb.cache_collection = MagicMock()
+            mock_mongodb.get_cached_search = AsyncMock(return_value={
+                "cached_at": datetime.utcnow(),
+                "result": make_result()
+            })
+            cache = SearchCache(max_entries=10, ttl_seconds=60)
+            
+            assert await cache.get("k") is not None
+            assert await cache.get("k") is not None
+        
+        assert mock_mongodb.get_cached_search.await_count == 1
+        assert cache.stats["persistent_hits"] == 1
+        assert cache.stats["memory_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_persistent_errors_are_misses(self):
+        """Test MongoDB failures degrade to cache misses."""
+        with patch('app.services.search_cache.mongodb_service') as mock_mongodb:
+            mock_mongodb.cache_collection = MagicMock()
+            mock_mongodb.get_cached_search = AsyncMock(side_effect=Exception("down"))
+            mock_mongodb.save_cached_search = AsyncMock(side_effect=Exception("down"))
+            cache = SearchCache(max_entries=10, ttl_seconds=60)
+            
+            assert await cache.get("k") is None
+            await cache.set("k", make_result())
+        
+        assert cache.stats["misses"] == 1
+        assert "k" in cache._entries
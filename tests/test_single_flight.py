@@ -0,0 +1,104 @@
+"""Tests for app.services.single_flight module."""
+
+import asyncio
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight class."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_call(self):
+        """Test concurrent calls with the same key execute once."""
+        flight = SingleFlight()
+        calls = 0
+        
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"results": [1, 2]}
+        
+        results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+        
+        assert calls == 1
+        assert all(r == {"results": [1, 2]} for r in results)
+        assert flight.stats == {"executed": 1, "coalesced": 4}
+        assert flight.get_stats()["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_joiners_receive_independent_copies(self):
+        """Test joined callers can mutate their result without affecting others."""
+        flight = SingleFlight()
+        
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return {"results": []}
+        
+        first, second = await asyncio.gather(flight.do("k", fetch), flight.do("k", fetch))
+        second["results"].append("x")
+        
+        assert first["results"] == []
+
+    @pytest.mark.asyncio
+    async def test_errors_fan_out_to_all_callers(self):
+        """Test an upstream error is raised in every waiting caller."""
+        flight = SingleFlight()
+        
+        async def fetch():
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+        
+        outcomes = await asyncio.gather(
+            *(flight.do("k", fetch) for _ in range(3)),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(o, ValueError) for o in outcomes)
+        assert flight.stats["executed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_different_keys_do_not_coalesce(self):
+        """Test distinct keys execute independently."""
+        flight = SingleFlight()
+        
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return 1
+        
+        await asyncio.gather(flight.do("a", fetch), flight.do("b", fetch))
+        
+        assert flight.stats == {"executed": 2, "coalesced": 0}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        """Test cancelling the first caller leaves the shared call running."""
+        flight = SingleFlight()
+        
+        async def fetch():
+            await asyncio.sleep(0.02)
+            return "done"
+        
+        leader = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        
+        assert await follower == "done"
+
+    @pytest.mark.asyncio
+    async def test_completed_calls_are_not_reused(self):
+        """Test sequential calls each reach upstream, so results are never stale."""
+        flight = SingleFlight()
+        calls = 0
+        
+        async def fetch():
+            nonlocal calls
+            calls += 1
+            return calls
+        
+        assert await flight.do("k", fetch) == 1
+        assert await flight.do("k", fetch) == 2
@@ -0,0 +1,178 @@
+"""Tests for app.services.sitemap module."""
+
+import gzip
+from xml.etree.ElementTree import XMLPullParser
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.crawl_backends import run_map
+from app.services.native_crawler import RobotsCache
+from app.services.sitemap import READ_SIZE, SitemapMapper
+from app.services.url_guard import UrlGuard
+
+
+async def public_resolver(host, port):
+    return ["93.184.216.34"]
+
+
+def urlset(*paths):
+    entries = "".join(f"<url><loc>https://site.test{path}</loc><lastmod>2024-01-01</lastmod></url>" for path in paths)
+    return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>'
+
+
+def sitemap_index(*urls):
+    entries = "".join(f"<sitemap><loc>{url}</loc></sitemap>" for url in urls)
+    return f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>'
+
+
+def make_mapper(files, requests=None, headers=None, **kwargs):
+    headers = headers or {}
+    def handler(request):
+        if requests is not None:
+            requests.append(request.url.path)
+        body = files.get(request.url.path)
+        if body is None:
+            return httpx.Response(404)
+        # Streamed like a network response, so the mapper reads the raw bytes
+        return httpx.Response(200, stream=httpx.ByteStream(body if isinstance(body, bytes) else body.encode()), headers=headers.get(request.url.path, {}))
+    transport = httpx.MockTransport(handler)
+    return SitemapMapper(RobotsCache("TestBot", 3600, UrlGuard(allow_private=False, resolver=public_resolver)), transport=transport, **kwargs)
+
+
+class TestSitemapMapper:
+    """Tests for SitemapMapper."""
+
+    @pytest.mark.asyncio
+    async def test_follows_robots_and_nested_indexes(self):
+        """Test sitemaps listed in robots.txt are read, including gzipped children of an index."""
+        files = {
+            "/robots.txt": "User-agent: *\nSitemap: https://site.test/index.xml\n",
+            "/index.xml": sitemap_index("https://site.test/pages.xml", "https://site.test/posts.xml.gz"),
+            "/pages.xml": urlset("/", "/about", "/about#team"),
+            "/posts.xml.gz": gzip.compress(urlset("/blog/1", "/blog/2").encode()),
+        }
+
+        result = await make_mapper(files, min_coverage=0.4).map("https://site.test", limit=10, timeout=10)
+
+        assert result["base_url"] == "https://site.test/"
+        assert result["results"] == [
+            "https://site.test/", "https://site.test/about", "https://site.test/blog/1", "https://site.test/blog/2"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_default_location_filters_and_limit(self):
+        """Test /sitemap.xml is used without robots entries and filters apply before the limit."""
+        files = {"/sitemap.xml": urlset("/a", "/docs/1", "/docs/2", "/docs/3", "/docs/4")}
+        requests = []
+
+        result = await make_mapper(files, requests).map(
+            "https://site.test", limit=2, select_paths=["/docs/.*"], exclude_paths=["/docs/1"]
+        )
+
+        assert result["results"] == ["https://site.test/docs/2", "https://site.test/docs/3"]
+        assert "/sitemap.xml" in requests
+
+    @pytest.mark.asyncio
+    async def test_low_coverage_returns_none(self):
+        """Test sitemaps that fill too little of the limit, or none at all, signal a fallback."""
+        sparse = {"/sitemap.xml": urlset("/a", "/b")}
+
+        assert await make_mapper(sparse, min_coverage=0.5).map("https://site.test", limit=10) is None
+        assert await make_mapper(sparse, min_coverage=0.2).map("https://site.test", limit=10) is not None
+        assert await make_mapper({}).map("https://site.test", limit=10) is None
+
+    @pytest.mark.asyncio
+    async def test_index_loops_and_file_cap(self):
+        """Test self-referencing indexes terminate and at most max_files sitemaps are fetched."""
+        files = {
+            "/sitemap.xml": sitemap_index("https://site.test/sitemap.xml", "https://site.test/a.xml", "https://site.test/b.xml"),
+            "/a.xml": urlset("/a"),
+            "/b.xml": urlset("/b"),
+        }
+        requests = []
+
+        result = await make_mapper(files, requests, max_files=2, min_coverage=0).map("https://site.test", limit=10)
+
+        assert result["results"] == ["https://site.test/a"]
+        assert requests.count("/sitemap.xml") == 1
+        assert "/b.xml" not in requests
+
+    @pytest.mark.asyncio
+    async def test_decompression_bomb_is_abandoned(self):
+        """Test a gzipped sitemap that inflates past max_bytes is skipped without inflating it whole."""
+        padding = "<!--" + " " * (4 * 1024 * 1024) + "-->"
+        bomb = gzip.compress(urlset("/a").replace("?>", "?>" + padding, 1).encode())
+        files = {"/robots.txt": "Sitemap: https://site.test/bomb.xml.gz\nSitemap: https://site.test/ok.xml\n",
+                 "/bomb.xml.gz": bomb, "/ok.xml": urlset("/b")}
+
+        result = await make_mapper(files, max_bytes=1024 * 1024, min_coverage=0).map("https://site.test", limit=10)
+
+        assert result["results"] == ["https://site.test/b"]
+
+    @pytest.mark.asyncio
+    async def test_content_encoded_bomb_is_abandoned(self):
+        """Test a body sent with Content-Encoding: gzip is inflated under the same limit as a .xml.gz file."""
+        padding = "<!--" + " " * (4 * 1024 * 1024) + "-->"
+        bomb = gzip.compress(urlset("/a").replace("?>", "?>" + padding, 1).encode())
+        large = gzip.compress(urlset("/b").replace("?>", "?>" + padding[:512 * 1024] + "-->", 1).encode())
+        files = {"/robots.txt": "Sitemap: https://site.test/bomb.xml\nSitemap: https://site.test/ok.xml\n",
+                 "/bomb.xml": bomb, "/ok.xml": large}
+        encoded = {"/bomb.xml": {"content-encoding": "gzip"}, "/ok.xml": {"content-encoding": "gzip"}}
+
+        fed = []
+
+        class RecordingParser(XMLPullParser):
+            def feed(self, data):
+                fed.append(len(data))
+                super().feed(data)
+
+        mapper = make_mapper(files, headers=encoded, max_bytes=1024 * 1024, min_coverage=0)
+        with patch("app.services.sitemap.XMLPullParser", RecordingParser):
+            result = await mapper.map("https://site.test", limit=10)
+
+        assert result["results"] == ["https://site.test/b"]
+        assert max(fed) <= READ_SIZE
+
+    @pytest.mark.asyncio
+    async def test_sitemaps_outside_scope_are_not_fetched(self):
+        """Test robots.txt sitemaps on other hosts, and redirects to private addresses, are never requested."""
+        requested = []
+
+        def handler(request):
+            requested.append(str(request.url))
+            if request.url.path == "/robots.txt":
+                return httpx.Response(200, text="Sitemap: https://other.test/sitemap.xml\nSitemap: https://site.test/moved.xml\n")
+            if request.url.path == "/moved.xml":
+                return httpx.Response(302, headers={"location": "http://169.254.169.254/latest/meta-data/"})
+            return httpx.Response(200, text=urlset("/a"))
+
+        robots = RobotsCache("TestBot", 3600, UrlGuard(allow_private=False, resolver=public_resolver))
+        mapper = SitemapMapper(robots, transport=httpx.MockTransport(handler))
+
+        assert await mapper.map("https://site.test", limit=10) is None
+        assert requested == ["https://site.test/robots.txt", "https://site.test/moved.xml"]
+
+
+class TestRunMapSitemap:
+    """Tests for the sitemap fast path in run_map."""
+
+    @pytest.mark.asyncio
+    async def test_reports_source(self):
+        """Test the response says whether sitemaps or the crawl backend produced the URLs."""
+        with patch("app.services.crawl_backends.sitemap_mapper") as mapper, \
+             patch("app.services.crawl_backends.tavily_service") as tavily:
+            mapper.map = AsyncMock(return_value={"results": ["https://site.test/a"]})
+            tavily.map = AsyncMock(return_value={"results": ["https://site.test/b"]})
+
+            from_sitemap = await run_map({"url": "https://site.test", "use_sitemap": True}, "tavily")
+            mapper.map = AsyncMock(return_value=None)
+            fallback = await run_map({"url": "https://site.test", "use_sitemap": True}, "tavily")
+            direct = await run_map({"url": "https://site.test"}, "tavily")
+
+        assert from_sitemap == {"results": ["https://site.test/a"], "source": "sitemap"}
+        assert fallback["source"] == "tavily"
+        assert direct["source"] == "tavily"
+        assert mapper.map.await_count == 1
+        assert "use_sitemap" not in tavily.map.call_args.kwargs
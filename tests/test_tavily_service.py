@@ -1,11 +1,16 @@
 """Tests for app.services.tavily_service module."""
 
+import asyncio
+import json
 import pytest
+import time
 from datetime import datetime
 from unittest.mock import AsyncMock, patch, MagicMock
 import httpx
 
 from app.services.tavily_service import TavilyService
+from app.services.resilience import CircuitOpenError
+from app.services.latency_model import DepthLatencyModel
 
 
 class TestTavilyServiceInit:
@@ -313,3 +318,505 @@ class TestTavilyServiceBatchSearch:
         assert result["summary"]["total"] == 3
         assert result["summary"]["successful"] == 2
         assert result["summary"]["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_batch_search_raises_when_breaker_rejects_every_query(self, service):
+        """Test an open circuit for the whole batch propagates instead of a 200 full of errors."""
+        with patch.object(service, 'search', side_effect=CircuitOpenError("search", 12.0)):
+            with pytest.raises(CircuitOpenError):
+                await service.batch_search(["query1", "query2"])
+        
+        async def mock_search(query, *args, **kwargs):
+            if query == "fail":
+                raise CircuitOpenError("search", 12.0)
+            return {"query": query, "results": []}
+        
+        with patch.object(service, 'search', side_effect=mock_search):
+            result = await service.batch_search(["ok", "fail"])
+        
+        assert result["summary"]["failed"] == 1
+
+
+class TestTavilyServiceConnectionPool:
+    """Tests for the shared connection pool."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a TavilyService with mocked settings."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = "test-key"
+            mock_settings.TAVILY_BASE_URL = "https://api.tavily.com"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "advanced"
+            return TavilyService()
+
+    @pytest.mark.asyncio
+    async def test_start_and_close(self, service):
+        """Test start creates a pooled client and close releases it."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_HTTP2 = False
+            mock_settings.TAVILY_MAX_CONNECTIONS = 10
+            mock_settings.TAVILY_MAX_KEEPALIVE_CONNECTIONS = 5
+            mock_settings.TAVILY_KEEPALIVE_EXPIRY = 30.0
+            mock_settings.TAVILY_PREWARM_CONNECTIONS = 0
+            await service.start()
+        
+        client = service._client
+        assert isinstance(client, httpx.AsyncClient)
+        
+        await service.start()
+        assert service._client is client
+        
+        await service.close()
+        assert service._client is None
+
+    @pytest.mark.asyncio
+    async def test_requests_reuse_shared_client(self, service):
+        """Test all calls are routed through the shared client."""
+        seen = []
+        
+        def handler(request):
+            seen.append(request.url.path)
+            return httpx.Response(200, json={"results": [], "answer": "ok"})
+        
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        with patch('httpx.AsyncClient') as mock_client:
+            await service.search("test")
+            await service.extract(["https://example.com"])
+            await service.crawl("https://example.com")
+            await service.map("https://example.com")
+            mock_client.assert_not_called()
+        
+        assert seen == ["/search", "/extract", "/crawl", "/map"]
+        await service.close()
+
+
+class TestTavilyServiceBatchSearchConcurrency:
+    """Tests for concurrent batch_search execution."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a TavilyService with mocked settings."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = "test-key"
+            mock_settings.TAVILY_BASE_URL = "https://api.tavily.com"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "advanced"
+            return TavilyService()
+
+    @pytest.mark.asyncio
+    async def test_batch_search_respects_concurrency_cap(self, service):
+        """Test no more than max_concurrency searches run at once."""
+        running = 0
+        peak = 0
+        
+        async def mock_search(query, *args, **kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return {"query": query, "results": []}
+        
+        with patch.object(service, 'search', side_effect=mock_search):
+            result = await service.batch_search([f"q{i}" for i in range(10)], max_concurrency=3)
+        
+        assert peak == 3
+        assert result["summary"]["successful"] == 10
+
+    @pytest.mark.asyncio
+    async def test_batch_search_preserves_input_order(self, service):
+        """Test results and errors are returned in input order."""
+        
+        async def mock_search(query, *args, **kwargs):
+            await asyncio.sleep(0.01 * (5 - int(query[-1])))
+            if query.startswith("fail"):
+                raise ValueError(f"error {query}")
+            return {"query": query, "results": []}
+        
+        queries = ["ok1", "fail2", "ok3", "fail4"]
+        with patch.object(service, 'search', side_effect=mock_search):
+            result = await service.batch_search(queries, max_concurrency=4)
+        
+        assert [r["query"] for r in result["results"]] == ["ok1", "ok3"]
+        assert [e["query"] for e in result["errors"]] == ["fail2", "fail4"]
+
+    @pytest.mark.asyncio
+    async def test_batch_search_collapses_duplicate_queries(self, service):
+        """Test duplicate queries trigger one upstream call but keep per-query entries."""
+        mock_search = AsyncMock(side_effect=lambda query, *a, **k: {"query": query, "results": []})
+        
+        with patch.object(service, 'search', mock_search):
+            result = await service.batch_search(["a", "b", "a", "a"])
+        
+        assert mock_search.await_count == 2
+        assert [r["query"] for r in result["results"]] == ["a", "b", "a", "a"]
+        assert result["results"][0] is not result["results"][2]
+        assert result["summary"] == {"total": 4, "successful": 4, "failed": 0}
+
+
+class TestTavilyServiceSearchCache:
+    """Tests for search result caching."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a TavilyService with mocked settings and a pooled mock client."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = "test-key"
+            mock_settings.TAVILY_BASE_URL = "https://api.tavily.com"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "advanced"
+            service = TavilyService()
+        
+        service.calls = 0
+        
+        def handler(request):
+            service.calls += 1
+            return httpx.Response(200, json={"results": [], "answer": "ok"})
+        
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch('app.services.search_cache.mongodb_service') as mock_mongodb:
+            mock_mongodb.cache_collection = None
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_repeated_search_is_served_from_cache(self, service):
+        """Test identical searches only reach Tavily once."""
+        first = await service.search("Test Query", "basic", 5, True)
+        second = await service.search("test  query", "basic", 5, True)
+        
+        assert service.calls == 1
+        assert first["search_metadata"]["cached"] is False
+        assert second["search_metadata"]["cached"] is True
+
+    @pytest.mark.asyncio
+    async def test_no_cache_bypasses_lookup(self, service):
+        """Test no_cache always queries Tavily."""
+        await service.search("q", "basic", 5, True)
+        result = await service.search("q", "basic", 5, True, no_cache=True)
+        
+        assert service.calls == 2
+        assert result["search_metadata"]["cached"] is False
+
+    @pytest.mark.asyncio
+    async def test_batch_search_reports_cached_queries(self, service):
+        """Test cache hits are tagged so callers do not store them a second time."""
+        await service.search("warm", None, None, True)
+        result = await service.batch_search(["warm", "cold"])
+        
+        assert result["cached_queries"] == ["warm"]
+        assert result["summary"]["successful"] == 2
+
+
+class TestTavilyServiceSingleFlight:
+    """Tests for coalescing identical in-flight upstream requests."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a TavilyService with mocked settings and a slow mock client."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = "test-key"
+            mock_settings.TAVILY_BASE_URL = "https://api.tavily.com"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "advanced"
+            service = TavilyService()
+        
+        service.calls = []
+        
+        async def handler(request):
+            service.calls.append(request.url.path)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"results": [], "answer": "ok"})
+        
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch('app.services.search_cache.mongodb_service') as mock_mongodb:
+            mock_mongodb.cache_collection = None
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_coalesce(self, service):
+        """Test identical concurrent search/extract/map calls reach Tavily once each."""
+        await asyncio.gather(
+            service.search("Same Query", no_cache=True),
+            service.search("same query", no_cache=True),
+            service.extract(["https://example.com"]),
+            service.extract(["https://example.com"]),
+            service.map("https://example.com"),
+            service.map("https://example.com")
+        )
+        
+        assert sorted(service.calls) == ["/extract", "/map", "/search"]
+
+    @pytest.mark.asyncio
+    async def test_different_api_keys_are_not_coalesced(self, service):
+        """Test requests made with different keys are sent separately."""
+        await asyncio.gather(
+            service.extract(["https://example.com"], api_key="key-a"),
+            service.extract(["https://example.com"], api_key="key-b")
+        )
+        
+        assert service.calls == ["/extract", "/extract"]
+
+
+class TestTavilyServiceChunkedExtract:
+    """Tests for chunked, cached extraction."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a TavilyService whose mock client records each extract payload."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = "test-key"
+            mock_settings.TAVILY_BASE_URL = "https://api.tavily.com"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "advanced"
+            service = TavilyService()
+        
+        service.batches = []
+        
+        def handler(request):
+            urls = json.loads(request.content)["urls"]
+            service.batches.append(urls)
+            return httpx.Response(200, json={
+                "results": [{"url": u, "raw_content": f"content {u}"} for u in urls if "bad" not in u],
+                "failed_results": [{"url": u, "error": "failed"} for u in urls if "bad" in u]
+            })
+        
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return service
+
+    @pytest.mark.asyncio
+    async def test_large_lists_are_chunked_and_ordered(self, service):
+        """Test more than 20 URLs are split into chunks and merged in request order."""
+        urls = [f"https://example.com/{i}" for i in range(45)]
+        urls[7] = "https://example.com/bad"
+        
+        data = await service.extract(urls)
+        
+        assert [len(b) for b in service.batches] == [20, 20, 5]
+        assert [r["url"] for r in data["results"]] == [u for u in urls if "bad" not in u]
+        assert data["failed_results"] == [{"url": "https://example.com/bad", "error": "failed"}]
+        assert data["total"] == 45
+
+    @pytest.mark.asyncio
+    async def test_urls_are_canonicalized_and_deduplicated(self, service):
+        """Test equivalent URLs are only extracted once."""
+        data = await service.extract([
+            "https://Example.com/a#top",
+            "https://example.com:443/a",
+            "https://example.com/b"
+        ])
+        
+        assert service.batches == [["https://example.com/a", "https://example.com/b"]]
+        assert len(data["results"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_recent_urls_are_served_from_cache(self, service):
+        """Test previously extracted URLs are not sent upstream again."""
+        await service.extract(["https://example.com/a"])
+        data = await service.extract(["https://example.com/a", "https://example.com/b"])
+        
+        assert service.batches == [["https://example.com/a"], ["https://example.com/b"]]
+        assert data["cached_urls"] == ["https://example.com/a"]
+        assert [r["url"] for r in data["results"]] == ["https://example.com/a", "https://example.com/b"]
+
+    @pytest.mark.asyncio
+    async def test_cache_key_includes_depth_and_images(self, service):
+        """Test a different extract_depth or include_images misses the cache."""
+        await service.extract(["https://example.com/a"])
+        await service.extract(["https://example.com/a"], extract_depth="advanced")
+        await service.extract(["https://example.com/a"], include_images=True)
+        
+        assert len(service.batches) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_chunk_is_reported_per_url(self, service):
+        """Test a failing chunk marks its URLs as failed without losing other chunks."""
+        original = service._extract_chunk
+        
+        async def flaky_chunk(urls, *args):
+            if "https://example.com/20" in urls:
+                raise ValueError("Rate limit exceeded.")
+            return await original(urls, *args)
+        
+        with patch.object(service, '_extract_chunk', side_effect=flaky_chunk):
+            data = await service.extract([f"https://example.com/{i}" for i in range(25)])
+        
+        assert len(data["results"]) == 20
+        assert len(data["failed_results"]) == 5
+        assert data["failed_results"][0]["error"] == "Rate limit exceeded."
+
+    @pytest.mark.asyncio
+    async def test_answer_is_refused_across_chunks(self, service):
+        """Test include_answer over more URLs than one chunk is rejected rather than stitched from partial answers."""
+        with pytest.raises(ValueError, match="include_answer"):
+            await service.extract([f"https://example.com/{i}" for i in range(21)], include_answer=True)
+        await service.extract([f"https://example.com/{i}" for i in range(20)], include_answer=True)
+        
+        assert [len(b) for b in service.batches] == [20]
+
+    @pytest.mark.asyncio
+    async def test_all_chunks_failing_raises(self, service):
+        """Test the error is raised when nothing could be extracted."""
+        with patch.object(service, '_extract_chunk', side_effect=ValueError("Invalid Tavily API key.")):
+            with pytest.raises(ValueError, match="Invalid Tavily API key"):
+                await service.extract(["https://example.com/a"])
+
+
+class TestTavilyServiceCircuitBreaker:
+    """Tests for circuit breaker integration."""
+
+    @pytest.mark.asyncio
+    async def test_open_circuit_is_not_wrapped_in_value_error(self):
+        """Test CircuitOpenError propagates so the API can answer 503."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = "test-key"
+            mock_settings.TAVILY_BASE_URL = "https://api.tavily.com"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "advanced"
+            service = TavilyService()
+        
+        breaker = service.resilience.breaker("map")
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+        
+        with pytest.raises(CircuitOpenError):
+            await service.map("https://example.com")
+
+
+class TestTavilyServiceIterBatchSearch:
+    """Tests for iter_batch_search streaming."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a TavilyService with mocked settings."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = "test-key"
+            mock_settings.TAVILY_BASE_URL = "https://api.tavily.com"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "advanced"
+            return TavilyService()
+
+    @pytest.mark.asyncio
+    async def test_yields_in_completion_order_with_indexes(self, service):
+        """Test outcomes are yielded as they complete, tagged with input index."""
+        async def mock_search(query, *args, **kwargs):
+            await asyncio.sleep(0.03 if query == "slow" else 0)
+            if query == "bad":
+                raise ValueError("failed")
+            return {"query": query, "results": []}
+        
+        with patch.object(service, 'search', side_effect=mock_search):
+            outcomes = [o async for o in service.iter_batch_search(["slow", "fast", "bad", "fast"])]
+        
+        assert outcomes[-1]["index"] == 0
+        assert sorted(o["index"] for o in outcomes) == [0, 1, 2, 3]
+        assert next(o for o in outcomes if o["index"] == 2)["error"] == "failed"
+        assert {o["index"] for o in outcomes if o["query"] == "fast"} == {1, 3}
+
+    @pytest.mark.asyncio
+    async def test_closing_early_cancels_pending_searches(self, service):
+        """Test outstanding searches are cancelled when the consumer stops."""
+        cancelled = []
+        
+        async def mock_search(query, *args, **kwargs):
+            try:
+                await asyncio.sleep(0 if query == "fast" else 1)
+            except asyncio.CancelledError:
+                cancelled.append(query)
+                raise
+            return {"query": query, "results": []}
+        
+        with patch.object(service, 'search', side_effect=mock_search):
+            stream = service.iter_batch_search(["fast", "slow"])
+            first = await stream.__anext__()
+            await stream.aclose()
+            await asyncio.sleep(0)
+        
+        assert first["query"] == "fast"
+        assert cancelled == ["slow"]
+
+
+class TestTavilyServiceDeadline:
+    """Tests for deadline-aware depth selection in search."""
+
+    @pytest.fixture
+    def service(self):
+        """Create a TavilyService whose mock upstream answers after a per-depth delay."""
+        with patch('app.services.tavily_service.settings') as mock_settings:
+            mock_settings.TAVILY_API_KEY = "test-key"
+            mock_settings.TAVILY_BASE_URL = "https://api.tavily.com"
+            mock_settings.TAVILY_TIMEOUT = 30
+            mock_settings.TAVILY_MAX_RESULTS = 5
+            mock_settings.TAVILY_SEARCH_DEPTH = "advanced"
+            service = TavilyService()
+        
+        service.latency_model = DepthLatencyModel(
+            quantile=90, priors={"basic": 0.05, "advanced": 1.0}, window=50, min_samples=3
+        )
+        service.delays = {"basic": 0.0, "advanced": 0.0}
+        service.depths = []
+        
+        async def handler(request):
+            depth = json.loads(request.content)["search_depth"]
+            service.depths.append(depth)
+            await asyncio.sleep(service.delays[depth])
+            return httpx.Response(200, json={"results": [], "answer": f"{depth} answer"})
+        
+        service._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        with patch('app.services.search_cache.mongodb_service') as mock_mongodb, \
+                patch('app.services.credit_ledger.mongodb_service') as mock_ledger_mongodb:
+            mock_mongodb.cache_collection = None
+            mock_ledger_mongodb.db = None
+            yield service
+
+    @pytest.mark.asyncio
+    async def test_tight_deadline_uses_basic_depth(self, service):
+        """Test advanced is downgraded when its expected latency exceeds the budget."""
+        data = await service.batch_search(["query"], deadline_ms=500)
+        
+        metadata = data["results"][0]["search_metadata"]
+        assert service.depths == ["basic"]
+        assert metadata["search_depth"] == "basic"
+        assert metadata["requested_search_depth"] == "advanced"
+        assert metadata["degraded"] == "depth"
+
+    @pytest.mark.asyncio
+    async def test_generous_deadline_keeps_requested_depth(self, service):
+        """Test the requested depth is used when it fits."""
+        data = await service.batch_search(["query"], deadline_ms=5000)
+        
+        metadata = data["results"][0]["search_metadata"]
+        assert metadata["search_depth"] == "advanced"
+        assert metadata["degraded"] is None
+
+    @pytest.mark.asyncio
+    async def test_spent_budget_serves_cached_result(self, service):
+        """Test an older cached result is served when not even basic fits."""
+        await service.search("query", "advanced")
+        for _ in range(3):
+            service.latency_model.record("basic", 0.5)
+        
+        result = await service.search("query", "advanced", max_age=0, deadline=time.monotonic() + 0.2)
+        
+        assert service.depths == ["advanced"]
+        assert result["search_metadata"]["cached"] is True
+        assert result["search_metadata"]["degraded"] == "cache"
+
+    @pytest.mark.asyncio
+    async def test_missed_deadline_raises_without_cache(self, service):
+        """Test a search outliving its deadline fails instead of blocking the batch."""
+        service.delays["basic"] = 1.0
+        
+        data = await service.batch_search(["query"], search_depth="basic", deadline_ms=100)
+        
+        assert data["results"] == []
+        assert "deadline exceeded" in data["errors"][0]["error"]
+        assert service.latency_model.trackers["basic"].samples[-1] >= 0.09
@@ -0,0 +1,33 @@
+"""Tests for app.services.url_utils module."""
+
+from app.services.url_utils import canonicalize_url
+
+
+class TestCanonicalizeUrl:
+    """Tests for canonicalize_url function."""
+
+    def test_lowercases_scheme_and_host(self):
+        """Test scheme and host are case-insensitive."""
+        assert canonicalize_url("HTTPS://Example.COM/Path") == "https://example.com/Path"
+
+    def test_drops_fragment_and_default_port(self):
+        """Test fragments and default ports are removed."""
+        assert canonicalize_url("https://example.com:443/a#section") == "https://example.com/a"
+        assert canonicalize_url("http://example.com:80/a") == "http://example.com/a"
+
+    def test_keeps_non_default_port_and_query(self):
+        """Test meaningful URL parts are preserved."""
+        assert canonicalize_url("http://example.com:8080/a?b=1") == "http://example.com:8080/a?b=1"
+
+    def test_empty_path_becomes_root(self):
+        """Test a bare host and its root path are equivalent."""
+        assert canonicalize_url("https://example.com") == "https://example.com/"
+
+    def test_strips_whitespace_and_passes_through_relative(self):
+        """Test non-absolute input is returned unchanged apart from whitespace."""
+        assert canonicalize_url("  not-a-url  ") == "not-a-url"
+
+    def test_keeps_ipv6_brackets(self):
+        """Test IPv6 hosts stay bracketed, with or without a port."""
+        assert canonicalize_url("http://[::1]:8080/") == "http://[::1]:8080/"
+        assert canonicalize_url("HTTPS://[2001:DB8::1]:443") == "https://[2001:db8::1]/"
@@ -0,0 +1,138 @@
+"""Tests for app.services.write_behind module."""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.services.write_behind import WriteBehindPersister, parse_write_concern
+
+
+class FakeStore:
+    def __init__(self, gate=None):
+        self.batches = []
+        self.gate = gate
+
+    async def insert_documents(self, documents, write_concern=None):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.batches.append(list(documents))
+        return len(documents)
+
+
+@pytest.fixture
+def store():
+    fake = FakeStore()
+    with patch("app.services.write_behind.mongodb_service", fake):
+        yield fake
+
+
+class TestWriteBehindPersister:
+    """Tests for batching, backpressure and shutdown draining."""
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_batch_size(self, store):
+        """Test a full batch is written without waiting for the flush interval."""
+        persister = WriteBehindPersister(max_queue=100, batch_size=3, flush_interval=60)
+        persister.start()
+        await persister.enqueue([{"n": i} for i in range(3)])
+        await asyncio.sleep(0.01)
+
+        assert store.batches == [[{"n": 0}, {"n": 1}, {"n": 2}]]
+        await persister.stop()
+
+    @pytest.mark.asyncio
+    async def test_flushes_on_interval(self, store):
+        """Test a partial batch is written once the flush interval passes."""
+        persister = WriteBehindPersister(max_queue=100, batch_size=50, flush_interval=0.02)
+        persister.start()
+        await persister.enqueue([{"n": 1}])
+        await asyncio.sleep(0.01)
+        assert store.batches == []
+
+        await asyncio.sleep(0.05)
+        assert store.batches == [[{"n": 1}]]
+        assert persister.get_state()["last_flush_latency"] is not None
+        await persister.stop()
+
+    @pytest.mark.asyncio
+    async def test_backpressure_bounds_the_buffer(self):
+        """Test producers wait while the buffer is full instead of growing it."""
+        gate = asyncio.Event()
+        fake = FakeStore(gate)
+        with patch("app.services.write_behind.mongodb_service", fake):
+            persister = WriteBehindPersister(max_queue=2, batch_size=2, flush_interval=60)
+            persister.start()
+            producer = asyncio.ensure_future(persister.enqueue([{"n": i} for i in range(6)]))
+            await asyncio.sleep(0.02)
+
+            assert not producer.done()
+            assert persister.get_state()["queue_depth"] <= 2
+            assert persister.stats["backpressure_waits"] >= 1
+
+            gate.set()
+            await asyncio.wait_for(producer, timeout=1)
+            await persister.stop()
+
+        assert [doc["n"] for batch in fake.batches for doc in batch] == list(range(6))
+        assert persister.stats["written"] == 6
+
+    @pytest.mark.asyncio
+    async def test_stop_drains_buffer(self, store):
+        """Test shutdown writes everything still buffered."""
+        persister = WriteBehindPersister(max_queue=100, batch_size=2, flush_interval=60)
+        persister.start()
+        await persister.enqueue_results([{"url": "a"}])
+        await persister.enqueue_map({"results": ["https://a.test"]})
+        await persister.stop()
+
+        documents = [doc for batch in store.batches for doc in batch]
+        assert len(documents) == 2
+        assert documents[1]["type"] == "map"
+        assert all("timestamp" in doc for doc in documents)
+        assert not persister.running
+
+    @pytest.mark.asyncio
+    async def test_enqueue_copies_documents(self, store):
+        """Test the caller's dicts are not mutated by stamping or the insert."""
+        persister = WriteBehindPersister(max_queue=100, batch_size=10, flush_interval=60)
+        persister.start()
+        crawl_data = {"base_url": "https://a.test", "results": []}
+        await persister.enqueue_crawl(crawl_data)
+        await persister.stop()
+
+        assert crawl_data == {"base_url": "https://a.test", "results": []}
+        assert store.batches[0][0]["type"] == "crawl"
+
+    @pytest.mark.asyncio
+    async def test_writes_inline_when_not_started(self, store):
+        """Test documents go straight to MongoDB when the flush loop is not running."""
+        persister = WriteBehindPersister(max_queue=100, batch_size=10, flush_interval=60)
+        await persister.enqueue([{"n": 1}])
+
+        assert store.batches == [[{"n": 1}]]
+
+    @pytest.mark.asyncio
+    async def test_counts_failed_documents(self):
+        """Test partially written and failed batches are reported in the metrics."""
+        with patch("app.services.write_behind.mongodb_service") as mock_mongodb:
+            mock_mongodb.insert_documents = AsyncMock(side_effect=[1, RuntimeError("down")])
+            persister = WriteBehindPersister(max_queue=100, batch_size=2, flush_interval=60)
+            persister.start()
+            await persister.enqueue([{"n": 1}, {"n": 2}])
+            await asyncio.sleep(0.01)
+            await persister.enqueue([{"n": 3}])
+            await persister.stop()
+
+        assert persister.stats["written"] == 1
+        assert persister.stats["failed"] == 2
+        assert persister.stats["flushes"] == 2
+
+
+class TestParseWriteConcern:
+    """Tests for the PERSIST_WRITE_CONCERN setting."""
+
+    def test_parses_counts_and_tags(self):
+        """Test numeric and named write concerns and journaling."""
+        assert parse_write_concern("0", False).document == {"w": 0}
+        assert parse_write_concern("majority", True).document == {"w": "majority", "j": True}
@@ -0,0 +1,41 @@
+"""Convert stored results that embed page bodies to content-store references.
+
+Each `content`/`raw_content` body (top level or inside `results`) is moved to the
+content collection, keyed by its sha256. The result document keeps only the hash.
+Bodies shorter than CONTENT_DEDUP_MIN_CHARS are left inline. Safe to re-run:
+converted documents no longer match, and bodies are upserted by hash.
+
+    python -m tools.migrate_content_refs --dry-run
+    python -m tools.migrate_content_refs --batch-size 500
+"""
+
+import argparse
+import asyncio
+import json
+
+from app.services.mongodb_service import mongodb_service
+
+
+async def run(batch_size: int, limit: int, dry_run: bool) -> dict:
+    await mongodb_service.connect()
+    try:
+        return await mongodb_service.migrate_content_refs(batch_size=batch_size, limit=limit, dry_run=dry_run)
+    finally:
+        await mongodb_service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move embedded page bodies to the content-addressed store")
+    parser.add_argument("--batch-size", type=int, default=200, help="Documents read and rewritten per batch")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after scanning this many documents")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would change without writing")
+    args = parser.parse_args()
+
+    stats = asyncio.run(run(args.batch_size, args.limit, args.dry_run))
+    if stats["embedded_chars"]:
+        stats["saved_ratio"] = round(1 - stats["unique_chars"] / stats["embedded_chars"], 3)
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Re-import archived results for a range of days back into the results collection.
+
+Reads the gzipped JSONL partitions written by the retention job under
+RETENTION_ARCHIVE_DIR. Documents keep their original _id and are upserted, so
+re-running over the same range (or an archive with duplicate lines) is safe.
+Restored results expire again after --retain-days.
+
+    python -m tools.restore_archive --start 2026-01-01 --end 2026-01-31 --dry-run
+    python -m tools.restore_archive --start 2026-03-02 --end 2026-03-02 --type crawl --retain-days 30
+"""
+
+import argparse
+import asyncio
+import json
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from app.core.config import settings
+from app.services.mongodb_service import mongodb_service
+from app.services.retention import read_archive
+
+
+async def run(
+    archive_dir: str,
+    start: date,
+    end: date,
+    result_types: Optional[List[str]],
+    retain_days: int,
+    batch_size: int,
+    dry_run: bool
+) -> dict:
+    stats = {"read": 0, "restored": 0}
+    expire_at = datetime.utcnow() + timedelta(days=retain_days)
+    if not dry_run:
+        await mongodb_service.connect()
+    try:
+        batch = []
+        for document in read_archive(archive_dir, start, end, result_types):
+            stats["read"] += 1
+            if dry_run:
+                continue
+            batch.append(document)
+            if len(batch) >= batch_size:
+                stats["restored"] += await mongodb_service.restore_documents(batch, expire_at)
+                batch = []
+        if batch:
+            stats["restored"] += await mongodb_service.restore_documents(batch, expire_at)
+        return stats
+    finally:
+        if not dry_run:
+            await mongodb_service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-import archived results into MongoDB")
+    parser.add_argument("--start", type=date.fromisoformat, required=True, help="First day to restore (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, required=True, help="Last day to restore, inclusive")
+    parser.add_argument("--type", action="append", dest="types", help="Result type to restore; repeatable, default all")
+    parser.add_argument("--archive-dir", default=settings.RETENTION_ARCHIVE_DIR, help="Archive root directory")
+    parser.add_argument("--retain-days", type=int, default=settings.RETENTION_RESTORE_DAYS, help="Days before restored results expire again")
+    parser.add_argument("--batch-size", type=int, default=500, help="Documents upserted per batch")
+    parser.add_argument("--dry-run", action="store_true", help="Count archived documents without writing")
+    args = parser.parse_args()
+
+    stats = asyncio.run(run(
+        args.archive_dir, args.start, args.end, args.types, args.retain_days, args.batch_size, args.dry_run
+    ))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()